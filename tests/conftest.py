@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yz_bench import Uretici  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def sentetik():
+    """Sentetik sorular ve bunlara karşı zorlayıcı sorgular
+
+    Sorgular bozulmuş, kelimeleri karıştırılmış, yarısı başka soruyla
+    birleşmiş ve hiç olmayan sorulardan oluşur; aday seçimi yapan
+    eşleştiricilerin tam taramadan ayrıldığı durumlar bunlardır.
+    """
+    uretici = Uretici(7, sozluk_boyu=800)
+    sorular = sorted({uretici.soru() for _ in range(600)})
+    rastgele = random.Random(3)
+    sorgular = []
+    for _ in range(120):
+        soru = rastgele.choice(sorular)
+        tur = rastgele.random()
+        if tur < 0.3:
+            soru = uretici.boz(soru)
+        elif tur < 0.55:
+            kelimeler = soru.split()
+            rastgele.shuffle(kelimeler)
+            soru = " ".join(kelimeler)
+        elif tur < 0.8:
+            soru = uretici.soru()
+        else:
+            soru = " ".join(soru.split()[:2]) + " " + uretici.soru()
+        sorgular.append(soru)
+    return sorular, sorgular
+
+
+@pytest.fixture
+def json_yolu(tmp_path):
+    return str(tmp_path / "database.json")
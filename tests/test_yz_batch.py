@@ -0,0 +1,45 @@
+import io
+import json
+
+from yz_batch import sorulari_oku, toplu_cevapla
+from yz_store import json_yaz
+
+
+def test_gecersiz_satir_hata_kaydi_olur(json_yolu):
+    json_yaz(json_yolu, {"sorular": [{"soru": "merhaba", "cevap": "selam"}]})
+    girdi = io.StringIO('{"soru": "merhaba"}\nnot json\n\n"merhba"\n')
+    cikti = io.StringIO()
+
+    assert toplu_cevapla(girdi, cikti, json_yolu, isci_sayisi=1) == 3
+
+    satirlar = [json.loads(satir) for satir in cikti.getvalue().splitlines()]
+    assert [satir["sira"] for satir in satirlar] == [0, 1, 2]
+    assert satirlar[0]["cevap"] == "selam"
+    assert satirlar[1]["satir"] == 2
+    assert satirlar[1]["hata"].startswith("Geçersiz JSON")
+    assert satirlar[2]["eslesme"] == "merhaba"
+
+
+def test_sorulari_oku_alan_ve_duz_metin():
+    girdi = io.StringIO('{"q": "bir"}\n"iki"\n{"soru": "üç"}\n{"q": null}\n{"q": 5}\n[1]\n')
+    assert list(sorulari_oku(girdi, alan="q")) == [
+        "bir",
+        "iki",
+        {"satir": 3, "hata": "'q' alanı yok"},
+        {"satir": 4, "hata": "Soru metin değil: null"},
+        {"satir": 5, "hata": "Soru metin değil: 5"},
+        {"satir": 6, "hata": "Soru metin değil: [1]"},
+    ]
+
+
+def test_sorusu_eksik_satir_eslestirilmez(json_yolu):
+    json_yaz(json_yolu, {"sorular": [{"soru": "None", "cevap": "hiç"}]})
+    girdi = io.StringIO('{"soru": null}\n{"metin": "None"}\n{"soru": "None"}\n')
+    cikti = io.StringIO()
+
+    assert toplu_cevapla(girdi, cikti, json_yolu, isci_sayisi=1) == 3
+
+    satirlar = [json.loads(satir) for satir in cikti.getvalue().splitlines()]
+    assert [satir.get("hata") is not None for satir in satirlar] == [True, True, False]
+    assert "cevap" not in satirlar[0] and "cevap" not in satirlar[1]
+    assert satirlar[2]["cevap"] == "hiç"
@@ -0,0 +1,79 @@
+import pytest
+
+from yz_cache import AnswerCache, LfuAnswerCache, onbellek_olustur
+from yz_index import eslestirici_olustur
+from yz_kb import KnowledgeBase
+
+
+def _bilgi(politika="lru", index=None):
+    kayitlar = [
+        {"soru": "merhaba", "cevap": "selam"},
+        {"soru": "nasılsın", "cevap": "iyiyim"},
+        {"soru": "hava nasıl", "cevap": "güneşli"},
+    ]
+    return KnowledgeBase(kayitlar, index=index, cache=onbellek_olustur(16, politika))
+
+
+@pytest.mark.parametrize("politika", ["lru", "lfu"])
+def test_ogretme_cevabi_degisen_girdiyi_dusurur(politika):
+    bilgi = _bilgi(politika)
+    assert bilgi.respond("Merhaba!")[1] == "selam"
+    assert bilgi.respond("nasilsin")[1] == "iyiyim"
+    bilgi.teach("merhaba", "günaydın")
+    assert bilgi.respond("Merhaba!")[1] == "günaydın"
+    # İlgisiz girdi kalır
+    assert ("nasilsin", 0.6) in bilgi.cache
+    assert bilgi.cache.gecersiz == 1
+
+
+def test_yeni_soru_daha_iyi_eslesmeyi_gecersiz_kilar():
+    bilgi = _bilgi()
+    assert bilgi.respond("hava nasıl bugün")[0] == "hava nasıl"
+    assert bilgi.respond("bambaşka bir şey") is None
+    bilgi.teach("hava nasıl bugün", "yağmurlu")
+    assert bilgi.respond("hava nasıl bugün")[1] == "yağmurlu"
+    # Eşleşmesi olmayan sorgu yeni soruya yakın değil, önbellekte kalır
+    assert ("bambaska bir sey", 0.6) in bilgi.cache
+
+
+def test_eslesmeyen_sorgu_ogretilince_bulunur():
+    bilgi = _bilgi()
+    assert bilgi.respond("en sevdiğin renk") is None
+    bilgi.teach("en sevdiğin renk ne", "mavi")
+    assert bilgi.respond("en sevdiğin renk")[1] == "mavi"
+
+
+def test_silme_girdiyi_dusurur():
+    bilgi = _bilgi()
+    assert bilgi.respond("nasılsın")[1] == "iyiyim"
+    bilgi.forget("nasılsın")
+    sonuc = bilgi.respond("nasılsın")
+    assert sonuc is None or sonuc[0] != "nasılsın"
+
+
+def test_difflib_disi_indekste_ogretme_onbellegi_bosaltir():
+    bilgi = _bilgi(index=eslestirici_olustur("lsh"))
+    bilgi.respond("merhaba")
+    bilgi.respond("hava nasıl")
+    bilgi.teach("yepyeni", "soru")
+    assert len(bilgi.cache) == 0
+
+
+def test_lru_en_eski_kullanilani_atar():
+    onbellek = AnswerCache(2)
+    onbellek["a"], onbellek["b"] = 1, 2
+    onbellek["a"]
+    onbellek["c"] = 3
+    assert "b" not in onbellek and "a" in onbellek and onbellek.tahliye == 1
+
+
+def test_lfu_en_az_kullanilani_atar():
+    onbellek = LfuAnswerCache(2)
+    onbellek["a"], onbellek["b"] = 1, 2
+    onbellek["a"], onbellek["a"], onbellek["b"]
+    onbellek["c"] = 3
+    assert "b" not in onbellek and "a" in onbellek
+    # Geçersiz kılma en az kovayı boşaltsa da kurban bulunur
+    onbellek.clear()
+    onbellek["d"], onbellek["e"], onbellek["f"] = 4, 5, 6
+    assert len(onbellek) == 2
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from yz_dedup import ayikla, ayiklanmis_yol
+from yz_store import (atilan_cevaplari_oku, bilgi_tabani_ac, bilgi_tabani_kapat, json_yaz,
+                      takma_adlari_oku)
+
+
+def _veritabani(yol):
+    json_yaz(yol, {"sorular": [
+        {"soru": "Türkiye'nin başkenti neresidir", "cevap": "Ankara"},
+        {"soru": "Hava bugün nasıl olacak", "cevap": "güneşli"},
+        {"soru": "Türkiye'nin başkentı neresidir", "cevap": "Ankara"},
+        # Son kayıt olsa da kanoniğin cevabını ezmez
+        {"soru": "Türkiye'nin başkenti neresidir?!", "cevap": "İstanbul"},
+    ]})
+
+
+def test_varsayilan_kaynaga_dokunmaz(json_yolu):
+    _veritabani(json_yolu)
+    with open(json_yolu, encoding="utf-8") as dosya:
+        once = dosya.read()
+    assert ayikla(json_yolu) == (4, 2)
+    with open(json_yolu, encoding="utf-8") as dosya:
+        assert dosya.read() == once
+    hedef = ayiklanmis_yol(json_yolu)
+    assert hedef.endswith("database.dedup.json")
+    with open(hedef, encoding="utf-8") as dosya:
+        assert len(json.load(dosya)["sorular"]) == 2
+
+
+def test_ayni_yola_ustune_yaz_olmadan_yazmaz(json_yolu):
+    _veritabani(json_yolu)
+    with pytest.raises(ValueError):
+        ayikla(json_yolu, json_yolu)
+    assert ayikla(json_yolu, ustune_yaz=True) == (4, 2)
+    with open(json_yolu, encoding="utf-8") as dosya:
+        assert len(json.load(dosya)["sorular"]) == 2
+
+
+def test_kanonik_cevap_kalir_atilan_cevap_kaydedilir(json_yolu):
+    _veritabani(json_yolu)
+    ayikla(json_yolu)
+    hedef = ayiklanmis_yol(json_yolu)
+    takma_adlar = takma_adlari_oku(hedef)
+    assert set(takma_adlar) == {
+        "Türkiye'nin başkenti neresidir?!", "Türkiye'nin başkentı neresidir"}
+    # Aynı cevaplı yazım atılan cevaplara girmez
+    assert atilan_cevaplari_oku(hedef) == {"Türkiye'nin başkenti neresidir?!": "İstanbul"}
+
+    depo, bilgi = bilgi_tabani_ac(hedef)
+    try:
+        assert bilgi.answer("Türkiye'nin başkenti neresidir") == "Ankara"
+        assert bilgi.answer("Türkiye'nin başkentı neresidir") == "Ankara"
+    finally:
+        bilgi_tabani_kapat(hedef, depo, bilgi)
+
+    # İkinci ayıklama eski tablodaki atılan cevapları taşır
+    ikinci = ayiklanmis_yol(hedef)
+    ayikla(hedef, ikinci)
+    assert atilan_cevaplari_oku(ikinci) == atilan_cevaplari_oku(hedef)
@@ -0,0 +1,108 @@
+import codecs
+import json
+
+import pytest
+
+import yz_import
+from yz_import import ice_aktar
+from yz_store import json_yaz
+
+
+def _jsonl(yol, *satirlar):
+    with open(yol, "w", encoding="utf-8") as dosya:
+        for satir in satirlar:
+            dosya.write((satir if isinstance(satir, str) else json.dumps(satir, ensure_ascii=False)) + "\n")
+    return str(yol)
+
+
+def _kayitlar(yol):
+    with open(yol, encoding="utf-8") as dosya:
+        return {kayit["soru"]: kayit["cevap"] for kayit in json.load(dosya)["sorular"]}
+
+
+def test_tekrar_eden_soruda_ilk_yazim_son_cevap(tmp_path, json_yolu):
+    # Anahtar boşluk ve büyük/küçük harf farkını yok sayar (bkz. soru_anahtari)
+    json_yaz(json_yolu, {"sorular": [{"soru": "Merhaba", "cevap": "eski"}]})
+    birinci = _jsonl(
+        tmp_path / "a.jsonl",
+        {"soru": "Hava durumu", "cevap": "1"},
+        {"soru": "hava  durumu", "cevap": "2"},
+        {"soru": "merhaba", "cevap": "3"},
+    )
+    ikinci = _jsonl(
+        tmp_path / "b.jsonl",
+        {"soru": " HAVA DURUMU", "cevap": "4"},
+        {"soru": "Yeni soru", "cevap": "5"},
+        {"soru": "yeni soru", "cevap": "6"},
+    )
+    sonuc = ice_aktar([birinci, ikinci], json_yolu, isci_sayisi=1)
+    assert _kayitlar(json_yolu) == {"Merhaba": "3", "Hava durumu": "4", "Yeni soru": "6"}
+    assert (sonuc["okunan"], sonuc["atlanan"], sonuc["aktarilan"], sonuc["toplam"]) == (6, 0, 3, 3)
+
+
+def test_gecersiz_satirlar_atlanir(tmp_path, json_yolu):
+    jsonl = _jsonl(
+        tmp_path / "a.jsonl",
+        {"soru": "bir", "cevap": "1"},
+        "{bozuk",
+        "[1, 2]",
+        {"soru": 5, "cevap": "sayı"},
+        {"soru": "cevapsız"},
+        {"soru": "   ", "cevap": "boş"},
+        "",
+        {"soru": "iki", "cevap": "2"},
+    )
+    csv_yolu = tmp_path / "b.csv"
+    csv_yolu.write_text("soru,cevap\nüç,3\nkısa\n,boş\n\ndört,4\n", encoding="utf-8")
+    sonuc = ice_aktar([jsonl, str(csv_yolu)], json_yolu, isci_sayisi=1)
+    assert _kayitlar(json_yolu) == {"bir": "1", "iki": "2", "üç": "3", "dört": "4"}
+    # Boş satırlar kayıt sayılmaz
+    assert (sonuc["okunan"], sonuc["atlanan"]) == (11, 7)
+
+
+def test_csv_bom_ve_tirnakli_satir_sonu(tmp_path, json_yolu):
+    csv_yolu = tmp_path / "a.csv"
+    with open(csv_yolu, "wb") as dosya:
+        dosya.write(codecs.BOM_UTF8 + (
+            'no,soru,cevap\r\n'
+            '1,"çok\nsatırlı ""soru""","cevap, virgüllü\r\nve iki satır"\r\n'
+            '2,düz,cevap\r\n'
+        ).encode("utf-8"))
+    sonuc = ice_aktar([str(csv_yolu)], json_yolu, isci_sayisi=1)
+    assert _kayitlar(json_yolu) == {
+        'çok\nsatırlı "soru"': "cevap, virgüllü\r\nve iki satır",
+        "düz": "cevap",
+    }
+    assert sonuc["atlanan"] == 0
+
+
+def test_csv_basliginda_sutun_yoksa_hata(tmp_path, json_yolu):
+    csv_yolu = tmp_path / "a.csv"
+    csv_yolu.write_text("question,cevap\nbir,1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="'soru' ve 'cevap' sütunları yok"):
+        ice_aktar([str(csv_yolu)], json_yolu, isci_sayisi=1)
+    # Özel alan adlarıyla aynı dosya okunur
+    ice_aktar([str(csv_yolu)], json_yolu, isci_sayisi=1, soru_alani="question")
+    assert _kayitlar(json_yolu) == {"bir": "1"}
+
+
+def test_kucuk_parcalarla_cok_iscili_aktarim(tmp_path, json_yolu, monkeypatch):
+    # Satırlar parça sınırlarında bölünür, parçalar farklı işçilere gider
+    monkeypatch.setattr(yz_import, "PARCA", 37)
+    satirlar = []
+    beklenen = {}
+    for i in range(120):
+        soru = f"Soru {i % 45} ğüşiöç"
+        satirlar.append({"soru": soru if i < 45 else soru.upper(), "cevap": f"cevap {i}"})
+        beklenen.setdefault(soru, None)
+        beklenen[soru] = f"cevap {i}"
+    satirlar.insert(60, "{bozuk")
+    jsonl = _jsonl(tmp_path / "a.jsonl", *satirlar)
+    sonuc = ice_aktar([jsonl], json_yolu, isci_sayisi=3)
+    assert _kayitlar(json_yolu) == beklenen
+    assert (sonuc["okunan"], sonuc["atlanan"], sonuc["aktarilan"]) == (121, 1, 45)
+    # Tek işçi ve büyük parçayla aynı sonuç
+    monkeypatch.setattr(yz_import, "PARCA", 4 << 20)
+    tek = str(tmp_path / "tek.json")
+    ice_aktar([jsonl], tek, isci_sayisi=1)
+    assert _kayitlar(tek) == beklenen
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from yz_index import BKTree, LinearIndex, NgramIndex, StagedScorer, normalle
+
+
+def _ayni_sonuclar(indeks, dogru, sorgular, k):
+    for sorgu in sorgular:
+        assert indeks.top_k(sorgu, k) == dogru.top_k(sorgu, k), sorgu
+
+
+@pytest.mark.parametrize("k", [1, 3])
+def test_ngram_tam_taramayla_ayni(sentetik, k):
+    sorular, sorgular = sentetik
+    # Küçük aday sınırı kesmeyi her sorguda devreye sokar
+    _ayni_sonuclar(NgramIndex(sorular, aday_limiti=4), LinearIndex(sorular), sorgular, k)
+
+
+def test_ngram_silme_sonrasi_tam_taramayla_ayni(sentetik):
+    sorular, sorgular = sentetik
+    indeks = NgramIndex(sorular, aday_limiti=8)
+    dogru = LinearIndex(sorular)
+    for soru in sorular[::3]:
+        indeks.remove(soru)
+        dogru.remove(soru)
+    _ayni_sonuclar(indeks, dogru, sorgular, 3)
+
+
+def test_ngram_paylasilan_gram_olmadan_eslesir():
+    # "ace" ile "abcde" hiçbir iç 3-gram paylaşmaz ama oran 0.75'tir
+    indeks = NgramIndex(["abcde", "xyz"])
+    assert indeks.top_k("ace", 1) == LinearIndex(["abcde", "xyz"]).top_k("ace", 1)
+    assert indeks.best("ace") == "abcde"
+
+
+@pytest.mark.parametrize("k,cutoff", [(1, 0.6), (3, 0.6), (3, 0.8)])
+def test_bktree_tam_taramayla_ayni(sentetik, k, cutoff):
+    sorular, sorgular = sentetik
+    indeks, dogru = BKTree(sorular), LinearIndex(sorular)
+    for sorgu in sorgular:
+        assert indeks.top_k(sorgu, k, cutoff) == dogru.top_k(sorgu, k, cutoff), sorgu
+
+
+def test_bktree_esige_yakin_uzak_eslesmeyi_bulur():
+    # Mesafe 2 eski 0.2*len yarıçapını aşar ama oran 8/12 eşiği geçer
+    sorular = ["abcdef", "zzzzzzzzzzzz"]
+    indeks = BKTree(sorular)
+    assert indeks.top_k("abxyef", 1) == LinearIndex(sorular).top_k("abxyef", 1)
+    assert indeks.best("abxyef") == "abcdef"
+
+
+def test_normalle_turkce():
+    assert normalle("NASILSIN?") == normalle("nasılsın") == "nasilsin"
+    assert normalle("İstanbul") == "istanbul"
+
+
+def test_puanlayici_sayaclari_eszamanli_kaybolmaz():
+    puanlayici = StagedScorer()
+    adaylar = [(normalle(soru), soru) for soru in ("merhaba", "nasılsın", "hava")]
+
+    def sorgula():
+        for _ in range(2000):
+            puanlayici.top_k("merhaba", adaylar, 1)
+
+    is_parcaciklari = [threading.Thread(target=sorgula) for _ in range(4)]
+    for is_parcacigi in is_parcaciklari:
+        is_parcacigi.start()
+    for is_parcacigi in is_parcaciklari:
+        is_parcacigi.join()
+    sayaclar, _ = puanlayici.ozet()
+    assert sayaclar["sorgu"] == 8000
+    assert sayaclar["aday"] == 3 * 8000
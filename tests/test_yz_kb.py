@@ -0,0 +1,165 @@
+import threading
+
+import pytest
+
+from yz_cache import onbellek_olustur
+from yz_kb import CompactRecords, ConcurrentKnowledgeBase
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, json_yaz
+
+
+def _veritabani(yol):
+    json_yaz(yol, {"sorular": [
+        {"soru": "merhaba", "cevap": "selam"},
+        {"soru": "nasılsın", "cevap": "iyiyim"},
+    ]})
+
+
+def test_eszamanli_ogretme_ve_cevaplama(json_yolu):
+    _veritabani(json_yolu)
+    depo, bilgi = bilgi_tabani_ac(json_yolu, eszamanli=True)
+    bilgi.cache = onbellek_olustur(64)
+    hatalar = []
+    dur = threading.Event()
+
+    def ogret(no):
+        try:
+            for i in range(50):
+                soru = f"soru {no} {i}"
+                bilgi.teach(soru, f"cevap {no} {i}")
+                # Öğretme döndüğünde sonucu her sorguda görünür
+                assert bilgi.respond(soru)[1] == f"cevap {no} {i}"
+        except Exception as hata:
+            hatalar.append(hata)
+
+    def sor():
+        try:
+            while not dur.is_set():
+                assert bilgi.respond("merhaba")[1] in ("selam", "günaydın")
+                bilgi.top_k("soru 1", 3)
+        except Exception as hata:
+            hatalar.append(hata)
+
+    ogretenler = [threading.Thread(target=ogret, args=(no,)) for no in range(4)]
+    soranlar = [threading.Thread(target=sor) for _ in range(3)]
+    for is_parcacigi in soranlar + ogretenler:
+        is_parcacigi.start()
+    bilgi.teach("merhaba", "günaydın")
+    for is_parcacigi in ogretenler:
+        is_parcacigi.join()
+    dur.set()
+    for is_parcacigi in soranlar:
+        is_parcacigi.join()
+
+    assert not hatalar
+    assert len(bilgi) == 2 + 4 * 50
+    assert bilgi.respond("merhaba")[1] == "günaydın"
+    bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    try:
+        assert len(bilgi) == 2 + 4 * 50
+        assert bilgi.answer("soru 3 49") == "cevap 3 49"
+        assert bilgi.answer("merhaba") == "günaydın"
+    finally:
+        bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+
+def test_kuyruktaki_ogretmeler_partiyle_yazilir(json_yolu):
+    _veritabani(json_yolu)
+    depo, bilgi = bilgi_tabani_ac(json_yolu, eszamanli=True)
+    yazilan = []
+    append_many = depo.append_many
+    depo.append_many = lambda satirlar: (yazilan.append(len(satirlar)), append_many(satirlar))
+
+    # Yazıcı ilk partiyi yazarken kuyruk dolar
+    with bilgi._rw.write():
+        gelecekler = [bilgi.submit_teach(f"soru {i}", f"cevap {i}") for i in range(100)]
+        gelecekler.append(bilgi.submit_forget("merhaba"))
+    assert [gelecek.result()["soru"] for gelecek in gelecekler][-1] == "merhaba"
+    assert sum(yazilan) == 101
+    assert len(yazilan) < 10
+    assert "merhaba" not in bilgi and "soru 99" in bilgi
+    bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+
+def test_kapatma_kuyruktakileri_yazar(json_yolu):
+    _veritabani(json_yolu)
+    depo, bilgi = bilgi_tabani_ac(json_yolu, eszamanli=True)
+    assert isinstance(bilgi, ConcurrentKnowledgeBase)
+    for i in range(20):
+        bilgi.submit_teach(f"soru {i}", f"cevap {i}")
+    bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    try:
+        assert bilgi.answer("soru 19") == "cevap 19"
+    finally:
+        bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+
+def _paralel_listeler_tutarli(kayitlar):
+    assert len(kayitlar._sorular) == len(kayitlar._cevaplar)
+    canli = set(kayitlar._idler.values())
+    for kimlik, (soru, cevap) in enumerate(zip(kayitlar._sorular, kayitlar._cevaplar)):
+        # Silinen kimliklerin yerinde iki listede de None kalır
+        assert (soru is None) == (cevap is None) == (kimlik not in canli)
+    assert set(kayitlar._ekler) <= canli
+
+
+def test_sikistirilmis_kayitlarda_kimlikler_kararli():
+    kayitlar = CompactRecords(
+        (f"s{i}", {"soru": f"S{i}", "cevap": f"c{i}"}) for i in range(6))
+    kimlikler = {anahtar: kayitlar.id_of(anahtar) for anahtar in kayitlar}
+    assert sorted(kimlikler.values()) == list(range(6))
+
+    kayitlar["s2"] = {"soru": "S2", "cevap": "yeni", "ttl": 5}
+    assert kayitlar.id_of("s2") == kimlikler["s2"]
+
+    del kayitlar["s1"]
+    del kayitlar["s4"]
+    assert kayitlar.id_of("s1") is None and "s4" not in kayitlar
+    for kimlik in (kimlikler["s1"], kimlikler["s4"]):
+        with pytest.raises(KeyError):
+            kayitlar.by_id(kimlik)
+    # Yeniden eklenen kayıt yeni kimlik alır, eskisi boş kalır
+    kayitlar["s1"] = {"soru": "S1", "cevap": "tekrar"}
+    assert kayitlar.id_of("s1") == 6
+    with pytest.raises(KeyError):
+        kayitlar.by_id(kimlikler["s1"])
+    for anahtar in ("s0", "s2", "s3", "s5"):
+        assert kayitlar.id_of(anahtar) == kimlikler[anahtar]
+        assert kayitlar.by_id(kimlikler[anahtar]) == kayitlar[anahtar]
+    assert kayitlar.by_id(6) == {"soru": "S1", "cevap": "tekrar"}
+    with pytest.raises(KeyError):
+        kayitlar.by_id(7)
+    _paralel_listeler_tutarli(kayitlar)
+
+
+def test_sikistirilmis_kayitlar_silmeden_sonra_tutarli():
+    kayitlar = CompactRecords()
+    beklenen = {}
+    for i in range(40):
+        anahtar = f"k{i % 25}"
+        if i % 3 == 2 and anahtar in beklenen:
+            del kayitlar[anahtar]
+            del beklenen[anahtar]
+            continue
+        kayit = {"soru": anahtar if i % 2 else anahtar.upper(), "cevap": f"c{i}"}
+        if i % 4 == 0:
+            kayit["ttl"] = i
+            kayit["kaynak"] = "test"
+        kayitlar[anahtar] = kayit
+        beklenen[anahtar] = kayit
+        _paralel_listeler_tutarli(kayitlar)
+
+    assert len(kayitlar) == len(beklenen)
+    assert dict(kayitlar.items()) == beklenen
+    assert sorted(kayitlar.questions()) == sorted(k["soru"] for k in beklenen.values())
+    assert all(kayitlar.question(a) == k["soru"] for a, k in beklenen.items())
+    assert sorted(k["ttl"] for k in kayitlar.expiring()) == sorted(
+        k["ttl"] for k in beklenen.values() if "ttl" in k)
+    # Ek alan taşımayan güncelleme eski ekleri bırakmaz
+    anahtar = next(a for a, k in beklenen.items() if "ttl" in k)
+    kayitlar[anahtar] = {"soru": anahtar, "cevap": "düz"}
+    assert kayitlar[anahtar] == {"soru": anahtar, "cevap": "düz"}
+    _paralel_listeler_tutarli(kayitlar)
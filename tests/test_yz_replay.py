@@ -0,0 +1,28 @@
+from yz_kb import KnowledgeBase
+from yz_querylog import olcerek_cevapla
+from yz_replay import tekrar_oynat
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, json_yaz
+
+
+def test_toplam_normallestirmeyi_icerir():
+    bilgi = KnowledgeBase([{"soru": "merhaba", "cevap": "selam"}])
+    sonuc, satir = olcerek_cevapla(bilgi, "Merhaba!" * 200)
+    sureler = satir["sureler_ms"]
+    assert sureler["toplam"] >= sureler["normal"]
+    assert sureler["toplam"] >= sureler["puanlama"]
+
+
+def test_tekrar_farklari_bulur(json_yolu):
+    json_yaz(json_yolu, {"sorular": [{"soru": "merhaba", "cevap": "selam"}]})
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    satirlar = [olcerek_cevapla(bilgi, soru)[1] for soru in ("merhaba", "nasılsın")]
+    bilgi.teach("nasılsın", "iyiyim")
+    bilgi.teach("merhaba", "günaydın")
+    bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+    farklar = []
+    ozet = tekrar_oynat(satirlar, json_yolu, fark_yazici=farklar.append)
+    assert ozet["sorgu"] == 2
+    assert ozet["farklar"]["cevap_degisti"] == 1
+    assert ozet["farklar"]["yeni_eslesme"] == 1
+    assert [fark["soru"] for fark in farklar] == ["merhaba", "nasılsın"]
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+
+from yz_service import QueryService
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, json_yaz
+
+
+@pytest.fixture
+def hizmet(json_yolu, tmp_path):
+    """Arka planda çalışan hizmet: (TCP portu, Unix soketi yolu)"""
+    json_yaz(json_yolu, {"sorular": [
+        {"soru": "merhaba", "cevap": "selam"},
+        {"soru": "nasılsın", "cevap": "iyiyim"},
+    ]})
+    depo, bilgi = bilgi_tabani_ac(json_yolu, eszamanli=True)
+    servis = QueryService(bilgi, isci_sayisi=2)
+    soket = str(tmp_path / "yz.sock")
+    dongu = asyncio.new_event_loop()
+    hazir = threading.Event()
+    adresler = []
+
+    def dinlemede(sunucular):
+        adresler.extend(sunucular[1].sockets[0].getsockname()[:2])
+        hazir.set()
+
+    gorev = dongu.create_task(servis.serve(soket, port=0, hazir=dinlemede))
+
+    def calistir():
+        asyncio.set_event_loop(dongu)
+        try:
+            dongu.run_until_complete(gorev)
+        except asyncio.CancelledError:
+            pass
+
+    is_parcacigi = threading.Thread(target=calistir, daemon=True)
+    is_parcacigi.start()
+    assert hazir.wait(10)
+    try:
+        yield adresler[1], soket
+    finally:
+        dongu.call_soon_threadsafe(gorev.cancel)
+        is_parcacigi.join(10)
+        dongu.close()
+        servis.close()
+        bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+
+def _baglan(port):
+    baglanti = socket.create_connection(("127.0.0.1", port), timeout=10)
+    return baglanti, baglanti.makefile("rb")
+
+
+def _http_cevabi(dosya):
+    durum = int(dosya.readline().split()[1])
+    basliklar = {}
+    while True:
+        satir = dosya.readline().decode("latin-1")
+        if not satir.strip():
+            break
+        ad, _, deger = satir.partition(":")
+        basliklar[ad.strip().lower()] = deger.strip()
+    govde = dosya.read(int(basliklar["content-length"]))
+    return durum, basliklar, json.loads(govde)
+
+
+def _http_istegi(yontem, yol, govde=b"", ek=""):
+    return (f"{yontem} {yol} HTTP/1.1\r\nHost: yerel\r\n"
+            f"Content-Length: {len(govde)}\r\n{ek}\r\n").encode("latin-1") + govde
+
+
+def test_satir_istekleri_sirayla_ve_id_ile_doner(hizmet):
+    _, soket_yolu = hizmet
+    istekler = [
+        {"id": i, "islem": "match", "soru": soru}
+        for i, soru in enumerate(["merhaba", "nasılsın", "yok böyle bir soru"] * 10)
+    ]
+    istekler.insert(5, {"id": "hata", "islem": "uc"})
+    with socket.socket(socket.AF_UNIX) as baglanti:
+        baglanti.settimeout(10)
+        baglanti.connect(soket_yolu)
+        # Cevap beklemeden hepsi tek seferde gönderilir; araya bozuk satır girer
+        govde = b"".join(json.dumps(istek).encode("utf-8") + b"\n" for istek in istekler)
+        baglanti.sendall(govde + b"{bozuk\n")
+        baglanti.shutdown(socket.SHUT_WR)
+        cevaplar = [json.loads(satir) for satir in baglanti.makefile("rb")]
+
+    assert [cevap.get("id") for cevap in cevaplar] == [istek["id"] for istek in istekler] + [None]
+    for istek, cevap in zip(istekler, cevaplar):
+        if istek["id"] == "hata":
+            assert not cevap["ok"] and "Bilinmeyen işlem" in cevap["hata"]
+        elif istek["soru"] == "yok böyle bir soru":
+            assert cevap["ok"] and cevap["eslesme"] is None
+        else:
+            assert cevap["eslesme"] == istek["soru"]
+    assert not cevaplar[-1]["ok"] and "Geçersiz JSON" in cevaplar[-1]["hata"]
+
+
+def test_http_bir_baglantida_birden_cok_istek(hizmet):
+    port, _ = hizmet
+    baglanti, dosya = _baglan(port)
+    with baglanti, dosya:
+        # İkisi cevap beklenmeden gönderilir
+        baglanti.sendall(
+            _http_istegi("POST", "/match", json.dumps({"soru": "merhaba"}).encode("utf-8"))
+            + _http_istegi("POST", "/top_k", json.dumps([{"soru": "nasılsın", "k": 1}]).encode("utf-8"))
+        )
+        durum, basliklar, veri = _http_cevabi(dosya)
+        assert durum == 200 and basliklar["connection"] == "keep-alive"
+        assert veri["cevap"] == "selam"
+        durum, _, veri = _http_cevabi(dosya)
+        assert durum == 200 and veri[0]["sonuclar"][0]["eslesme"] == "nasılsın"
+
+        baglanti.sendall(_http_istegi("GET", "/stats", ek="Connection: close\r\n"))
+        durum, basliklar, veri = _http_cevabi(dosya)
+        assert durum == 200 and basliklar["connection"] == "close"
+        assert veri["kayit"] == 2 and veri["istek"] == 3
+        assert dosya.read() == b""
+
+
+def test_http_hatali_govde_ve_bilinmeyen_yol(hizmet):
+    port, _ = hizmet
+    baglanti, dosya = _baglan(port)
+    with baglanti, dosya:
+        baglanti.sendall(_http_istegi("POST", "/match", b'{"soru": '))
+        durum, _, veri = _http_cevabi(dosya)
+        assert durum == 400 and "Geçersiz JSON" in veri["hata"]
+        baglanti.sendall(_http_istegi("POST", "/yok", b"{}"))
+        durum, _, veri = _http_cevabi(dosya)
+        assert durum == 404 and not veri["ok"]
+        baglanti.sendall(_http_istegi("GET", "/match"))
+        durum, _, _ = _http_cevabi(dosya)
+        assert durum == 405
+        # Hatalardan sonra bağlantı kullanılmaya devam eder
+        baglanti.sendall(_http_istegi("POST", "/match", b'{"soru": "merhaba"}'))
+        assert _http_cevabi(dosya)[2]["cevap"] == "selam"
+
+
+def test_http_parcali_govde(hizmet):
+    port, _ = hizmet
+    baglanti, dosya = _baglan(port)
+    with baglanti, dosya:
+        govde = json.dumps({"soru": "nasılsın"}, ensure_ascii=False).encode("utf-8")
+        parcali = b"".join(
+            b"%x;uzanti=1\r\n%s\r\n" % (len(govde[i:i + 5]), govde[i:i + 5])
+            for i in range(0, len(govde), 5)
+        ) + b"0\r\nX-Son: 1\r\n\r\n"
+        istek = b"POST /match HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+        # Parçalı gövdeden sonra aynı bağlantıdaki istek doğru okunur
+        baglanti.sendall(istek + parcali + _http_istegi("POST", "/match", b'{"soru": "merhaba"}'))
+        assert _http_cevabi(dosya)[2]["cevap"] == "iyiyim"
+        assert _http_cevabi(dosya)[2]["cevap"] == "selam"
+
+        baglanti.sendall(b"POST /match HTTP/1.1\r\nTransfer-Encoding: gzip, chunked\r\n\r\n")
+        durum, basliklar, _ = _http_cevabi(dosya)
+        assert durum == 501 and basliklar["connection"] == "close"
+        assert dosya.read() == b""
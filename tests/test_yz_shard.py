@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from yz_import import ice_aktar
+from yz_index import ESLESTIRICILER, PUANLAYICI, eslestirici_adi
+from yz_shard import HAVUZLAR, PARCALANAN_ESLESTIRICILER, ShardedIndex, parca_no
+from yz_store import (bilgi_tabani_ac, bilgi_tabani_kapat, depo_ac, depo_tasi, indeks_yukle,
+                      json_yaz)
+
+
+@pytest.fixture(scope="module")
+def veritabanlari(sentetik, tmp_path_factory):
+    sorular, _ = sentetik
+    dizin = tmp_path_factory.mktemp("parcali")
+    tek = str(dizin / "database.json")
+    parcali = str(dizin / "database.shards.json")
+    json_yaz(tek, {"sorular": [{"soru": soru, "cevap": str(i)} for i, soru in enumerate(sorular)]})
+    depo_tasi(tek, parcali, parca=4)
+    return tek, parcali
+
+
+@pytest.mark.parametrize("eslestirici", sorted(ESLESTIRICILER))
+def test_parcali_tek_indeksle_ayni(sentetik, veritabanlari, eslestirici):
+    if eslestirici in ("tfidf", "lsh"):
+        pytest.importorskip("numpy")
+    _, sorgular = sentetik
+    tek, parcali = veritabanlari
+    depo, bilgi = bilgi_tabani_ac(tek, eslestirici)
+    parcali_depo, parcali_bilgi = bilgi_tabani_ac(parcali, eslestirici)
+    try:
+        if eslestirici in PARCALANAN_ESLESTIRICILER:
+            assert eslestirici_adi(parcali_bilgi.indeks) == f"{eslestirici}-4p"
+        else:
+            assert eslestirici_adi(parcali_bilgi.indeks) == eslestirici
+        for sorgu in sorgular[::2]:
+            assert parcali_bilgi.top_k(sorgu, 3) == bilgi.top_k(sorgu, 3), sorgu
+    finally:
+        bilgi_tabani_kapat(parcali, parcali_depo, parcali_bilgi)
+        bilgi_tabani_kapat(tek, depo, bilgi)
+
+
+def test_parcalanamayan_eslestirici_reddedilir():
+    with pytest.raises(ValueError):
+        ShardedIndex("tfidf", 4)
+
+
+def test_ice_aktarilan_parcali_indeks_acilista_kullanilir(tmp_path):
+    kaynak = tmp_path / "derlem.jsonl"
+    with open(kaynak, "w", encoding="utf-8") as dosya:
+        for i in range(50):
+            dosya.write(json.dumps({"soru": f"soru {i}", "cevap": f"cevap {i}"}) + "\n")
+    hedef = str(tmp_path / "database.shards.json")
+    depo_ac(hedef, parca=4).close()
+
+    ice_aktar([str(kaynak)], hedef, isci_sayisi=1, eslestiriciler=["ngram", "linear"])
+    kayitli = indeks_yukle(hedef, "ngram-4p")
+    assert isinstance(kayitli, ShardedIndex) and len(kayitli) == 50
+    assert indeks_yukle(hedef, "ngram") is None
+    assert all(parca_no(soru, 4) == no
+               for no, parca in enumerate(kayitli.parcalar) for soru in parca)
+
+    depo, bilgi = bilgi_tabani_ac(hedef)
+    try:
+        assert eslestirici_adi(bilgi.indeks) == "ngram-4p"
+        assert bilgi.answer("soru 7") == "cevap 7"
+    finally:
+        bilgi_tabani_kapat(hedef, depo, bilgi)
+
+
+@pytest.mark.parametrize("eslestirici", PARCALANAN_ESLESTIRICILER)
+def test_surec_havuzu_asama_sayaclarini_getirir(sentetik, eslestirici):
+    sorular, sorgular = sentetik
+    sayilar = {}
+    for havuz in HAVUZLAR:
+        indeks = ShardedIndex(eslestirici, 3, havuz, sorular)
+        try:
+            # Havuzlar kurulduktan sonra eklenen soru işçiye de gider
+            indeks.top_k(sorgular[0])
+            indeks.add("sonradan eklenen soru")
+            PUANLAYICI.reset()
+            sonuclar = [indeks.top_k(sorgu, 3) for sorgu in sorgular[:20]]
+            sonuclar.append(indeks.top_k_many(["sonradan eklenen soru"] + sorgular[20:30], 2))
+            sayaclar, sure = PUANLAYICI.ozet()
+        finally:
+            indeks.close()
+        assert sayaclar["sorgu"] > 0 and sure > 0
+        sayilar[havuz] = sonuclar, sayaclar
+    assert sayilar["process"] == sayilar["thread"]
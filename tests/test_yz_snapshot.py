@@ -0,0 +1,124 @@
+import struct
+
+import pytest
+
+from yz_kb import CompactRecords
+from yz_snapshot import (BASLIK, SIHIR, SURUM, AnlikKayitlar, anlik_indeks_yaz, anlik_indeksleri,
+                         anlik_oku, anlik_yaz, kaynak_kimligi)
+from yz_store import JournalStore, json_yaz
+
+KAYITLAR = [
+    ("merhaba", {"soru": "Merhaba", "cevap": "selam"}),
+    ("şehir", {"soru": "şehir", "cevap": "İstanbul 🌉", "kaynak": "gemini", "zaman": 12.5,
+               "ttl": 60}),
+    ("boş", {"soru": "boş", "cevap": ""}),
+    ("vekil", {"soru": "vekil", "cevap": "\ud800 yarım"}),
+]
+
+
+def _kayitlar():
+    return CompactRecords(KAYITLAR)
+
+
+def test_yazilan_okunanla_ayni(tmp_path):
+    yol = str(tmp_path / "database.snapshot.bin")
+    assert anlik_yaz(yol, _kayitlar(), (123, 456), {"ngram": b"ham"})
+    kimlik, kayitlar = anlik_oku(yol)
+    assert kimlik == (123, 456)
+    assert isinstance(kayitlar, AnlikKayitlar)
+    # Cevaplar ilk erişime kadar çözülmez
+    assert kayitlar._cevaplar == [None] * len(KAYITLAR)
+    assert list(kayitlar.items()) == KAYITLAR
+    assert [kayitlar.id_of(anahtar) for anahtar, _ in KAYITLAR] == [0, 1, 2, 3]
+    assert anlik_indeksleri(yol) == {"ngram": b"ham"}
+
+
+def test_bos_kayitlar(tmp_path):
+    yol = str(tmp_path / "bos.bin")
+    assert anlik_yaz(yol, CompactRecords(), (0, -1))
+    kimlik, kayitlar = anlik_oku(yol)
+    assert kimlik == (0, -1) and len(kayitlar) == 0
+
+
+def test_ayirici_iceren_soru_yazilmaz(tmp_path):
+    yol = str(tmp_path / "database.snapshot.bin")
+    assert not anlik_yaz(yol, CompactRecords([("a\x00b", {"soru": "a\x00b", "cevap": "x"})]), (1, 1))
+    assert anlik_oku(yol) is None
+
+
+def test_indeks_bolumu_kayitlara_dokunmadan_degisir(tmp_path):
+    yol = str(tmp_path / "database.snapshot.bin")
+    anlik_yaz(yol, _kayitlar(), (1, 2), {"ngram": b"eski"})
+    assert anlik_indeks_yaz(yol, "ngram", b"yeni" * 1000, parca=7)
+    assert anlik_indeks_yaz(yol, "bktree", b"agac")
+    assert anlik_indeksleri(yol) == {"ngram": b"yeni" * 1000, "bktree": b"agac"}
+    kimlik, kayitlar = anlik_oku(yol)
+    assert kimlik == (1, 2) and list(kayitlar.items()) == KAYITLAR
+    assert not anlik_indeks_yaz(str(tmp_path / "yok.bin"), "ngram", b"x")
+
+
+def _bozuk_baslik(yol, sihir=SIHIR, surum=SURUM):
+    with open(yol, "r+b") as dosya:
+        baslik = list(BASLIK.unpack(dosya.read(BASLIK.size)))
+        baslik[0], baslik[1] = sihir, surum
+        dosya.seek(0)
+        dosya.write(BASLIK.pack(*baslik))
+
+
+@pytest.mark.parametrize("boz", [
+    lambda yol: _bozuk_baslik(yol, surum=SURUM - 1),
+    lambda yol: _bozuk_baslik(yol, sihir=b"BASKASI\x00"),
+    lambda yol: open(yol, "ab").write(b"fazla"),
+    lambda yol: open(yol, "r+b").truncate(BASLIK.size + 3),
+    lambda yol: open(yol, "wb").close(),
+], ids=["surum", "sihir", "uzun", "kisa", "bos"])
+def test_bozuk_anlik_goruntu_okunmaz(tmp_path, boz):
+    yol = str(tmp_path / "database.snapshot.bin")
+    anlik_yaz(yol, _kayitlar(), (1, 2))
+    boz(yol)
+    assert anlik_oku(yol) is None
+    assert anlik_indeksleri(yol) == {}
+
+
+def _depo_kayitlari(yol):
+    depo = JournalStore(yol)
+    try:
+        return {kayit["soru"]: kayit["cevap"] for kayit in depo.load_records().values()}
+    finally:
+        depo.close()
+
+
+def _sahte_anlik(depo_yolu, kimlik):
+    depo = JournalStore(depo_yolu)
+    anlik_yaz(depo.anlik_yolu, CompactRecords([("sahte", {"soru": "sahte", "cevap": "eski"})]),
+              kimlik)
+    depo.close()
+    return depo.anlik_yolu
+
+
+def test_guncel_anlik_goruntu_kullanilir(json_yolu):
+    json_yaz(json_yolu, {"sorular": [{"soru": "merhaba", "cevap": "selam"}]})
+    _sahte_anlik(json_yolu, kaynak_kimligi(json_yolu))
+    # Kimlik tuttuğu sürece JSON ayrıştırılmaz
+    assert _depo_kayitlari(json_yolu) == {"sahte": "eski"}
+
+
+@pytest.mark.parametrize("fark", [(1, 0), (0, 1)], ids=["mtime", "boyut"])
+def test_eski_anlik_goruntude_jsona_donulur(json_yolu, fark):
+    json_yaz(json_yolu, {"sorular": [{"soru": "merhaba", "cevap": "selam"}]})
+    mtime, boyu = kaynak_kimligi(json_yolu)
+    anlik_yolu = _sahte_anlik(json_yolu, (mtime - fark[0], boyu + fark[1]))
+    assert _depo_kayitlari(json_yolu) == {"merhaba": "selam"}
+    # JSON'dan okunanlar yeni anlık görüntü olarak yazılır
+    kimlik, kayitlar = anlik_oku(anlik_yolu)
+    assert kimlik == kaynak_kimligi(json_yolu)
+    assert [kayit["soru"] for kayit in kayitlar.values()] == ["merhaba"]
+
+
+def test_surumu_farkli_anlik_goruntude_jsona_donulur(json_yolu):
+    json_yaz(json_yolu, {"sorular": [{"soru": "merhaba", "cevap": "selam"}]})
+    anlik_yolu = _sahte_anlik(json_yolu, kaynak_kimligi(json_yolu))
+    _bozuk_baslik(anlik_yolu, surum=1)
+    assert _depo_kayitlari(json_yolu) == {"merhaba": "selam"}
+    with open(anlik_yolu, "rb") as dosya:
+        assert struct.unpack_from("<8sI", dosya.read(12)) == (SIHIR, SURUM)
@@ -0,0 +1,83 @@
+import json
+
+from yz_store import SplitStore, bilgi_tabani_ac, bilgi_tabani_kapat, depo_tasi, json_yaz
+
+
+def _idx_satirlari(yol):
+    with open(yol, encoding="utf-8") as dosya:
+        return [json.loads(satir) for satir in dosya]
+
+
+def test_cevaplar_konumlarindan_okunur(tmp_path, json_yolu):
+    kayitlar = [
+        {"soru": "merhaba", "cevap": "selam"},
+        {"soru": "şehir", "cevap": "İstanbul çok güzel 🌉"},
+        {"soru": "boş", "cevap": ""},
+    ]
+    json_yaz(json_yolu, {"sorular": kayitlar})
+    yol = str(tmp_path / "database.idx.jsonl")
+    assert depo_tasi(json_yolu, yol) == 3
+
+    depo = SplitStore(yol)
+    try:
+        assert depo.cevap_yolu == str(tmp_path / "database.cevap.bin")
+        with open(depo.cevap_yolu, "rb") as dosya:
+            cevaplar = dosya.read()
+        # Bayt konumları çok baytlı UTF-8'de de doğrudur
+        for satir in _idx_satirlari(yol):
+            parca = cevaplar[satir["ofset"]:satir["ofset"] + satir["uzunluk"]]
+            assert parca.decode("utf-8") == depo.records()[satir["soru"]]["cevap"]
+        assert depo.load() == kayitlar
+    finally:
+        depo.close()
+
+
+def test_ogretme_silme_ve_yeniden_acma(tmp_path, json_yolu):
+    json_yaz(json_yolu, {"sorular": [{"soru": "merhaba", "cevap": "selam"},
+                                     {"soru": "nasılsın", "cevap": "iyiyim"}]})
+    yol = str(tmp_path / "database.idx.jsonl")
+    depo_tasi(json_yolu, yol)
+
+    depo, bilgi = bilgi_tabani_ac(yol)
+    bilgi.teach("MERHABA", "günaydın")
+    bilgi.teach("yeni", "ğüşıöç" * 100)
+    bilgi.forget("nasılsın")
+    # Dosya büyüdükten sonra eşlem yenilenir
+    assert bilgi.answer("yeni") == "ğüşıöç" * 100
+    assert bilgi.answer("merhaba") == "günaydın"
+    bilgi_tabani_kapat(yol, depo, bilgi)
+
+    depo, bilgi = bilgi_tabani_ac(yol)
+    try:
+        # Aynı anahtarın son satırı geçerli, ilk yazım kalır
+        kayit = bilgi.get("merhaba")
+        assert (kayit["soru"], kayit["cevap"], kayit["kaynak"]) == ("merhaba", "günaydın", "kullanici")
+        assert bilgi.answer("yeni") == "ğüşıöç" * 100
+        assert bilgi.answer("nasılsın") is None
+        assert len(bilgi) == 2
+        assert sorted(bilgi.indeks) == ["merhaba", "yeni"]
+    finally:
+        bilgi_tabani_kapat(yol, depo, bilgi)
+
+    # Silme de dizine satır olarak eklenir; eski cevaplar dosyada yetim kalır
+    satirlar = _idx_satirlari(yol)
+    assert {"soru": "nasılsın", "silindi": True} in satirlar
+    assert [satir["soru"] for satir in satirlar if "ofset" in satir].count("merhaba") == 2
+
+
+def test_yarim_dizin_satiri_onarilir(tmp_path):
+    yol = str(tmp_path / "database.idx.jsonl")
+    depo = SplitStore(yol)
+    depo.append({"soru": "merhaba", "cevap": "selam"})
+    depo.close()
+    with open(yol, "a", encoding="utf-8") as dosya:
+        dosya.write('{"soru": "yarım", "ofs')
+
+    depo = SplitStore(yol)
+    try:
+        assert depo.questions() == ["merhaba"]
+        depo.append({"soru": "sonraki", "cevap": "cevap"})
+        assert depo.records()["sonraki"]["cevap"] == "cevap"
+    finally:
+        depo.close()
+    assert [satir["soru"] for satir in _idx_satirlari(yol)] == ["merhaba", "sonraki"]
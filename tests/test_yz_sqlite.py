@@ -0,0 +1,69 @@
+import pytest
+
+from yz_index import LinearIndex
+from yz_sqlite import SqliteStore
+
+
+@pytest.fixture
+def depo(tmp_path):
+    depo = SqliteStore(str(tmp_path / "kb.db"))
+    yield depo
+    depo.close()
+
+
+def test_soru_aramasi_indeksi_kullanir(depo):
+    depo.import_records([{"soru": "Merhaba", "cevap": "selam"}])
+    plan = " ".join(str(satir) for satir in depo._baglanti.execute(
+        "EXPLAIN QUERY PLAN SELECT 1 FROM sorular WHERE soru = ?", ("Merhaba",)))
+    assert "sorular_soru" in plan
+    indeks = depo.index()
+    assert "Merhaba" in indeks
+    assert "merhaba" not in indeks
+
+
+def test_eski_veritabanina_indeks_eklenir(tmp_path):
+    import sqlite3
+    yol = str(tmp_path / "eski.db")
+    baglanti = sqlite3.connect(yol)
+    baglanti.execute("CREATE TABLE sorular (id INTEGER PRIMARY KEY, anahtar TEXT NOT NULL UNIQUE,"
+                     " soru TEXT NOT NULL, cevap TEXT NOT NULL)")
+    baglanti.execute("INSERT INTO sorular (anahtar, soru, cevap) VALUES ('ab', 'ab', 'x')")
+    baglanti.commit()
+    baglanti.close()
+
+    depo = SqliteStore(yol)
+    try:
+        adlar = {satir[0] for satir in depo._baglanti.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "sorular_soru" in adlar
+        assert depo.index().best("ab") == "ab"
+    finally:
+        depo.close()
+
+
+def test_kisa_sorguda_tum_kisa_sorular_puanlanir(depo):
+    # Aday sınırından çok kısa soru; eşleşen en sonda eklenir
+    sorular = [f"x{i}" for i in range(100)] + ["ab"]
+    depo.import_records([{"soru": soru, "cevap": soru} for soru in sorular])
+    indeks = depo.index()
+    indeks.aday_limiti = 8
+    for sorgu in ("ab", "a", "x5"):
+        assert indeks.top_k(sorgu, 3) == LinearIndex(sorular).top_k(sorgu, 3)
+
+
+def test_aday_sinirini_asan_uzun_sorularda_tam_taramayla_ayni(depo, sentetik):
+    sorular, sorgular = sentetik
+    depo.import_records([{"soru": soru, "cevap": soru} for soru in sorular])
+    indeks = depo.index()
+    # Küçük aday sınırı BM25'in dışarıda bıraktığı iyi eşleşmeleri ortaya çıkarır
+    indeks.aday_limiti = 4
+    dogru = LinearIndex(sorular)
+    for sorgu in sorgular:
+        for k in (1, 3):
+            assert indeks.top_k(sorgu, k) == dogru.top_k(sorgu, k), sorgu
+
+
+def test_trigram_paylasmayan_eslesme_bulunur(depo):
+    sorular = ["abcde", "xyz"]
+    depo.import_records([{"soru": soru, "cevap": soru} for soru in sorular])
+    assert depo.index().top_k("ace", 1) == LinearIndex(sorular).top_k("ace", 1)
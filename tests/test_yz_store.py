@@ -0,0 +1,161 @@
+import codecs
+import json
+import os
+
+import pytest
+
+from yz_store import JournalStore, bilgi_tabani_ac, bilgi_tabani_kapat, json_kayitlari_oku, json_yaz
+
+
+def _veritabani(yol, *ciftler):
+    json_yaz(yol, {"sorular": [{"soru": soru, "cevap": cevap} for soru, cevap in ciftler]})
+
+
+def test_gunluk_yeniden_acilista_uygulanir(json_yolu):
+    _veritabani(json_yolu, ("merhaba", "selam"), ("nasılsın", "iyiyim"))
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    bilgi.teach("Merhaba", "günaydın")
+    bilgi.teach("yeni soru", "yeni cevap")
+    bilgi.forget("nasılsın")
+    bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+    # JSON'a dokunulmaz, değişiklikler yalnızca günlüktedir
+    with open(json_yolu, encoding="utf-8") as dosya:
+        assert len(json.load(dosya)["sorular"]) == 2
+    assert os.path.exists(depo.gunluk_yolu)
+
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    try:
+        assert bilgi.answer("merhaba") == "günaydın"
+        # İlk öğretilen yazım kalır
+        assert bilgi.get("MERHABA")["soru"] == "merhaba"
+        assert bilgi.answer("yeni soru") == "yeni cevap"
+        assert bilgi.answer("nasılsın") is None
+        assert len(bilgi) == 2
+    finally:
+        bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+
+def test_yarim_kalan_son_satir_atlanir_ve_kesilir(json_yolu):
+    _veritabani(json_yolu, ("merhaba", "selam"))
+    depo = JournalStore(json_yolu)
+    depo.append({"soru": "tam satır", "cevap": "var"})
+    depo.close()
+    with open(depo.gunluk_yolu, "a", encoding="utf-8") as dosya:
+        dosya.write('{"soru": "yarım", "cev')
+    boyut = os.path.getsize(depo.gunluk_yolu)
+
+    depo = JournalStore(json_yolu)
+    try:
+        kayitlar = depo.load_records()
+        assert set(kayitlar) == {"merhaba", "tam satır"}
+        assert os.path.getsize(depo.gunluk_yolu) < boyut
+        # Sonraki ekleme bozuk satırın arkasına yazılmaz
+        depo.append({"soru": "sonraki", "cevap": "tamam"})
+        assert "sonraki" in depo.load_records()
+    finally:
+        depo.close()
+
+
+def test_esik_asilinca_gunluk_json_ile_birlestirilir(json_yolu):
+    _veritabani(json_yolu, ("merhaba", "selam"))
+    depo = JournalStore(json_yolu, sikistirma_esigi=3)
+    try:
+        depo.load_records()
+        for i in range(3):
+            depo.append({"soru": f"soru {i}", "cevap": str(i)})
+        depo.delete({"soru": "merhaba"})
+        depo.compact()
+        assert not os.path.exists(depo.gunluk_yolu)
+        assert not os.path.exists(depo.eski_gunluk_yolu)
+        with open(json_yolu, encoding="utf-8") as dosya:
+            sorular = {kayit["soru"]: kayit["cevap"] for kayit in json.load(dosya)["sorular"]}
+        assert sorular == {"soru 0": "0", "soru 1": "1", "soru 2": "2"}
+    finally:
+        depo.close()
+
+    depo = JournalStore(json_yolu)
+    try:
+        assert set(depo.load_records()) == {"soru 0", "soru 1", "soru 2"}
+    finally:
+        depo.close()
+
+
+def test_yarim_kalan_birlestirme_acilista_tamamlanir(json_yolu):
+    _veritabani(json_yolu, ("merhaba", "selam"))
+    depo = JournalStore(json_yolu)
+    depo.append({"soru": "taşınan", "cevap": "günlükte"})
+    depo.close()
+    # Birleştirme günlüğü taşıdıktan sonra süreç ölmüş gibi
+    os.replace(depo.gunluk_yolu, depo.eski_gunluk_yolu)
+
+    depo = JournalStore(json_yolu)
+    try:
+        assert set(depo.load_records()) == {"merhaba", "taşınan"}
+        assert not os.path.exists(depo.eski_gunluk_yolu)
+    finally:
+        depo.close()
+
+
+VERI = {
+    "baska": {"ic": [1, {"sorular": "değil"}], "x": "\"sorular\": ["},
+    "sorular": [
+        {"soru": "ka\"çış\\ ç\n\t\u0000", "cevap": "emoji 🌉 ve ğüşıöç",
+         "zaman": 12.345e+3, "ttl": -0.5, "ic": {"a": [1, 2, {"b": None}]}},
+        {"soru": "true", "cevap": "false", "n": True, "m": None, "s": 1234567},
+        "düz metin",
+        12.5,
+    ],
+    "son": 1.5e-7,
+}
+
+
+def _json_dosyasi(yol, veri, bom=False, **secenekler):
+    with open(yol, "wb") as dosya:
+        if bom:
+            dosya.write(codecs.BOM_UTF8)
+        dosya.write(json.dumps(veri, **secenekler).encode("utf-8"))
+
+
+@pytest.mark.parametrize("secenekler", [
+    {"ensure_ascii": False},
+    {"ensure_ascii": True, "indent": 2},
+    {"ensure_ascii": False, "separators": (",", ":")},
+], ids=["utf8", "kacisli", "sikisik"])
+def test_akis_her_parca_boyunda_json_load_ile_ayni(json_yolu, secenekler):
+    _json_dosyasi(json_yolu, VERI, **secenekler)
+    with open(json_yolu, encoding="utf-8") as dosya:
+        beklenen = json.load(dosya)["sorular"]
+    # Parça sınırı kaçışların, çok baytlı karakterlerin, sayıların ve
+    # "sorular" anahtarının her noktasına denk gelir
+    for parca in range(1, 48):
+        assert list(json_kayitlari_oku(json_yolu, parca=parca)) == beklenen, parca
+
+
+def test_akis_bom_ve_bos_dizi(json_yolu):
+    _json_dosyasi(json_yolu, {"sorular": [{"soru": "ı", "cevap": "i"}]}, bom=True)
+    assert list(json_kayitlari_oku(json_yolu, parca=1)) == [{"soru": "ı", "cevap": "i"}]
+    for veri in ({}, {"sorular": []}, {"baska": [1, 2]}):
+        _json_dosyasi(json_yolu, veri, indent=1)
+        assert list(json_kayitlari_oku(json_yolu, parca=2)) == []
+
+
+def test_akis_ilerleme_bildirir(json_yolu):
+    _json_dosyasi(json_yolu, {"sorular": [{"soru": str(i), "cevap": "x" * 50} for i in range(20)]})
+    bildirimler = []
+    kayitlar = list(json_kayitlari_oku(
+        json_yolu, lambda okunan, toplam, adet: bildirimler.append((okunan, toplam, adet)), parca=64))
+    assert len(kayitlar) == 20
+    # Son bildirim dosyanın tamamını ve bütün kayıtları gösterir
+    assert bildirimler[-1] == (os.path.getsize(json_yolu), os.path.getsize(json_yolu), 20)
+    assert all(okunan < toplam for okunan, toplam, _ in bildirimler[:-1])
+    assert [adet for _, _, adet in bildirimler] == sorted(adet for _, _, adet in bildirimler)
+
+
+@pytest.mark.parametrize("metin", ['{"sorular": [{"soru": "a"} {"soru": "b"}]}',
+                                   '{"sorular": [{"soru": "a"},', '["sorular"]'])
+def test_akis_bozuk_jsonda_hata_verir(json_yolu, metin):
+    with open(json_yolu, "w", encoding="utf-8") as dosya:
+        dosya.write(metin)
+    with pytest.raises(ValueError):
+        list(json_kayitlari_oku(json_yolu, parca=3))
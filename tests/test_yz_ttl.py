@@ -0,0 +1,97 @@
+import time
+
+from yz_cache import onbellek_olustur
+from yz_kb import ConcurrentKnowledgeBase, KnowledgeBase
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, json_yaz
+from yz_ttl import BASARISIZ_CEVAPLAR, NEGATIF_TTL, NegativeCache, Sweeper, suresi_doldu
+
+HATA = BASARISIZ_CEVAPLAR[0]
+
+
+def _kayitlar():
+    simdi = time.time()
+    return [
+        {"soru": "hava nasıl bugün", "cevap": "yağmurlu", "zaman": simdi - 100, "ttl": 10},
+        {"soru": "hava nasıl", "cevap": "güneşli"},
+        {"soru": "başkent neresi", "cevap": "Ankara", "zaman": simdi, "ttl": 3600},
+    ]
+
+
+def test_suresi_dolan_kayit_donmez_siradaki_gelir():
+    bilgi = KnowledgeBase(_kayitlar())
+    assert bilgi.respond("hava nasıl bugün")[:2] == ("hava nasıl", "güneşli")
+    assert [soru for soru, _, _ in bilgi.top_k("hava nasıl bugün", 3)] == ["hava nasıl"]
+    assert bilgi.respond("başkent neresi")[1] == "Ankara"
+
+
+def test_suresi_olan_sonuc_onbellege_girmez():
+    bilgi = KnowledgeBase(_kayitlar(), cache=onbellek_olustur(8))
+    bilgi.respond("başkent neresi")
+    bilgi.respond("hava nasıl")
+    assert ("baskent neresi", 0.6) not in bilgi.cache
+    assert ("hava nasil", 0.6) in bilgi.cache
+
+
+def test_basarisiz_cevap_kisa_omurludur():
+    negatif = NegativeCache()
+    assert negatif.is_failure(f"  {HATA}\n")
+    assert not negatif.is_failure("Ankara")
+    assert negatif.ttl_of(HATA) == NEGATIF_TTL
+    assert negatif.ttl_of(HATA, 5) == 5
+    assert negatif.ttl_of("Ankara") is None
+
+    bilgi = KnowledgeBase()
+    kayit = bilgi.teach("başkent neresi", HATA)
+    assert kayit["ttl"] == NEGATIF_TTL and kayit["kaynak"] == "kullanici"
+    assert bilgi.answer("başkent neresi") == HATA
+    assert suresi_doldu(kayit, kayit["zaman"] + NEGATIF_TTL, bilgi.negative)
+    # Yeniden öğretmek kısa ömrü kaldırır
+    assert "ttl" not in bilgi.teach("başkent neresi", "Ankara")
+
+
+def test_zamani_bilinmeyen_basarisiz_cevap_tam_taramada_silinir():
+    bilgi = KnowledgeBase([{"soru": "başkent neresi", "cevap": HATA},
+                           {"soru": "hava nasıl", "cevap": "güneşli"}])
+    assert bilgi.respond("başkent neresi") is None
+    assert bilgi.sweep() == 0
+    assert bilgi.sweep(tam=True) == 1
+    assert len(bilgi) == 1
+
+
+def test_supurme_depoya_yazilir(json_yolu):
+    json_yaz(json_yolu, {"sorular": _kayitlar()})
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    assert bilgi.expired() == ["hava nasıl bugün"]
+    assert bilgi.sweep() == 1
+    # Bir saat sonra ttl'i olan diğer kayıt da gider
+    assert bilgi.sweep(time.time() + 3601) == 1
+    bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+    depo, bilgi = bilgi_tabani_ac(json_yolu)
+    try:
+        assert [kayit["soru"] for kayit in bilgi] == ["hava nasıl"]
+    finally:
+        bilgi_tabani_kapat(json_yolu, depo, bilgi)
+
+
+def test_yeniden_ogretilen_kayit_supurulmez():
+    bilgi = KnowledgeBase(_kayitlar())
+    suresi_dolanlar = bilgi.expired()
+    bilgi.teach("hava nasıl bugün", "karlı")
+    assert bilgi._suresi_dolani_sil(suresi_dolanlar[0], time.time()) is None
+    assert bilgi.answer("hava nasıl bugün") == "karlı"
+
+
+def test_supurucu_arka_planda_siler():
+    bilgi = ConcurrentKnowledgeBase(_kayitlar() + [{"soru": "eski hata", "cevap": HATA}])
+    supurucu = Sweeper(bilgi, aralik=0.01).start()
+    try:
+        bitis = time.time() + 5
+        while supurucu.silinen < 2 and time.time() < bitis:
+            time.sleep(0.01)
+    finally:
+        supurucu.stop()
+        bilgi.close()
+    assert supurucu.hata is None
+    assert supurucu.silinen == 2
+    assert {kayit["soru"] for kayit in bilgi} == {"hava nasıl", "başkent neresi"}
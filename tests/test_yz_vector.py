@@ -0,0 +1,182 @@
+import pickle
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from yz_index import LinearIndex
+from yz_vector import LshIndex, TfidfIndex
+
+
+def _blok_boylari(indeks):
+    return [son - bas for bas, son, _ in indeks._bloklar]
+
+
+def test_eklemeler_ikili_sayac_gibi_birlesir(sentetik):
+    sorular, _ = sentetik
+    indeks = TfidfIndex(sorular[:8])
+    indeks.hazirla()
+    assert _blok_boylari(indeks) == [8]
+    for soru in sorular[8:13]:
+        indeks.add(soru)
+    assert _blok_boylari(indeks) == [8, 4, 1]
+    # Ekler ana bloğa ulaşınca IDF yeniden hesaplanıp baştan kurulur
+    for soru in sorular[13:16]:
+        indeks.add(soru)
+    assert _blok_boylari(indeks) == [16]
+
+
+def test_artimli_kurulum_bastan_kurulumla_ayni(sentetik):
+    sorular, sorgular = sentetik
+    bastan = TfidfIndex(sorular[:256])
+    bastan.hazirla()
+    artimli = TfidfIndex(sorular[:128])
+    artimli.hazirla()
+    for soru in sorular[128:256]:
+        artimli.add(soru)
+    assert _blok_boylari(artimli) == [256]
+    assert np.allclose(artimli._idf[:len(bastan._idf)], bastan._idf)
+    for sorgu in sorgular[:40]:
+        assert artimli.top_k(sorgu, 3) == bastan.top_k(sorgu, 3)
+
+
+def test_silme_idf_ve_sonuclari_gunceller(sentetik):
+    sorular, sorgular = sentetik
+    indeks = TfidfIndex(sorular[:200])
+    indeks.hazirla()
+    silinenler = set(sorular[:150:2])
+    for soru in silinenler:
+        indeks.remove(soru)
+    assert len(indeks.sorular) == 200
+    for sorgu in sorgular[:40]:
+        assert not {aday for aday, _ in indeks.top_k(sorgu, 5, 0.0)} & silinenler
+    # Silinenler canlıları geçince sıkıştırılıp kalanların IDF'siyle kurulur
+    silinenler |= set(sorular[150:200:2]) | {sorular[1]}
+    for soru in sorular[150:200:2] + [sorular[1]]:
+        indeks.remove(soru)
+    kalanlar = [soru for soru in sorular[:200] if soru not in silinenler]
+    assert list(indeks) == kalanlar and len(indeks.sorular) == len(kalanlar)
+    dogru = TfidfIndex(kalanlar)
+    dogru.hazirla()
+    # Sözlük küçülmez; ortak n-gram'ların IDF'si aynıdır
+    ortak = list(dogru._sozluk)
+    assert np.allclose(indeks._idf[[indeks._sozluk[gram] for gram in ortak]],
+                       dogru._idf[[dogru._sozluk[gram] for gram in ortak]])
+    for sorgu in sorgular[:40]:
+        assert indeks.top_k(sorgu, 3) == dogru.top_k(sorgu, 3)
+
+
+def test_yeniden_puanlama_aday_sinirina_uyar(sentetik):
+    sorular, sorgular = sentetik
+    tam = TfidfIndex(sorular, aday_limiti=len(sorular))
+    dogru = LinearIndex(sorular)
+    tek = TfidfIndex(sorular, aday_limiti=1)
+    kosinus = TfidfIndex(sorular, yeniden_puanla=False)
+    for sorgu in sorgular[:40]:
+        # Tüm sorular aday olunca difflib puanlaması tam taramayla aynıdır
+        assert tam.top_k(sorgu, 3) == dogru.top_k(sorgu, 3)
+        assert len(tek.top_k(sorgu, 3, 0.0)) <= 1
+        assert set(tek.candidates(sorgu)) <= set(tam.candidates(sorgu))
+        assert all(0.3 <= skor <= 1.0 + 1e-9 for _, skor in kosinus.top_k(sorgu, 3, 0.3))
+
+
+def test_sorgular_indeksi_degistirmez(sentetik):
+    sorular, sorgular = sentetik
+    indeks = TfidfIndex(sorular)
+    kurulum = []
+    tam_kur = indeks._tam_kur
+    indeks._tam_kur = lambda: (kurulum.append(1), tam_kur())
+    beklenen = [TfidfIndex(sorular).top_k(sorgu, 3) for sorgu in sorgular]
+    sonuclar = {}
+
+    def sor(no):
+        sonuclar[no] = [indeks.top_k(sorgu, 3) for sorgu in sorgular]
+
+    # Kurulmamış indekse aynı anda gelen sorgular matrisi bir kez kurar
+    is_parcaciklari = [threading.Thread(target=sor, args=(no,)) for no in range(4)]
+    for is_parcacigi in is_parcaciklari:
+        is_parcacigi.start()
+    for is_parcacigi in is_parcaciklari:
+        is_parcacigi.join()
+    assert len(kurulum) == 1
+    assert all(sonuc == beklenen for sonuc in sonuclar.values())
+
+    idf, bloklar = indeks._idf, list(indeks._bloklar)
+    indeks.top_k_many(sorgular, 3)
+    assert indeks._idf is idf and indeks._bloklar == bloklar
+
+
+def test_onbellege_yazilabilir(sentetik):
+    sorular, sorgular = sentetik
+    indeks = TfidfIndex(sorular[:100])
+    indeks.hazirla()
+    kopya = pickle.loads(pickle.dumps(indeks))
+    for hedef in (indeks, kopya):
+        hedef.add(sorular[100])
+    for sorgu in sorgular[:20]:
+        assert kopya.top_k(sorgu, 3) == indeks.top_k(sorgu, 3)
+
+
+LSH_SORULARI = [
+    "GameLoop ayarları nelerdir",
+    "Bana PUBG için ayar ver",
+    "Türkiye'nin başkenti neresidir",
+    "İstanbul boğazı ne kadar uzun",
+    "Python ile dosya nasıl okunur",
+    "Hava durumu yarın nasıl olacak",
+]
+
+
+@pytest.mark.parametrize("sorgu, beklenen", [
+    ("Bana GameLoop için ayar ver", "GameLoop ayarları nelerdir"),
+    ("nelerdir GameLoop ayarları", "GameLoop ayarları nelerdir"),
+    ("başkenti Türkiye'nin neresidir acaba", "Türkiye'nin başkenti neresidir"),
+    ("dosya Python ile nasıl okunur", "Python ile dosya nasıl okunur"),
+    ("yarın hava durumu nasıl olacak", "Hava durumu yarın nasıl olacak"),
+])
+def test_lsh_sirasi_degisen_sorguyu_bulur(sorgu, beklenen):
+    indeks = LshIndex(LSH_SORULARI)
+    assert indeks.best(sorgu, cutoff=0.3) == beklenen
+
+
+def _kovadaki_idler(indeks):
+    return {i for kovalar in indeks._kovalar for kova in kovalar.values() for i in kova}
+
+
+def test_lsh_ekleme_ve_silme_kovalari_gunceller():
+    indeks = LshIndex(LSH_SORULARI[:3])
+    assert indeks.best("Bana GameLoop için ayar ver", cutoff=0.3) == LSH_SORULARI[0]
+    assert indeks.best("Python ile dosya nasıl okunur", cutoff=0.5) is None
+
+    indeks.add(LSH_SORULARI[4])
+    soru_id = indeks._idler[LSH_SORULARI[4]]
+    # Yeni soru her tabloda bir kovaya girer
+    assert all(any(soru_id in kova for kova in kovalar.values()) for kovalar in indeks._kovalar)
+    assert indeks.best("dosya Python ile nasıl okunur", cutoff=0.5) == LSH_SORULARI[4]
+
+    # Silinen soru kovada kalsa da bulunmaz
+    indeks.remove(LSH_SORULARI[0])
+    assert LSH_SORULARI[0] not in indeks
+    assert all(aday != LSH_SORULARI[0] for aday in indeks.candidates(LSH_SORULARI[0]))
+    assert indeks.best("Bana GameLoop için ayar ver", cutoff=0.3) != LSH_SORULARI[0]
+
+    # Silinenler canlıları geçince kovalar yalnızca canlılarla kurulur
+    indeks.remove(LSH_SORULARI[1])
+    indeks.remove(LSH_SORULARI[2])
+    assert len(indeks) == 1 and indeks._silinen == 0
+    assert indeks.sorular == [LSH_SORULARI[4]]
+    assert _kovadaki_idler(indeks) == {0}
+    assert indeks.best("dosya Python ile nasıl okunur", cutoff=0.5) == LSH_SORULARI[4]
+    indeks.add(LSH_SORULARI[0])
+    assert indeks.best("Bana GameLoop için ayar ver", cutoff=0.3) == LSH_SORULARI[0]
+
+
+def test_lsh_sentetik_sorulari_kendileriyle_bulur(sentetik):
+    sorular, _ = sentetik
+    indeks = LshIndex(sorular)
+    for soru in sorular[::20]:
+        # Kendi kovası her tabloda yoklanır; tam eşleşme kaçmaz
+        assert soru in indeks.candidates(soru)
+        assert indeks.top_k(soru, 1, 0.0)[0][1] == pytest.approx(1.0)
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from yz_cache import onbellek_olustur
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, json_yaz
+from yz_watch import Watcher
+
+
+def _veritabani(yol, *ciftler):
+    json_yaz(yol, {"sorular": [{"soru": soru, "cevap": cevap} for soru, cevap in ciftler]})
+
+
+@pytest.fixture
+def iki_bilgi(json_yolu):
+    _veritabani(json_yolu, ("merhaba", "selam"), ("nasılsın", "iyiyim"))
+    yazan = bilgi_tabani_ac(json_yolu)
+    okuyan = bilgi_tabani_ac(json_yolu, eszamanli=True)
+    yield yazan[1], okuyan[1]
+    bilgi_tabani_kapat(json_yolu, *okuyan)
+    bilgi_tabani_kapat(json_yolu, *yazan)
+
+
+def test_gunluk_degisiklikleri_indekse_yamalanir(iki_bilgi):
+    yazan, okuyan = iki_bilgi
+    indeks = okuyan.indeks
+    okuyan.cache = onbellek_olustur(8)
+    assert okuyan.respond("merhaba")[1] == "selam"
+
+    yazan.teach("yeni soru", "yeni cevap")
+    yazan.teach("merhaba", "günaydın")
+    yazan.forget("nasılsın")
+    assert okuyan.reload() == 3
+    # İndeks yeniden kurulmaz, yalnızca değişenler uygulanır
+    assert okuyan.indeks is indeks
+    assert "yeni soru" in indeks and "nasılsın" not in indeks
+    assert okuyan.respond("merhaba")[1] == "günaydın"
+    assert okuyan.answer("nasılsın") is None
+    # Değişiklik kalmadı; kendi yazmaları da fark üretmez
+    assert okuyan.reload() == 0
+    okuyan.teach("okuyanın sorusu", "cevabı")
+    assert okuyan.reload() == 0
+
+
+def test_dosya_degisince_tam_fark_uygulanir(json_yolu, iki_bilgi):
+    _, okuyan = iki_bilgi
+    _veritabani(json_yolu, ("merhaba", "selam"), ("nasılsın", "harikayım"), ("hava", "güzel"))
+    assert okuyan.reload() == 2
+    assert okuyan.answer("nasılsın") == "harikayım"
+    assert okuyan.answer("hava") == "güzel"
+
+    _veritabani(json_yolu, ("merhaba", "selam"))
+    assert okuyan.reload() == 2
+    assert len(okuyan) == 1 and list(okuyan.indeks) == ["merhaba"]
+
+
+@pytest.mark.parametrize("yoklama", [True, False])
+def test_izleyici_degisikligi_yukler(iki_bilgi, yoklama):
+    yazan, okuyan = iki_bilgi
+    izleyici = Watcher(okuyan, aralik=0.05, yoklama=yoklama).start()
+    try:
+        yazan.teach("yeni soru", "yeni cevap")
+        bitis = time.time() + 5
+        while okuyan.answer("yeni soru") is None and time.time() < bitis:
+            time.sleep(0.02)
+    finally:
+        izleyici.stop()
+    assert izleyici.hata is None
+    assert okuyan.answer("yeni soru") == "yeni cevap"
+    assert izleyici.yuklenen >= 1
+    if yoklama:
+        assert izleyici.yontem == "yoklama"
@@ -1,55 +1,279 @@
-import json
-from difflib import get_close_matches as yakin_sonuclari_getir
+import argparse
+import os
+import sys
+
+from yz_cache import ONBELLEKLER, onbellek_olustur
+from yz_index import ESLESTIRICILER, LinearIndex
+from yz_kb import KnowledgeBase
+from yz_querylog import kaydedici_olustur
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, depo_ac, depo_tasi
+from yz_ttl import supurucu_baslat
+from yz_watch import izleyici_baslat
+
+# YZ_VERITABANI ile değiştirilebilir; .db/.sqlite uzantısı SQLite deposunu,
+# .idx.jsonl uzantısı cevapları ayrı dosyada tutan SplitStore'u seçer
+VERITABANI_YOLU = os.environ.get(
+    'YZ_VERITABANI',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database.json'),
+)
+
+# YZ_ESLESTIRICI: ngram, bktree, tfidf, linear; boşsa deponun varsayılan indeksi kullanılır
+ESLESTIRICI = os.environ.get('YZ_ESLESTIRICI') or None
+
+# Tekrarlanan sorular için cevap önbelleği; YZ_ONBELLEK=0 kapatır
+ONBELLEK_KAPASITESI = int(os.environ.get('YZ_ONBELLEK', '256'))
+ONBELLEK_POLITIKASI = os.environ.get('YZ_ONBELLEK_POLITIKASI', 'lru')
+
+# YZ_SORGU_GUNLUGU: her sorgu eşleşmesi ve aşama süreleriyle bu JSONL dosyasına
+# yazılır (bkz. yz_querylog); boşsa kayıt tutulmaz
+SORGU_GUNLUGU = os.environ.get('YZ_SORGU_GUNLUGU') or None
+
+# Süresi dolan kayıtlar (kısa ömürlü başarısız cevaplar dahil) bu kadar saniyede
+# bir arka planda silinir; YZ_SUPURME=0 kapatır
+SUPURME_ARALIGI = float(os.environ.get('YZ_SUPURME', '60'))
+
+# Veritabanı dosyaları dışarıdan (elle ya da başka bir süreçte) değişince yalnızca
+# değişen kayıtlar belleğe işlenir; değer olayları birleştirme/yoklama aralığıdır
+# (saniye), YZ_IZLEME=0 kapatır
+IZLEME_ARALIGI = float(os.environ.get('YZ_IZLEME', '1'))
+
+# YZ_PARCA: eşleştirici bu kadar parçaya bölünür, sorgu parçalara YZ_PARCA_HAVUZU
+# (thread, process) üzerinden dağıtılır (bkz. yz_shard); boşsa parçalı depoda
+# deponun parça sayısı, diğerlerinde tek indeks. migrate'te yeni parçalı deponun parça sayısıdır.
+PARCA_SAYISI = int(os.environ.get('YZ_PARCA') or 0) or None
+PARCA_HAVUZU = os.environ.get('YZ_PARCA_HAVUZU') or 'thread'
 
 # Veritabanını yükleme
 def veritabanini_yukle():
-    with open('C:\\Users\\LenovoPC\\Desktop\\kayra_yz\\database.json', 'r', encoding='utf-8') as dosya:
-        return json.load(dosya)
+    depo = depo_ac(VERITABANI_YOLU)
+    try:
+        return {"sorular": depo.load()}
+    finally:
+        depo.close()
 
-# Veritabanına yazma
+# Veritabanına yazma (tamamını yeniden yazar; aynı anda yazan süreçler dosya kilidiyle sıralanır)
 def veritabanina_yaz(veriler):
-    with open('C:\\Users\\LenovoPC\\Desktop\\kayra_yz\\database.json', 'w', encoding='utf-8') as dosya:
-        json.dump(veriler, dosya, indent=2, ensure_ascii=False)
+    depo = depo_ac(VERITABANI_YOLU)
+    try:
+        depo.save(veriler)
+    finally:
+        depo.close()
 
 # Benzer soru bulma
 def yakin_sonuc_bul(soru, sorular):
-    eslesen = yakin_sonuclari_getir(soru, sorular, n=1, cutoff=0.6)
-    return eslesen[0] if eslesen else None
+    # İndeks (NgramIndex, FtsIndex) verilirse yalnızca aday sorular puanlanır
+    if hasattr(sorular, "best"):
+        return sorular.best(soru, cutoff=0.6)
+    # Düz listede her soru bu çağrıda normalleştirilip taranır
+    return LinearIndex(sorular).best(soru, cutoff=0.6)
 
 # Cevabı bulma
 def cevabini_bul(soru, veritabani):
+    # Bilgi tabanında sözlük indeksiyle sabit zamanda bulunur
+    if isinstance(veritabani, KnowledgeBase):
+        return veritabani.answer(soru)
     for soru_cevaplar in veritabani["sorular"]:
         if soru_cevaplar["soru"] == soru:
             return soru_cevaplar["cevap"]
     return None
 
+# Büyük database.json ayrıştırılırken yükleme yüzdesi
+def yukleme_ilerlemesi(okunan, toplam, kayit_sayisi):
+    if toplam < 10 * 2 ** 20:
+        return
+    print(f"\rYükleniyor: %{okunan * 100 // toplam} ({kayit_sayisi} kayıt)",
+          end="\n" if okunan >= toplam else "", file=sys.stderr, flush=True)
+
 # ChatCPT ana fonksiyonu
-def chat_bot():
-    veritabani = veritabanini_yukle()
+def chat_bot(yol=VERITABANI_YOLU, eslestirici=ESLESTIRICI,
+             onbellek_kapasitesi=ONBELLEK_KAPASITESI, onbellek_politikasi=ONBELLEK_POLITIKASI,
+             sorgu_gunlugu=SORGU_GUNLUGU, supurme_araligi=SUPURME_ARALIGI,
+             izleme_araligi=IZLEME_ARALIGI, parca=PARCA_SAYISI, parca_havuzu=PARCA_HAVUZU):
+    # Öğretilen her cevap depoya tek kayıt olarak, indekse de anında eklenir;
+    # indeks kapanışta önbelleğe yazılır ve sonraki açılışta yeniden kurulmaz.
+    # Süpürücü ve izleyici ayrı iş parçacığında yazdığından bilgi tabanı o zaman eşzamanlı açılır.
+    depo, bilgi = bilgi_tabani_ac(yol, eslestirici, yukleme_ilerlemesi,
+                                  eszamanli=bool(supurme_araligi or izleme_araligi),
+                                  parca=parca, havuz=parca_havuzu)
+    # Aynı sorunun tekrarında bulanık eşleştirme yeniden yapılmaz
+    bilgi.cache = onbellek_olustur(onbellek_kapasitesi, onbellek_politikasi)
+    kaydedici = kaydedici_olustur(sorgu_gunlugu)
+    supurucu = supurucu_baslat(bilgi, supurme_araligi)
+    izleyici = izleyici_baslat(bilgi, izleme_araligi)
 
     while True:
         soru = input("Siz: ")
 
         if soru.lower() == 'çık':
             print("ChatCPT: Görüşürüz!\n")
+            if supurucu is not None:
+                supurucu.stop()
+            if izleyici is not None:
+                izleyici.stop()
+            bilgi_tabani_kapat(yol, depo, bilgi)
+            if kaydedici is not None:
+                kaydedici.close()
             break
 
-        gelen_sonuc = yakin_sonuc_bul(soru, [s["soru"] for s in veritabani["sorular"]])
+        if kaydedici is not None:
+            gelen_sonuc = kaydedici.respond(bilgi, soru)
+        else:
+            gelen_sonuc = bilgi.respond(soru)
 
         if gelen_sonuc:
-            verilecek_cevap = cevabini_bul(gelen_sonuc, veritabani)
-            print(f"ChatCPT: {verilecek_cevap}\n")
+            print(f"ChatCPT: {gelen_sonuc[1]}\n")
         else:
             print("ChatCPT: Bunu nasıl cevaplayacağımı bilmiyorum. Öğretir misiniz?\n")
             yeni_cevap = input("Öğretmek için yazabilir veya 'geç' diyebilirsiniz: ")
 
             if yeni_cevap.lower() != 'geç':
-                veritabani["sorular"].append({
-                    "soru": soru,
-                    "cevap": yeni_cevap
-                })
-                veritabanina_yaz(veritabani)
+                bilgi.teach(soru, yeni_cevap)
                 print("ChatCPT: Teşekkürler, sayenizde yeni bir şey öğrendim!\n")
 
+# Komut satırı
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ChatCPT bilgi tabanı")
+    parser.add_argument('--veritabani', default=VERITABANI_YOLU,
+                        help="database.json, .db, .idx.jsonl veya .shards.json dosyası")
+    parser.add_argument('--eslestirici', default=ESLESTIRICI, choices=sorted(ESLESTIRICILER),
+                        help="Soru eşleştirici (varsayılan: deponun kendi indeksi)")
+    parser.add_argument('--onbellek', type=int, default=ONBELLEK_KAPASITESI,
+                        help="Cevap önbelleği kapasitesi (0: kapalı)")
+    parser.add_argument('--onbellek-politikasi', default=ONBELLEK_POLITIKASI,
+                        choices=sorted(ONBELLEKLER), help="Önbellekten atılacak girdinin seçimi")
+    parser.add_argument('--sorgu-gunlugu', default=SORGU_GUNLUGU,
+                        help="Sorguların yazılacağı JSONL dosyası (varsayılan: kapalı)")
+    parser.add_argument('--supurme', type=float, default=SUPURME_ARALIGI,
+                        help="Süresi dolan kayıtların silinme aralığı, saniye (0: kapalı)")
+    parser.add_argument('--izleme', type=float, default=IZLEME_ARALIGI,
+                        help="Veritabanı dosyalarındaki dış değişiklikleri yükleme aralığı, "
+                             "saniye (0: kapalı)")
+    parser.add_argument('--parca', type=int, default=PARCA_SAYISI,
+                        help="Eşleştirici parça sayısı (varsayılan: deponun parça sayısı)")
+    parser.add_argument('--parca-havuzu', default=PARCA_HAVUZU, choices=('process', 'thread'),
+                        help="Sorgunun parçalara dağıtıldığı havuz")
+    komutlar = parser.add_subparsers(dest='komut')
+
+    tasi = komutlar.add_parser('migrate', help="Veritabanını başka bir depo biçimine aktar")
+    tasi.add_argument('kaynak', help="database.json yolu")
+    tasi.add_argument('hedef', help=".db, .idx.jsonl veya .shards.json dosyası yolu")
+
+    ayiklama = komutlar.add_parser('dedup', help="Yakın kopya soruları birleştir")
+    ayiklama.add_argument('kaynak', nargs='?', default=None,
+                          help="Veritabanı yolu (varsayılan: --veritabani)")
+    ayiklama.add_argument('--hedef', default=None,
+                          help="Sıkıştırılmış veritabanı yolu (varsayılan: kaynak.dedup.json)")
+    ayiklama.add_argument('--ustune-yaz', action='store_true',
+                          help="Sıkıştırılmış veritabanını kaynağın üstüne yaz")
+    ayiklama.add_argument('--esik', type=float, default=0.9,
+                          help="Aynı kümeye girmek için 3-gram Jaccard benzerliği")
+
+    aktar = komutlar.add_parser('import', help="JSONL/CSV derlemlerini toplu içe aktar")
+    aktar.add_argument('kaynaklar', nargs='+',
+                       help=".jsonl, .csv ya da database.json biçiminde .json dosyaları")
+    aktar.add_argument('--isci', type=int, default=None, help="İşçi süreç sayısı")
+    aktar.add_argument('--soru-alani', default='soru', help="Sorunun JSON alanı / CSV sütunu")
+    aktar.add_argument('--cevap-alani', default='cevap', help="Cevabın JSON alanı / CSV sütunu")
+    aktar.add_argument('--indeks', default=None,
+                       help="Kurulacak eşleştirici indeksleri, virgülle (varsayılan: --eslestirici ya da ngram)")
+
+    hizmet = komutlar.add_parser('serve', help="Yerel sorgu hizmetini başlat")
+    hizmet.add_argument('--soket', default=None, help="Unix soketi yolu")
+    hizmet.add_argument('--host', default='127.0.0.1', help="HTTP adresi")
+    hizmet.add_argument('--port', type=int, default=None,
+                        help="HTTP portu (soket verilmezse varsayılan 8765)")
+    hizmet.add_argument('--isci', type=int, default=None, help="Eşleştirici iş parçacığı sayısı")
+
+    toplu = komutlar.add_parser('batch', help="JSONL sorularını toplu cevapla")
+    toplu.add_argument('girdi', nargs='?', default='-', help="JSONL dosyası ('-' stdin)")
+    toplu.add_argument('--cikti', default='-', help="Sonuç JSONL dosyası ('-' stdout)")
+    toplu.add_argument('--alan', default='soru', help="Sorunun bulunduğu JSON alanı")
+    toplu.add_argument('--isci', type=int, default=None, help="İşçi süreç sayısı")
+
+    komutlar.add_parser('sweep', help="Süresi dolan kayıtları silip depoyu sıkıştır")
+
+    tekrar = komutlar.add_parser('replay', help="Sorgu günlüğünü yeniden çalıştır")
+    tekrar.add_argument('gunlukler', nargs='+',
+                        help="Sorgu günlüğü dosyaları (döndürülmüş eskileri de okunur)")
+    tekrar.add_argument('--cutoff', type=float, default=None,
+                        help="Eşik (varsayılan: her sorgunun kaydedildiği eşik)")
+    tekrar.add_argument('--tekrar-onbellek', type=int, default=0,
+                        help="Tekrarda cevap önbelleği kapasitesi (varsayılan 0: her sorgu eşleştiriciyi ölçer)")
+    tekrar.add_argument('--fark', default=None,
+                        help="Sonucu değişen sorguların yazılacağı JSONL dosyası")
+
+    args = parser.parse_args(argv)
+
+    if args.komut == 'migrate':
+        adet = depo_tasi(args.kaynak, args.hedef, args.parca)
+        print(f"{adet} kayıt {args.hedef} dosyasına aktarıldı.")
+    elif args.komut == 'dedup':
+        from yz_dedup import ayikla, ayiklanmis_yol
+        from yz_store import takma_ad_yolu
+        kaynak = args.kaynak or args.veritabani
+        hedef = args.hedef or (kaynak if args.ustune_yaz else ayiklanmis_yol(kaynak))
+        once, sonra = ayikla(kaynak, hedef, args.esik, args.ustune_yaz)
+        print(f"{once} kayıt {sonra} kayda indi; {once - sonra} yazım "
+              f"{takma_ad_yolu(hedef)} tablosunda.")
+    elif args.komut == 'import':
+        from yz_import import ice_aktar
+        indeksler = (args.indeks or args.eslestirici or 'ngram').split(',')
+        sonuc = ice_aktar(args.kaynaklar, args.veritabani, args.isci, args.soru_alani,
+                          args.cevap_alani, [ad for ad in indeksler if ad])
+        hiz = sonuc["okunan"] * 60 / sonuc["sure"] if sonuc["sure"] else 0
+        print(f"{sonuc['okunan']} satır okundu ({sonuc['atlanan']} atlandı), "
+              f"{sonuc['aktarilan']} tekil kayıt aktarıldı; veritabanında {sonuc['toplam']} kayıt. "
+              f"{sonuc['sure']:.1f} s ({hiz:.0f} kayıt/dk)")
+    elif args.komut == 'serve':
+        from yz_service import VARSAYILAN_PORT, hizmet_baslat
+        port = args.port
+        if port is None and args.soket is None:
+            port = VARSAYILAN_PORT
+        try:
+            hizmet_baslat(args.veritabani, args.eslestirici, args.soket, args.host, port,
+                          args.isci, args.onbellek, args.onbellek_politikasi,
+                          args.sorgu_gunlugu, args.supurme, args.izleme,
+                          args.parca, args.parca_havuzu)
+        except KeyboardInterrupt:
+            pass
+    elif args.komut == 'batch':
+        from yz_batch import toplu_cevapla
+        girdi = sys.stdin if args.girdi == '-' else open(args.girdi, encoding='utf-8')
+        cikti = sys.stdout if args.cikti == '-' else open(args.cikti, 'w', encoding='utf-8')
+        try:
+            toplu_cevapla(girdi, cikti, args.veritabani, args.isci, args.alan,
+                          eslestirici=args.eslestirici)
+        finally:
+            if girdi is not sys.stdin:
+                girdi.close()
+            if cikti is not sys.stdout:
+                cikti.close()
+    elif args.komut == 'sweep':
+        depo, bilgi = bilgi_tabani_ac(args.veritabani, args.eslestirici)
+        try:
+            silinen = bilgi.sweep(tam=True)
+            # Silme satırları günlükte kalmasın, database.json küçülsün
+            if silinen and hasattr(depo, "compact"):
+                depo.compact()
+        finally:
+            bilgi_tabani_kapat(args.veritabani, depo, bilgi)
+        print(f"{silinen} kaydın süresi dolmuştu, silindi; {len(bilgi)} kayıt kaldı.")
+    elif args.komut == 'replay':
+        import json
+        from yz_replay import gunlukleri_oku, tekrar_oynat
+        fark = open(args.fark, 'w', encoding='utf-8') if args.fark else None
+        try:
+            yazici = None if fark is None else (
+                lambda satir: fark.write(json.dumps(satir, ensure_ascii=False) + "\n"))
+            sonuc = tekrar_oynat(gunlukleri_oku(args.gunlukler), args.veritabani,
+                                 args.eslestirici, args.tekrar_onbellek, args.cutoff, yazici)
+        finally:
+            if fark is not None:
+                fark.close()
+        print(json.dumps(sonuc, ensure_ascii=False, indent=2))
+    else:
+        chat_bot(args.veritabani, args.eslestirici, args.onbellek, args.onbellek_politikasi,
+                 args.sorgu_gunlugu, args.supurme, args.izleme, args.parca, args.parca_havuzu)
+
 if __name__ == '__main__':
-    chat_bot()
+    main()
@@ -0,0 +1,106 @@
+"""
+ChatCPT toplu cevaplama
+JSONL sorularını süreç havuzunda eşleştirir, sonuçları giriş sırasıyla yazar
+"""
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from yz_store import bilgi_tabani_ac
+
+_bilgi = None
+
+
+# Her işçi süreç bilgi tabanını ve indeksini yalnızca bir kez yükler
+def _isci_baslat(yol, eslestirici):
+    global _bilgi
+    _, _bilgi = bilgi_tabani_ac(yol, eslestirici)
+
+
+def _sonuc(soru, sonuc, sure):
+    eslesme, cevap, skor = sonuc[0] if sonuc else (None, None, None)
+    return {
+        "soru": soru,
+        "eslesme": eslesme,
+        "skor": None if skor is None else round(skor, 4),
+        "cevap": cevap,
+        "sure_ms": round(sure * 1000, 3),
+    }
+
+
+# Süreçler arası gidiş-dönüş maliyeti için sorular gruplar halinde gönderilir.
+# Okunamayan satırların hata kaydı (bkz. sorulari_oku) sırasında aynen döner.
+def _grubu_cevapla(grup):
+    sorular = [oge for oge in grup if isinstance(oge, str)]
+    # Toplu puanlayan indekste süre, grup süresinin soru başına payıdır
+    if not sorular:
+        cevaplar = []
+    elif hasattr(_bilgi.indeks, "top_k_many"):
+        baslangic = time.perf_counter()
+        sonuclar = _bilgi.top_k_many(sorular, k=1)
+        sure = (time.perf_counter() - baslangic) / len(sorular)
+        cevaplar = [_sonuc(soru, sonuc, sure) for soru, sonuc in zip(sorular, sonuclar)]
+    else:
+        cevaplar = []
+        for soru in sorular:
+            baslangic = time.perf_counter()
+            sonuc = _bilgi.top_k(soru, k=1)
+            cevaplar.append(_sonuc(soru, sonuc, time.perf_counter() - baslangic))
+
+    cevaplar = iter(cevaplar)
+    return [next(cevaplar) if isinstance(oge, str) else oge for oge in grup]
+
+
+# Her satır bir JSON nesnesi (soru `alan` alanında) ya da düz JSON metni olabilir.
+# JSON olmayan, sorusu eksik ya da metin olmayan satır toplu işi durdurmaz; yerine
+# satır numarası ve hatayla bir sözlük üretilir, çıktıda o sıranın kaydı olur.
+def sorulari_oku(dosya, alan="soru"):
+    for numara, satir in enumerate(dosya, 1):
+        satir = satir.strip()
+        if not satir:
+            continue
+        try:
+            veri = json.loads(satir)
+        except json.JSONDecodeError as hata:
+            yield {"satir": numara, "hata": f"Geçersiz JSON: {hata}"}
+            continue
+        if isinstance(veri, dict):
+            if alan not in veri:
+                yield {"satir": numara, "hata": f"'{alan}' alanı yok"}
+                continue
+            veri = veri[alan]
+        if not isinstance(veri, str):
+            ham = json.dumps(veri, ensure_ascii=False)
+            yield {"satir": numara, "hata": f"Soru metin değil: {ham}"}
+            continue
+        yield veri
+
+
+def toplu_cevapla(girdi, cikti, yol, isci_sayisi=None, alan="soru", grup_boyu=64,
+                  eslestirici=None):
+    isci_sayisi = isci_sayisi or os.cpu_count() or 1
+    sorular = sorulari_oku(girdi, alan)
+    bekleyenler = deque()
+    sira = 0
+
+    with ProcessPoolExecutor(isci_sayisi, initializer=_isci_baslat, initargs=(yol, eslestirici)) as havuz:
+        while True:
+            # İşçileri meşgul tutacak kadar grup kuyrukta tutulur, fazlası okunmaz
+            while len(bekleyenler) < isci_sayisi * 2:
+                grup = list(islice(sorular, grup_boyu))
+                if not grup:
+                    break
+                bekleyenler.append(havuz.submit(_grubu_cevapla, grup))
+
+            if not bekleyenler:
+                break
+
+            for sonuc in bekleyenler.popleft().result():
+                cikti.write(json.dumps({"sira": sira, **sonuc}, ensure_ascii=False) + "\n")
+                sira += 1
+
+    return sira
@@ -0,0 +1,474 @@
+"""
+ChatCPT eşleştirme ölçümleri
+Sentetik Türkçe benzeri veritabanlarında depo ve eşleştiricileri karşılaştırır
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Windows'ta tepe bellek ölçülmez
+    resource = None
+
+from yz_index import ESLESTIRICILER, PUANLAYICI, eslestirici_olustur, soru_anahtari
+from yz_kb import CompactRecords, KnowledgeBase, kayit_sorulari
+from yz_shard import parcali_indeks
+from yz_store import PARCALI_UZANTI, SQLITE_UZANTILARI, SplitStore, depo_ac, depo_tasi
+
+UNSUZLER = "bcçdfgğhjklmnprsştvyz"
+UNLULER = "aeıioöuü"
+HARFLER = UNSUZLER + UNLULER
+
+SORU_KALIPLARI = (
+    "{} nasıl yapılır",
+    "{} nedir",
+    "{} ne zaman başlar",
+    "{} için ayar versene",
+    "{} nerede bulunur",
+    "bana {} hakkında bilgi ver",
+    "{} neden çalışmıyor",
+    "{} mi yoksa {} mi daha iyi",
+    "{} nasıl kurulur",
+    "{} kaç para",
+)
+
+# Depo türü -> ölçülen veritabanı dosyasının uzantısı
+DEPO_UZANTILARI = {
+    "json": ".json",
+    "sqlite": SQLITE_UZANTILARI[0],
+    "split": SplitStore.UZANTI,
+    "shards": PARCALI_UZANTI,
+}
+
+# SQLite deposunun kendi FTS5 indeksi
+YERLI_INDEKS = "fts"
+
+
+def _kelime(rastgele):
+    heceler = []
+    for _ in range(rastgele.randint(1, 4)):
+        hece = rastgele.choice(UNSUZLER) + rastgele.choice(UNLULER)
+        if rastgele.random() < 0.4:
+            hece += rastgele.choice(UNSUZLER)
+        heceler.append(hece)
+    return "".join(heceler)
+
+
+class Uretici:
+    """Tohumdan belirlenen sentetik soru-cevap üreticisi
+
+    Kelimeler sabit bir sözlükten Zipf dağılımıyla seçilir; böylece
+    gerçek veritabanlarındaki gibi bazı kelimeler çok sık tekrar eder
+    ve n-gram'lar eşit dağılmaz.
+    """
+
+    def __init__(self, tohum, sozluk_boyu=5000):
+        self.rastgele = random.Random(tohum)
+        self.sozluk = list({_kelime(self.rastgele) for _ in range(sozluk_boyu)})
+        self.sozluk.sort()
+        self.rastgele.shuffle(self.sozluk)
+        agirliklar = [1 / (sira + 1) for sira in range(len(self.sozluk))]
+        self._birikimli = []
+        toplam = 0.0
+        for agirlik in agirliklar:
+            toplam += agirlik
+            self._birikimli.append(toplam)
+
+    def kelimeler(self, adet):
+        return self.rastgele.choices(self.sozluk, cum_weights=self._birikimli, k=adet)
+
+    def soru(self):
+        kalip = self.rastgele.choice(SORU_KALIPLARI)
+        parcalar = [" ".join(self.kelimeler(self.rastgele.randint(1, 3)))
+                    for _ in range(kalip.count("{}"))]
+        soru = kalip.format(*parcalar)
+        return soru[0].upper() + soru[1:]
+
+    def cevap(self, kelime_sayisi):
+        adet = max(1, int(self.rastgele.gauss(kelime_sayisi, kelime_sayisi / 3)))
+        return " ".join(self.kelimeler(adet)).capitalize() + "."
+
+    # Yazım hatası benzetimi: 1-2 harf silme, ekleme, değiştirme ya da yer değiştirme
+    def boz(self, soru):
+        harfler = list(soru)
+        for _ in range(self.rastgele.randint(1, 2)):
+            i = self.rastgele.randrange(len(harfler))
+            islem = self.rastgele.randrange(4)
+            if islem == 0 and len(harfler) > 1:
+                del harfler[i]
+            elif islem == 1:
+                harfler.insert(i, self.rastgele.choice(HARFLER))
+            elif islem == 2:
+                harfler[i] = self.rastgele.choice(HARFLER)
+            elif i + 1 < len(harfler):
+                harfler[i], harfler[i + 1] = harfler[i + 1], harfler[i]
+        bozuk = "".join(harfler)
+        if self.rastgele.random() < 0.2:
+            bozuk = bozuk.lower()
+        return bozuk
+
+
+# database.json biçiminde `boyut` kayıt yazar; kayıtlar bellekte biriktirilmez.
+# Dönen sorgular [sorgu, beklenen soru ya da None] çiftleridir.
+def veritabani_uret(yol, boyut, sorgu_sayisi, tohum=42, cevap_kelime=30, yeni_oran=0.2):
+    uretici = Uretici(tohum)
+    yeni = int(sorgu_sayisi * yeni_oran)
+    secilenler = set(uretici.rastgele.sample(range(boyut), min(boyut, sorgu_sayisi - yeni)))
+    kaynaklar = []
+
+    anahtarlar = set()
+    gecici = f"{yol}.tmp"
+    with open(gecici, 'w', encoding='utf-8') as dosya:
+        dosya.write('{"sorular": [\n')
+        while len(anahtarlar) < boyut:
+            soru = uretici.soru()
+            anahtar = soru_anahtari(soru)
+            if anahtar in anahtarlar:
+                continue
+            if len(anahtarlar) in secilenler:
+                kaynaklar.append(soru)
+            if anahtarlar:
+                dosya.write(",\n")
+            anahtarlar.add(anahtar)
+            kayit = {"soru": soru, "cevap": uretici.cevap(cevap_kelime)}
+            dosya.write(json.dumps(kayit, ensure_ascii=False))
+        dosya.write("\n]}\n")
+    os.replace(gecici, yol)
+
+    # Veritabanında olmayan sorular eşleşmemeli (ya da yanlış eşleşme sayılır)
+    sorgular = [[uretici.boz(soru), soru] for soru in kaynaklar]
+    while len(sorgular) < sorgu_sayisi:
+        soru = uretici.soru()
+        if soru_anahtari(soru) not in anahtarlar:
+            sorgular.append([soru, None])
+    uretici.rastgele.shuffle(sorgular)
+    return sorgular
+
+
+# Üretilen veritabanı ve sorgular dizinde saklanır, aynı tohumla tekrar üretilmez
+def veri_hazirla(dizin, boyut, sorgu_sayisi, tohum, cevap_kelime, depolar):
+    os.makedirs(dizin, exist_ok=True)
+    taban = os.path.join(dizin, f"yz_{boyut}_{tohum}_{cevap_kelime}")
+    json_yolu = taban + DEPO_UZANTILARI["json"]
+    sorgu_yolu = f"{taban}.sorgular.{sorgu_sayisi}.json"
+
+    if not os.path.exists(json_yolu) or not os.path.exists(sorgu_yolu):
+        sorgular = veritabani_uret(json_yolu, boyut, sorgu_sayisi, tohum, cevap_kelime)
+        with open(sorgu_yolu, 'w', encoding='utf-8') as dosya:
+            json.dump(sorgular, dosya, ensure_ascii=False)
+        for tur, uzanti in DEPO_UZANTILARI.items():
+            if tur != "json" and os.path.exists(taban + uzanti):
+                # Parça dosyaları boşaltılır, yeni liste aynı dosyaları kullanır
+                if tur == "shards":
+                    depo = depo_ac(taban + uzanti)
+                    depo.save({})
+                    depo.close()
+                os.remove(taban + uzanti)
+                if tur == "split":
+                    os.remove(f"{taban}.cevap.bin")
+    else:
+        with open(sorgu_yolu, encoding='utf-8') as dosya:
+            sorgular = json.load(dosya)
+
+    # İlk açılışta yazılan ikili anlık görüntü ölçümlere sayılmasın
+    depo = depo_ac(json_yolu)
+    depo.load()
+    depo.close()
+
+    yollar = {}
+    for tur in depolar:
+        yol = taban + DEPO_UZANTILARI[tur]
+        if not os.path.exists(yol):
+            depo_tasi(json_yolu, yol)
+        yollar[tur] = yol
+    return yollar, sorgular
+
+
+# ru_maxrss exec sonrasında da üst sürecin tepesini taşır; Linux'ta bu yüzden
+# yalnızca bu sürecin adres alanına ait VmHWM okunur
+def _tepe_rss_mb():
+    try:
+        with open('/proc/self/status', encoding='ascii') as dosya:
+            for satir in dosya:
+                if satir.startswith('VmHWM:'):
+                    return round(int(satir.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # Linux KiB, macOS bayt döndürür
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        tepe *= 1024
+    return round(tepe / 2 ** 20, 1)
+
+
+# Saniye cinsinden sürelerin p50/p95/p99'u, milisaniye (bkz. yz_replay)
+def yuzdelikler(sureler):
+    if len(sureler) < 2:
+        sureler = sureler * 2
+    kesitler = statistics.quantiles(sureler, n=100, method='inclusive')
+    return {f"p{p}_ms": round(kesitler[p - 1] * 1000, 3) for p in (50, 95, 99)}
+
+
+# Ayrı bir süreçte çalışır; tepe bellek yalnızca bu depo ve eşleştiriciye aittir.
+# Parçalı depoda eşleştirici de parçalanır, sorgular `havuz` üzerinden dağıtılır.
+def durumu_olc(yol, eslestirici, sorgular, cutoff=0.6, havuz="thread"):
+    baslangic_rss = _tepe_rss_mb()
+
+    baslangic = time.perf_counter()
+    depo = depo_ac(yol)
+    if hasattr(depo, "records"):
+        kayitlar = None
+    elif hasattr(depo, "load_records"):
+        kayitlar = depo.load_records()
+    else:
+        kayitlar = CompactRecords((soru_anahtari(kayit["soru"]), kayit) for kayit in depo.load())
+    yukleme = time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    if eslestirici == YERLI_INDEKS:
+        bilgi = KnowledgeBase.open(depo)
+    elif kayitlar is None:
+        bilgi = KnowledgeBase.open(depo, index=eslestirici_olustur(eslestirici))
+    else:
+        bos_indeks = parcali_indeks(eslestirici, getattr(depo, "parca_sayisi", 1), havuz)
+        for soru in kayit_sorulari(kayitlar):
+            bos_indeks.add(soru)
+        bilgi = KnowledgeBase(store=depo, records=kayitlar, index=bos_indeks)
+    del kayitlar
+    # İlk sorguda kurulan indeksler (tfidf) kurulum süresine sayılır
+    bilgi.match("", cutoff)
+    indeks = time.perf_counter() - baslangic
+
+    sureler = []
+    isabet = yanlis = 0
+    PUANLAYICI.reset()
+    for sorgu, beklenen in sorgular:
+        baslangic = time.perf_counter()
+        eslesen = bilgi.match(sorgu, cutoff)
+        if eslesen is not None:
+            bilgi.answer(eslesen)
+        sureler.append(time.perf_counter() - baslangic)
+        if eslesen is not None and beklenen is not None and eslesen == beklenen:
+            isabet += 1
+        elif eslesen is not None:
+            yanlis += 1
+    # Sorgu başına puanlayıcı aşamalarına giren ortalama aday sayısı
+    asamalar = {
+        ad: round(sayi / len(sorgular), 1)
+        for ad, sayi in PUANLAYICI.ozet()[0].items() if ad != "sorgu"
+    }
+
+    baslangic = time.perf_counter()
+    bilgi.top_k_many([sorgu for sorgu, _ in sorgular], k=1, cutoff=cutoff)
+    toplu = time.perf_counter() - baslangic
+
+    beklenen_sayisi = sum(1 for _, beklenen in sorgular if beklenen is not None)
+    sonuc = {
+        "kayit": len(bilgi),
+        "yukleme_s": round(yukleme, 4),
+        "indeks_s": round(indeks, 4),
+        **yuzdelikler(sureler),
+        "sorgu_per_s": round(len(sureler) / sum(sureler), 1),
+        "toplu_sorgu_per_s": round(len(sorgular) / toplu, 1),
+        "isabet": round(isabet / beklenen_sayisi, 4) if beklenen_sayisi else None,
+        "yanlis_eslesme": yanlis,
+        "asamalar": asamalar,
+        "baslangic_rss_mb": baslangic_rss,
+        "tepe_rss_mb": _tepe_rss_mb(),
+    }
+    if hasattr(bilgi.indeks, "close"):
+        bilgi.indeks.close()
+    depo.close()
+    return sonuc
+
+
+def _yapi_boyu(kur):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        yapi = kur()
+        return yapi, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def _metin_boyu(kayitlar):
+    toplam = 0
+    for anahtar, kayit in kayitlar.items():
+        toplam += sys.getsizeof(anahtar) + sys.getsizeof(kayit["cevap"])
+        if kayit["soru"] is not anahtar:
+            toplam += sys.getsizeof(kayit["soru"])
+    return toplam
+
+
+# JSON satırlarından yüklenen kayıtların bellekte kapladığı yer: her kayıt
+# için sözlük tutan eski biçim ile CompactRecords. Metin dışındaki bayt,
+# kayıt başına yapının ek yüküdür.
+def bellek_olc(boyut, tohum=42, cevap_kelime=30):
+    uretici = Uretici(tohum)
+    satirlar, anahtarlar = [], set()
+    while len(satirlar) < boyut:
+        soru = uretici.soru()
+        anahtar = soru_anahtari(soru)
+        if anahtar not in anahtarlar:
+            anahtarlar.add(anahtar)
+            kayit = {"soru": soru, "cevap": uretici.cevap(cevap_kelime)}
+            satirlar.append(json.dumps(kayit, ensure_ascii=False))
+    del anahtarlar
+
+    sonuc = {"kayit": boyut}
+    bicimler = (
+        ("sozluk", lambda: {soru_anahtari(kayit["soru"]): kayit
+                            for kayit in map(json.loads, satirlar)}),
+        ("kompakt", lambda: CompactRecords((soru_anahtari(kayit["soru"]), kayit)
+                                           for kayit in map(json.loads, satirlar))),
+    )
+    for ad, kur in bicimler:
+        kayitlar, toplam = _yapi_boyu(kur)
+        metin = _metin_boyu(kayitlar)
+        sonuc[ad] = {
+            "bayt_per_kayit": round(toplam / boyut, 1),
+            "yapi_bayt_per_kayit": round((toplam - metin) / boyut, 1),
+        }
+        del kayitlar
+    return sonuc
+
+
+def _git_surumu():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ortam():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "islemci_sayisi": os.cpu_count(),
+        "git": _git_surumu(),
+        "tarih": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def _durumlar(depolar, eslestiriciler):
+    for depo in depolar:
+        for ad in eslestiriciler:
+            # FTS indeksi yalnızca SQLite deposunda vardır
+            if ad != YERLI_INDEKS or depo == "sqlite":
+                yield depo, ad
+
+
+def olc(boyutlar, depolar, eslestiriciler, sorgu_sayisi=500, tohum=42, dizin=None,
+        cevap_kelime=30, cutoff=0.6, ilerleme=None, parca_havuzu="thread"):
+    dizin = dizin or os.path.join(tempfile.gettempdir(), "yz_bench")
+    # fork edilen süreç üst sürecin belleğini miras alır; spawn ile ölçüm temiz başlar
+    baglam = multiprocessing.get_context("spawn")
+    sonuclar = []
+
+    for boyut in boyutlar:
+        hazirlik = time.perf_counter()
+        yollar, sorgular = veri_hazirla(dizin, boyut, sorgu_sayisi, tohum, cevap_kelime, depolar)
+        if ilerleme:
+            ilerleme(f"{boyut} kayıt hazır ({time.perf_counter() - hazirlik:.1f} sn)")
+
+        for depo, ad in _durumlar(depolar, eslestiriciler):
+            satir = {"boyut": boyut, "depo": depo, "eslestirici": ad}
+            with ProcessPoolExecutor(1, mp_context=baglam) as havuz:
+                try:
+                    satir.update(havuz.submit(durumu_olc, yollar[depo], ad, sorgular, cutoff,
+                                                  parca_havuzu).result())
+                except ImportError as hata:
+                    satir["hata"] = str(hata)
+            sonuclar.append(satir)
+            if ilerleme:
+                ilerleme(json.dumps(satir, ensure_ascii=False))
+
+    return {
+        "ortam": _ortam(),
+        "parametreler": {
+            "boyutlar": list(boyutlar),
+            "sorgu_sayisi": sorgu_sayisi,
+            "tohum": tohum,
+            "cevap_kelime": cevap_kelime,
+            "cutoff": cutoff,
+            "parca_havuzu": parca_havuzu,
+        },
+        "sonuclar": sonuclar,
+    }
+
+
+def _liste(metin):
+    return [parca.strip() for parca in metin.split(",") if parca.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ChatCPT eşleştirme ölçümleri")
+    parser.add_argument('--boyutlar', default="1000,10000,100000",
+                        help="Virgülle ayrılmış kayıt sayıları (ör. 1000,10000,100000,1000000)")
+    parser.add_argument('--depolar', default="json",
+                        help=f"Virgülle ayrılmış depo türleri: {', '.join(DEPO_UZANTILARI)}")
+    parser.add_argument('--eslestiriciler', default="ngram,bktree,tfidf",
+                        help=f"Virgülle ayrılmış eşleştiriciler: "
+                             f"{', '.join(sorted(ESLESTIRICILER))}, {YERLI_INDEKS} (yalnızca sqlite)")
+    parser.add_argument('--sorgu', type=int, default=500, help="Durum başına sorgu sayısı")
+    parser.add_argument('--tohum', type=int, default=42, help="Üretici tohumu")
+    parser.add_argument('--cevap-kelime', type=int, default=30, help="Ortalama cevap uzunluğu")
+    parser.add_argument('--dizin', default=None, help="Üretilen veritabanlarının dizini")
+    parser.add_argument('--cikti', default='-', help="Sonuç JSON dosyası ('-' stdout)")
+    parser.add_argument('--parca-havuzu', default="thread", choices=("process", "thread"),
+                        help="shards deposunda sorgunun parçalara dağıtıldığı havuz")
+    parser.add_argument('--bellek', action='store_true',
+                        help="Süre yerine kayıt başına bellek raporu (sözlük ve CompactRecords)")
+    args = parser.parse_args(argv)
+
+    depolar = _liste(args.depolar)
+    eslestiriciler = _liste(args.eslestiriciler)
+    for depo in depolar:
+        if depo not in DEPO_UZANTILARI:
+            parser.error(f"Bilinmeyen depo: {depo}")
+    for ad in eslestiriciler:
+        if ad not in ESLESTIRICILER and ad != YERLI_INDEKS:
+            parser.error(f"Bilinmeyen eşleştirici: {ad}")
+
+    boyutlar = [int(boyut) for boyut in _liste(args.boyutlar)]
+    if args.bellek:
+        rapor = {
+            "ortam": _ortam(),
+            "bellek": [bellek_olc(boyut, args.tohum, args.cevap_kelime) for boyut in boyutlar],
+        }
+    else:
+        rapor = olc(
+            boyutlar, depolar, eslestiriciler, args.sorgu, args.tohum, args.dizin,
+            args.cevap_kelime, ilerleme=lambda mesaj: print(mesaj, file=sys.stderr, flush=True),
+            parca_havuzu=args.parca_havuzu,
+        )
+    metin = json.dumps(rapor, indent=2, ensure_ascii=False)
+    if args.cikti == '-':
+        print(metin)
+    else:
+        with open(args.cikti, 'w', encoding='utf-8') as dosya:
+            dosya.write(metin + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+ChatCPT cevap önbelleği
+Normalleştirilmiş sorgudan çözülmüş cevaba sınırlı LRU/LFU önbellek
+"""
+
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+
+class AnswerCache:
+    """(normal sorgu, cutoff) -> (soru, cevap, skor) ya da eşleşme yoksa None
+
+    Eşleştiriciler sorguyu yalnızca normalleştirilmiş hâliyle puanladığı
+    için aynı normale giden her yazım aynı sonucu alır. Kapasite dolunca
+    en uzun süredir kullanılmayan girdi atılır (LRU).
+
+    Bilgi tabanı değişince ilgili girdiler düşürülür: cevabı değişen ya
+    da silinen soruya çözülmüş girdiler ve yeni eklenen sorunun kayıtlı
+    sonucu geçebileceği (skoru en az o kadar olan) girdiler.
+    """
+
+    def __init__(self, kapasite=256):
+        if kapasite < 1:
+            raise ValueError("Önbellek kapasitesi en az 1 olmalı")
+        self.kapasite = kapasite
+        self.isabet = 0
+        self.iskalama = 0
+        self.tahliye = 0
+        self.gecersiz = 0
+        self._girdiler = OrderedDict()
+
+    def __len__(self):
+        return len(self._girdiler)
+
+    def __contains__(self, anahtar):
+        return anahtar in self._girdiler
+
+    # Yoksa KeyError; isabet ve ıskalama burada sayılır
+    def __getitem__(self, anahtar):
+        try:
+            deger = self._girdiler[anahtar]
+        except KeyError:
+            self.iskalama += 1
+            raise
+        self.isabet += 1
+        self._kullanildi(anahtar)
+        return deger
+
+    def __setitem__(self, anahtar, deger):
+        if anahtar not in self._girdiler and len(self._girdiler) >= self.kapasite:
+            self._at(self._kurban())
+            self.tahliye += 1
+        self._girdiler[anahtar] = deger
+        self._kullanildi(anahtar)
+
+    def _kullanildi(self, anahtar):
+        self._girdiler.move_to_end(anahtar)
+
+    def _kurban(self):
+        return next(iter(self._girdiler))
+
+    def _at(self, anahtar):
+        del self._girdiler[anahtar]
+
+    def _gecersiz_kil(self, anahtarlar):
+        for anahtar in anahtarlar:
+            self._at(anahtar)
+        self.gecersiz += len(anahtarlar)
+
+    def clear(self):
+        self._gecersiz_kil(list(self._girdiler))
+
+    # Cevabı değişen ya da silinen soruya çözülmüş girdiler
+    def question_changed(self, soru):
+        self._gecersiz_kil([
+            anahtar for anahtar, deger in self._girdiler.items()
+            if deger is not None and deger[0] == soru
+        ])
+
+    # Yeni sorunun normali; en_iyiler ile aynı difflib oranıyla karşılaştırılır
+    def question_added(self, normal):
+        s = SequenceMatcher()
+        s.set_seq1(normal)
+        dusecekler = []
+        for anahtar, deger in self._girdiler.items():
+            sorgu, cutoff = anahtar
+            esik = cutoff if deger is None else max(cutoff, deger[2])
+            s.set_seq2(sorgu)
+            if s.real_quick_ratio() >= esik and s.quick_ratio() >= esik and s.ratio() >= esik:
+                dusecekler.append(anahtar)
+        self._gecersiz_kil(dusecekler)
+
+    def stats(self):
+        istek = self.isabet + self.iskalama
+        return {
+            "politika": ONBELLEK_ADLARI[type(self)],
+            "kapasite": self.kapasite,
+            "girdi": len(self._girdiler),
+            "isabet": self.isabet,
+            "iskalama": self.iskalama,
+            "isabet_orani": round(self.isabet / istek, 4) if istek else None,
+            "tahliye": self.tahliye,
+            "gecersiz": self.gecersiz,
+        }
+
+
+class LfuAnswerCache(AnswerCache):
+    """En az kullanılan girdiyi atan AnswerCache (LFU)
+
+    Kullanım sayıları kovalarda tutulur; aynı sayıdaki girdilerden en
+    uzun süredir kullanılmayan atılır. Böylece sık gelen selamlaşmalar
+    bir kerelik soruların arasında önbellekten düşmez.
+    """
+
+    def __init__(self, kapasite=256):
+        super().__init__(kapasite)
+        self._sayilar = {}
+        # Kullanım sayısı -> o sayıdaki anahtarlar, eskiden yeniye
+        self._kovalar = {}
+        self._en_az = 0
+
+    def _kullanildi(self, anahtar):
+        sayi = self._sayilar.get(anahtar, 0)
+        if sayi:
+            kova = self._kovalar[sayi]
+            del kova[anahtar]
+            if not kova:
+                del self._kovalar[sayi]
+                if self._en_az == sayi:
+                    self._en_az = sayi + 1
+        else:
+            self._en_az = 1
+        self._sayilar[anahtar] = sayi + 1
+        self._kovalar.setdefault(sayi + 1, OrderedDict())[anahtar] = None
+
+    def _kurban(self):
+        # Geçersiz kılmalar en az kovayı boşaltmış olabilir
+        if self._en_az not in self._kovalar:
+            self._en_az = min(self._kovalar)
+        return next(iter(self._kovalar[self._en_az]))
+
+    def _at(self, anahtar):
+        del self._girdiler[anahtar]
+        sayi = self._sayilar.pop(anahtar)
+        kova = self._kovalar[sayi]
+        del kova[anahtar]
+        if not kova:
+            del self._kovalar[sayi]
+
+
+ONBELLEKLER = {
+    "lru": AnswerCache,
+    "lfu": LfuAnswerCache,
+}
+
+ONBELLEK_ADLARI = {sinif: ad for ad, sinif in ONBELLEKLER.items()}
+
+
+# Kapasite 0 ise önbellek kullanılmaz
+def onbellek_olustur(kapasite=256, politika="lru"):
+    if not kapasite:
+        return None
+    try:
+        sinif = ONBELLEKLER[politika]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen önbellek politikası: {politika}") from None
+    return sinif(kapasite)
@@ -0,0 +1,163 @@
+"""
+ChatCPT yakın kopya ayıklama
+MinHash ile neredeyse aynı soruları kümeler; sıkıştırılmış veritabanı ve
+takma ad tablosu yazar
+NumPy gerektirir (pip install numpy)
+"""
+
+import os
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from yz_index import ngramlar, normalle, soru_anahtari
+from yz_store import (PARCALI_UZANTI, SplitStore, atilan_cevaplari_oku, depo_ac,
+                      takma_adlari_oku, takma_adlari_yaz)
+
+_KAYDIR = None if np is None else np.uint64(32)
+
+
+class MinHasher:
+    """Karakter 3-gram kümelerinin MinHash imzası
+
+    İki imzanın eşit bileşen oranı, kümelerin Jaccard benzerliğinin
+    yansız tahminidir. 3-gram'lar CRC32 ile 32 bite özetlenir ve her
+    izin için çarp-kaydır ailesiyle karıştırılır: tek sayı a ve b 64
+    bittir, (a*x + b) mod 2^64'ün üst 32 biti alınır. Küçük çarpanlı
+    (a*x + b) mod p neredeyse x ile artan olduğundan tüm izinler aynı
+    en küçük 3-gram'ı seçer ve bantlar bağımsız kalmaz.
+    """
+
+    def __init__(self, izin=128, tohum=1):
+        if np is None:
+            raise ImportError("Yakın kopya ayıklama için numpy gerekli: pip install numpy")
+        rastgele = np.random.default_rng(tohum)
+        self.a = (rastgele.integers(0, 1 << 64, izin, dtype=np.uint64, endpoint=False)
+                  | np.uint64(1))[:, None]
+        self.b = rastgele.integers(0, 1 << 64, izin, dtype=np.uint64, endpoint=False)[:, None]
+
+    def imza(self, gramlar):
+        ozetler = np.fromiter(
+            (zlib.crc32(gram.encode("utf-8", "surrogatepass")) for gram in gramlar),
+            dtype=np.uint64, count=len(gramlar),
+        )
+        # uint64 taşması mod 2^64 demektir
+        return ((self.a * ozetler + self.b) >> _KAYDIR).min(axis=1)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def kumele(sorular, esik=0.9, bant=10, satir=12, tohum=1):
+    """Her soru için kümesinin kanonik sorusunun sırası
+
+    Sorular sırayla işlenir. İmzası `bant` banttan birinde bir kanonik
+    soruyla çakışan soru, aralarındaki gerçek 3-gram Jaccard benzerliği
+    `esik` üstündeyse en benzer kanoniğe katılır; yoksa kendisi kanonik
+    olur. Kümenin her üyesi kanoniğine doğrudan benzer; zincirleme
+    (A~B, B~C ama A≁C) birleşme olmaz. Bant ve satır sayısı, çakışma
+    olasılığının keskinleştiği benzerliği (1/bant)^(1/satir) ≈ 0.83'e
+    koyar; 0.9 benzerlikteki çiftlerin %96'sı aday olur.
+
+    Eşik bilerek yüksektir: tek kelimesi farklı iki soru (ör. "Tava
+    nedir", "Tavan nedir") 3-gram'larda 0.7-0.8 benzer olabilir.
+    """
+    hasher = MinHasher(bant * satir, tohum)
+    kovalar = [{} for _ in range(bant)]
+    kanonik_gramlari = {}
+    kanonikler = []
+
+    for sira, soru in enumerate(sorular):
+        gramlar = ngramlar(normalle(soru))
+        imza = hasher.imza(gramlar)
+        anahtarlar = [imza[i * satir:(i + 1) * satir].tobytes() for i in range(bant)]
+
+        # Eşit benzerlikte önce gelen kanonik seçilir
+        secilen, en_iyi = None, (esik, float("-inf"))
+        bakilan = set()
+        for kova, anahtar in zip(kovalar, anahtarlar):
+            for aday in kova.get(anahtar, ()):
+                if aday in bakilan:
+                    continue
+                bakilan.add(aday)
+                benzerlik = (jaccard(gramlar, kanonik_gramlari[aday]), -aday)
+                if benzerlik >= en_iyi:
+                    secilen, en_iyi = aday, benzerlik
+
+        if secilen is None:
+            secilen = sira
+            kanonik_gramlari[sira] = gramlar
+            for kova, anahtar in zip(kovalar, anahtarlar):
+                kova.setdefault(anahtar, []).append(sira)
+        kanonikler.append(secilen)
+    return kanonikler
+
+
+# Ayıklanmış deponun varsayılan yolu: database.json -> database.dedup.json
+def ayiklanmis_yol(yol):
+    for uzanti in (SplitStore.UZANTI, PARCALI_UZANTI):
+        if yol.endswith(uzanti):
+            return f"{yol[:-len(uzanti)]}.dedup{uzanti}"
+    kok, uzanti = os.path.splitext(yol)
+    return f"{kok}.dedup{uzanti}"
+
+
+def ayikla(kaynak_yolu, hedef_yolu=None, esik=0.9, ustune_yaz=False):
+    """Yakın kopyaları birleştirip `hedef_yolu` deposuna yazar
+
+    Hedef verilmezse ayiklanmis_yol kullanılır; kaynağın üstüne yalnızca
+    `ustune_yaz` ile yazılır. Her kümenin kanonik kaydı, yani ilk
+    öğretilen soru, yazımı, cevabı, kaynağı ve ömrüyle kalır. Birleştirilen
+    her yazım takma ad tablosuna (bkz. takma_ad_yolu) kanonik soruyla
+    birlikte yazılır; cevabı kanoniğinkinden farklıysa atılan cevap da
+    tablonun `atilan_cevaplar` bölümüne girer. Kaynaktaki eski tablo yeni
+    kanoniklere yönlendirilerek taşınır.
+    (önceki kayıt sayısı, kalan kayıt sayısı) döner.
+    """
+    if ustune_yaz:
+        hedef_yolu = hedef_yolu or kaynak_yolu
+    else:
+        hedef_yolu = hedef_yolu or ayiklanmis_yol(kaynak_yolu)
+    if os.path.abspath(hedef_yolu) == os.path.abspath(kaynak_yolu) and not ustune_yaz:
+        raise ValueError(f"{kaynak_yolu} üstüne yazmak için ustune_yaz gerekli")
+    depo = depo_ac(kaynak_yolu)
+    try:
+        kayitlar = depo.load()
+    finally:
+        depo.close()
+
+    kanonikler = kumele([kayit["soru"] for kayit in kayitlar], esik)
+    birlesik = {}
+    takma_adlar = {}
+    atilanlar = {}
+    for sira, (kayit, kanonik) in enumerate(zip(kayitlar, kanonikler)):
+        if kanonik == sira:
+            birlesik[kanonik] = kayit
+            continue
+        kanonik_kayit = kayitlar[kanonik]
+        takma_adlar[kayit["soru"]] = kanonik_kayit["soru"]
+        if kayit["cevap"] != kanonik_kayit["cevap"]:
+            atilanlar[kayit["soru"]] = kayit["cevap"]
+
+    # Önceki ayıklamanın takma adları, kanoniği bu kez birleştiyse yeni kanoniğe
+    # gider; o arada kendisi kayıt olarak öğretilmiş yazımlar tablodan çıkar
+    yeni_kanonik = {soru_anahtari(takma_ad): kanonik for takma_ad, kanonik in takma_adlar.items()}
+    kalanlar = {soru_anahtari(kayit["soru"]) for kayit in birlesik.values()}
+    eski_atilanlar = atilan_cevaplari_oku(kaynak_yolu)
+    for takma_ad, kanonik in takma_adlari_oku(kaynak_yolu).items():
+        if soru_anahtari(takma_ad) not in kalanlar:
+            takma_adlar.setdefault(takma_ad, yeni_kanonik.get(soru_anahtari(kanonik), kanonik))
+            if takma_ad in eski_atilanlar:
+                atilanlar.setdefault(takma_ad, eski_atilanlar[takma_ad])
+
+    hedef = depo_ac(hedef_yolu)
+    try:
+        hedef.save({"sorular": list(birlesik.values())})
+    finally:
+        hedef.close()
+    takma_adlari_yaz(hedef_yolu, takma_adlar, atilanlar)
+    return len(kayitlar), len(birlesik)
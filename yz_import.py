@@ -0,0 +1,213 @@
+"""
+ChatCPT toplu içe aktarma
+JSONL/CSV soru-cevap derlemlerini süreç havuzunda ayrıştırıp normalleştirir,
+bilgi tabanına tek seferde yazar
+"""
+
+import codecs
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from yz_index import eslestirici_adi, eslestirici_olustur, normalle, soru_anahtari
+from yz_kb import kayit_sorulari
+from yz_shard import parcali_indeks
+from yz_store import depo_ac, indeks_kaydet, json_kayitlari_oku
+
+# İşçiye bir seferde gönderilen JSONL baytı ve CSV/JSON kaydı
+PARCA = 4 << 20
+GRUP = 20000
+
+
+def _jsonl_ciftleri(parca, soru_alani, cevap_alani):
+    for satir in parca.split(b"\n"):
+        if not satir.strip():
+            continue
+        try:
+            veri = json.loads(satir)
+        except ValueError:
+            yield None
+            continue
+        yield (veri.get(soru_alani), veri.get(cevap_alani)) if isinstance(veri, dict) else None
+
+
+def _parca_isle(parca, soru_alani, cevap_alani):
+    """JSONL baytları ya da (soru, cevap) çiftleri ->
+    ([(anahtar, soru, cevap, normal)], okunan, atlanan)
+
+    Parça içinde aynı anahtar tek kayda iner: ilk yazım kalır, son cevap
+    geçerlidir. Sorusu boş ya da alanları metin olmayan satır atlanır.
+    """
+    if isinstance(parca, bytes):
+        parca = _jsonl_ciftleri(parca, soru_alani, cevap_alani)
+    kayitlar = {}
+    okunan = atlanan = 0
+    for cift in parca:
+        okunan += 1
+        soru, cevap = cift or (None, None)
+        if not isinstance(soru, str) or not isinstance(cevap, str) or not soru.strip():
+            atlanan += 1
+            continue
+        anahtar = soru_anahtari(soru)
+        mevcut = kayitlar.get(anahtar)
+        kayitlar[anahtar] = (soru if mevcut is None else mevcut[0], cevap)
+    return [
+        (anahtar, soru, cevap, normalle(soru)) for anahtar, (soru, cevap) in kayitlar.items()
+    ], okunan, atlanan
+
+
+# Satır sınırında bölünmüş JSONL parçaları
+def _jsonl_parcalari(yol, parca):
+    with open(yol, 'rb') as dosya:
+        kalan = dosya.read(len(codecs.BOM_UTF8))
+        if kalan == codecs.BOM_UTF8:
+            kalan = b""
+        while True:
+            ham = dosya.read(parca)
+            if not ham:
+                break
+            ham = kalan + ham
+            son = ham.rfind(b"\n")
+            if son < 0:
+                kalan = ham
+                continue
+            yield ham[:son]
+            kalan = ham[son + 1:]
+        if kalan.strip():
+            yield kalan
+
+
+# Tırnak içinde satır sonu olabildiğinden CSV bu süreçte okunur, işçiye çiftler gider
+def _csv_ciftleri(yol, soru_alani, cevap_alani):
+    with open(yol, newline='', encoding='utf-8-sig') as dosya:
+        okuyucu = csv.reader(dosya)
+        baslik = next(okuyucu, None)
+        if baslik is None:
+            return
+        try:
+            soru_sutunu, cevap_sutunu = baslik.index(soru_alani), baslik.index(cevap_alani)
+        except ValueError:
+            raise ValueError(
+                f"{yol}: başlıkta '{soru_alani}' ve '{cevap_alani}' sütunları yok"
+            ) from None
+        gerekli = max(soru_sutunu, cevap_sutunu)
+        for satir in okuyucu:
+            if len(satir) > gerekli:
+                yield satir[soru_sutunu], satir[cevap_sutunu]
+            elif satir:
+                yield None
+
+
+def _json_ciftleri(yol, soru_alani, cevap_alani):
+    for kayit in json_kayitlari_oku(yol):
+        yield (kayit.get(soru_alani), kayit.get(cevap_alani)) if isinstance(kayit, dict) else None
+
+
+def _gruplar(ciftler, grup):
+    while True:
+        parca = list(islice(ciftler, grup))
+        if not parca:
+            return
+        yield parca
+
+
+# Uzantıya göre: .csv, .json (database.json biçimi), diğerleri JSONL
+def kaynak_parcalari(yol, soru_alani="soru", cevap_alani="cevap", parca=None, grup=None):
+    parca, grup = parca or PARCA, grup or GRUP
+    uzanti = os.path.splitext(yol)[1].lower()
+    if uzanti == ".csv":
+        return _gruplar(_csv_ciftleri(yol, soru_alani, cevap_alani), grup)
+    if uzanti == ".json":
+        return _gruplar(_json_ciftleri(yol, soru_alani, cevap_alani), grup)
+    return _jsonl_parcalari(yol, parca)
+
+
+def ice_aktar(kaynaklar, hedef_yolu, isci_sayisi=None, soru_alani="soru", cevap_alani="cevap",
+              eslestiriciler=("ngram",)):
+    """Kaynak dosyalardaki kayıtları `hedef_yolu` deposuna tek seferde ekler
+
+    Ayrıştırma, anahtar çıkarma ve normalleştirme işçi süreçlerde
+    parça parça yapılır; sonuçlar giriş sırasıyla birleştirilir, bu
+    yüzden tekrar eden soruda (kaynaklar arasında da) ilk yazım kalır,
+    son cevap geçerlidir. Depodaki kayıtlara öğretmeyle aynı kural
+    uygulanır. Ardından `eslestiriciler` indeksleri tüm sorular
+    üzerinden tek geçişte, işçilerin normalleriyle kurulup kaydedilir;
+    kendi indeksini tutan depoda (SQLite) indeks kurulmaz.
+
+    {"okunan", "atlanan", "aktarilan", "toplam", "sure"} döner.
+    """
+    baslangic = time.perf_counter()
+    isci_sayisi = isci_sayisi or os.cpu_count() or 1
+    for ad in eslestiriciler:
+        eslestirici_olustur(ad)
+
+    kayitlar = {}
+    # İçe aktarılan soru -> işçide hesaplanan normal
+    normaller = {}
+    okunan = atlanan = 0
+    parcalar = (
+        parca for yol in kaynaklar
+        for parca in kaynak_parcalari(yol, soru_alani, cevap_alani)
+    )
+    bekleyenler = deque()
+    with ProcessPoolExecutor(isci_sayisi) as havuz:
+        while True:
+            # Parçalar işçileri meşgul tutacak kadar okunur, dosyanın tamamı değil
+            while len(bekleyenler) < isci_sayisi * 2:
+                parca = next(parcalar, None)
+                if parca is None:
+                    break
+                bekleyenler.append(havuz.submit(_parca_isle, parca, soru_alani, cevap_alani))
+            if not bekleyenler:
+                break
+
+            sonuclar, parca_okunan, parca_atlanan = bekleyenler.popleft().result()
+            okunan += parca_okunan
+            atlanan += parca_atlanan
+            for anahtar, soru, cevap, normal in sonuclar:
+                mevcut = kayitlar.get(anahtar)
+                if mevcut is None:
+                    kayitlar[anahtar] = {"soru": soru, "cevap": cevap}
+                    normaller[soru] = normal
+                else:
+                    mevcut["cevap"] = cevap
+
+    depo = depo_ac(hedef_yolu)
+    try:
+        # JournalStore birleşik eşlemeyi döndürür; diğerleri kayıtlarını diskte sorgular
+        birlesik = depo.import_records(kayitlar.values())
+        if birlesik is None:
+            sorular, toplam = depo.questions(), len(depo.records())
+        else:
+            sorular, toplam = kayit_sorulari(birlesik), len(birlesik)
+
+        if not getattr(depo, "kalici_indeks", False):
+            # Parçalı depoda indeks, bilgi_tabani_ac'ın açacağı parçalı adla kaydedilir
+            parca = getattr(depo, "parca_sayisi", 1)
+            indeksler = [parcali_indeks(ad, parca) for ad in eslestiriciler]
+            for soru in sorular:
+                normal = normaller.get(soru)
+                if normal is None:
+                    normal = normalle(soru)
+                for indeks in indeksler:
+                    indeks.add(soru, normal)
+            for indeks in indeksler:
+                ad = eslestirici_adi(indeks)
+                if hasattr(depo, "save_index"):
+                    depo.save_index(ad, indeks)
+                else:
+                    indeks_kaydet(hedef_yolu, ad, indeks)
+    finally:
+        depo.close()
+
+    return {
+        "okunan": okunan,
+        "atlanan": atlanan,
+        "aktarilan": len(kayitlar),
+        "toplam": toplam,
+        "sure": time.perf_counter() - baslangic,
+    }
@@ -0,0 +1,599 @@
+"""
+ChatCPT bilgi tabanı indeksleri
+Soru eşleştirmede SequenceMatcher'dan önce aday seçmek için kullanılır
+"""
+
+import heapq
+import importlib
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import chain
+
+
+# Büyük/küçük harf ve boşluk farkı aynı soru sayılır
+def soru_anahtari(soru):
+    return " ".join(soru.split()).casefold()
+
+
+# casefold "I" harfini "i", "İ" harfini "i̇" yapar; Türkçede önce elle çevrilir
+_TURKCE_BUYUK = str.maketrans({"I": "ı", "İ": "i"})
+_KATLAMA = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NOKTALAMA = re.compile(r"[\W_]+")
+
+
+# Eşleştirmede kullanılan biçim: Türkçe küçük harf, aksansız, noktalamasız,
+# tek boşluklu. "Nasılsın", "nasilsin" ve "NASILSIN?" aynı metne döner.
+def normalle(metin):
+    metin = metin.translate(_TURKCE_BUYUK).casefold().translate(_KATLAMA)
+    if not metin.isascii():
+        metin = "".join(
+            c for c in unicodedata.normalize("NFKD", metin) if not unicodedata.combining(c)
+        )
+    return " ".join(_NOKTALAMA.sub(" ", metin).split())
+
+
+# Kenarlar boşlukla doldurulur, böylece kısa sorular da n-gram üretir
+def ngramlar(metin, n=3):
+    dolgu = " " * (n - 1)
+    dolgulu = f"{dolgu}{metin}{dolgu}"
+    return {dolgulu[i:i + n] for i in range(len(dolgulu) - n + 1)}
+
+
+# difflib oranı 2*M/T; M eşleşen karakter sayısıdır. İki boş metin için 1.
+def _oran(eslesen, toplam):
+    return 2.0 * eslesen / toplam if toplam else 1.0
+
+
+# Aşama sayaçları: gelen adaylar, uzunluk sınırını, karakter örtüşmesi
+# sınırını geçenler ve eşik üstü puanlanıp ilk k'ya girenler
+ASAMALAR = ("sorgu", "aday", "uzunluk", "ortusme", "eslesme")
+
+
+class StagedScorer:
+    """get_close_matches elemesini aşamalara bölen ilk k puanlayıcı
+
+    Her aşama difflib oranının bir üst sınırıdır ve bir sonrakinden
+    ucuzdur:
+
+    1. Uzunluk: adaylar uzunluklarına göre kovalanır; kovanın sınırı
+       real_quick_ratio ile aynıdır. Kovalar sınıra göre azalan sırada
+       gezilir.
+    2. Karakter örtüşmesi: ortak karakter çoklu kümesi, quick_ratio ile
+       aynı sınır.
+    3. SequenceMatcher.ratio(); sorgu tarafı bir kez hazırlanır.
+
+    İlk k sonuç bir yığında tutulur. Sınırı yığının en kötüsünü
+    geçemeyen aday puanlanmaz; kalan kovaların sınırı onun altına
+    düşünce tarama biter, k tam eşleşme bulunduğunda da böyle olur.
+    Eşit skorlarda get_close_matches gibi büyük soru önce gelir, bu
+    yüzden sonuç tam taramayla birebir aynıdır.
+
+    `sayaclar` her aşamadan geçen aday sayısını, `sure` puanlamada
+    geçen toplam saniyeyi biriktirir (bkz. ASAMALAR, yz_querylog).
+    Puanlayıcı iş parçacıkları arasında paylaşılır; sayaçlar kilitle
+    güncellenir, tutarlı okuma için `ozet()` kullanılır.
+    """
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._kilit:
+            self.sayaclar = dict.fromkeys(ASAMALAR, 0)
+            self.sure = 0.0
+
+    # Sayaçların kopyası ve süre, aynı anda alınmış
+    def ozet(self):
+        with self._kilit:
+            return dict(self.sayaclar), self.sure
+
+    # (normal, soru) adaylarından skoru en yüksek k tanesi: (soru, skor)
+    def top_k(self, normal, adaylar, k=1, cutoff=0.6):
+        baslangic = time.perf_counter()
+        kovalar = {}
+        adet = 0
+        for cift in adaylar:
+            adet += 1
+            kova = kovalar.get(len(cift[0]))
+            if kova is None:
+                kovalar[len(cift[0])] = [cift]
+            else:
+                kova.append(cift)
+
+        uzunluk = len(normal)
+        sirali = sorted(
+            ((_oran(min(uzunluk, aday_uzunlugu), uzunluk + aday_uzunlugu), aday_uzunlugu)
+             for aday_uzunlugu in kovalar),
+            reverse=True,
+        )
+        s = SequenceMatcher()
+        s.set_seq2(normal)
+        sorgu_sayilari = Counter(normal)
+        yigin = []
+        gecen = puanlanan = 0
+
+        for sinir, aday_uzunlugu in sirali:
+            if k < 1 or sinir < cutoff or (len(yigin) == k and sinir < yigin[0][0]):
+                break
+            toplam = uzunluk + aday_uzunlugu
+            kova = kovalar[aday_uzunlugu]
+            gecen += len(kova)
+            for aday_normal, aday in kova:
+                ortak = 0
+                for harf, sayi in Counter(aday_normal).items():
+                    sorguda = sorgu_sayilari.get(harf)
+                    if sorguda:
+                        ortak += sayi if sayi < sorguda else sorguda
+                sinir = _oran(ortak, toplam)
+                if len(yigin) == k:
+                    if (sinir, aday) <= yigin[0]:
+                        continue
+                elif sinir < cutoff:
+                    continue
+
+                puanlanan += 1
+                s.set_seq1(aday_normal)
+                skor = s.ratio()
+                if len(yigin) == k:
+                    if (skor, aday) > yigin[0]:
+                        heapq.heapreplace(yigin, (skor, aday))
+                elif skor >= cutoff:
+                    heapq.heappush(yigin, (skor, aday))
+
+        self.ekle(adet, gecen, puanlanan, len(yigin), time.perf_counter() - baslangic)
+        return [(aday, skor) for skor, aday in sorted(yigin, reverse=True)]
+
+    # Bir sorgunun aşama sayıları ve süresi; kendi puanlamasını yapan
+    # eşleştiriciler (BKTree) de buraya yazar
+    def ekle(self, adet, gecen, puanlanan, eslesen, sure):
+        with self._kilit:
+            sayaclar = self.sayaclar
+            sayaclar["sorgu"] += 1
+            sayaclar["aday"] += adet
+            sayaclar["uzunluk"] += gecen
+            sayaclar["ortusme"] += puanlanan
+            sayaclar["eslesme"] += eslesen
+            self.sure += sure
+
+    # Başka bir puanlayıcının sayaç ve süre farkı; süreç havuzundaki
+    # parçaların sayaçları ana süreçte böyle toplanır (bkz. yz_shard)
+    def birlestir(self, sayaclar, sure):
+        with self._kilit:
+            for asama, sayi in sayaclar.items():
+                self.sayaclar[asama] += sayi
+            self.sure += sure
+
+
+# Tüm eşleştiricilerin ortak puanlayıcısı; sayaçları ölçümlerde okunur
+PUANLAYICI = StagedScorer()
+
+
+# get_close_matches ile aynı eleme ve puanlama, ama skorla birlikte ilk k sonuç.
+# Normalleştirilmiş sorgu, (normal, soru) adaylarının normaliyle karşılaştırılır;
+# adayların normali indekste bir kez hesaplanıp saklanır.
+def en_iyiler(normal, adaylar, k=1, cutoff=0.6):
+    return PUANLAYICI.top_k(normal, adaylar, k, cutoff)
+
+
+# Ayrı aday kümelerinin (soru, skor) ilk k listelerinden genel ilk k; StagedScorer
+# gibi eşit skorda büyük soru önce gelir, böylece sıra tek taramanın sırasıyla aynıdır
+def ilk_k_birlestir(listeler, k):
+    return sorted(chain.from_iterable(listeler), key=lambda cift: (cift[1], cift[0]),
+                  reverse=True)[:k]
+
+
+# Oranı f'ye ulaşabilen sorunun sorguya en fazla Levenshtein mesafesi (bkz. BKTree)
+def yaricap(uzunluk, f):
+    if f <= 0:
+        return float("inf")
+    return int((1 - f) * 2 * uzunluk / f + 1e-9)
+
+
+# Myers/Hyyrö bit-paralel Levenshtein mesafesi; kısa dizenin her karakteri
+# bir bit, uzun dizenin her karakteri için sabit sayıda tamsayı işlemi
+def levenshtein(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    if not a:
+        return len(b)
+
+    esit = {}
+    for i, c in enumerate(a):
+        esit[c] = esit.get(c, 0) | (1 << i)
+    maske = (1 << len(a)) - 1
+    son = 1 << (len(a) - 1)
+
+    pv, mv, mesafe = maske, 0, len(a)
+    for c in b:
+        eq = esit.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & maske)
+        mh = pv & xh
+        if ph & son:
+            mesafe += 1
+        elif mh & son:
+            mesafe -= 1
+        ph = ((ph << 1) | 1) & maske
+        mh = (mh << 1) & maske
+        pv = mh | (~(xv | ph) & maske)
+        mv = ph & xv
+    return mesafe
+
+
+class NgramIndex:
+    """Karakter n-gram ters indeksi
+
+    Her soru bir kez normalleştirilip parçalanır; sorgu anında yalnızca
+    sorguyla n-gram paylaşan sorular sayılır ve en çok örtüşen
+    `aday_limiti` kadarı difflib ile puanlanır. n-gram örtüşmesi difflib
+    oranını sınırlamadığından aday kümesi dışında kalan sorular da
+    uzunluk sınırıyla (real_quick_ratio) denetlenir: yalnızca sınırı
+    adaylardan bulunan k. skora ulaşabilen uzunluklar puanlanır. Böylece
+    ilk k sonuç LinearIndex ile birebir aynıdır; iyi bir aday bulunamayan
+    sorgularda bu denetim tam taramaya yaklaşır.
+
+    Silinen sorunun kimliği boşaltılır; posting listeleri ancak ölü
+    kimlikler canlıları geçince yeniden kurulur, böylece ekleme ve
+    silme amortize O(1) kalır.
+    """
+
+    def __init__(self, sorular=(), n=3, aday_limiti=64, yaygin_oran=0.25):
+        self.n = n
+        self.aday_limiti = aday_limiti
+        # Sorguların çoğunda geçen n-gram'lar (ör. "  n") aday ayırt etmez
+        self.yaygin_oran = yaygin_oran
+        self._sifirla()
+        for soru in sorular:
+            self.add(soru)
+
+    def _sifirla(self):
+        self.sorular = []
+        self.normaller = []
+        self._idler = {}
+        self._gram_sayilari = []
+        self._postings = {}
+        # Normal uzunluğu -> canlı kimlikler
+        self._uzunluklar = {}
+        self._silinen = 0
+
+    def __len__(self):
+        return len(self._idler)
+
+    def __contains__(self, soru):
+        return soru in self._idler
+
+    def __iter__(self):
+        return iter(list(self._idler))
+
+    def remove(self, soru):
+        soru_id = self._idler.pop(soru, None)
+        if soru_id is None:
+            return
+        self._uzunluklar[len(self.normaller[soru_id])].discard(soru_id)
+        self.sorular[soru_id] = None
+        self.normaller[soru_id] = None
+        self._silinen += 1
+        if self._silinen > len(self._idler):
+            canlilar = list(self._idler)
+            self._sifirla()
+            for canli in canlilar:
+                self.add(canli)
+
+    # `normal` önceden hesaplandıysa (bkz. yz_import) yeniden normalleştirilmez
+    def add(self, soru, normal=None):
+        if soru in self._idler:
+            return
+        soru_id = len(self.sorular)
+        if normal is None:
+            normal = normalle(soru)
+        self.sorular.append(soru)
+        self.normaller.append(normal)
+        self._idler[soru] = soru_id
+        self._uzunluklar.setdefault(len(normal), set()).add(soru_id)
+        gramlar = ngramlar(normal, self.n)
+        self._gram_sayilari.append(len(gramlar))
+        for gram in gramlar:
+            self._postings.setdefault(gram, []).append(soru_id)
+
+    # Normalleştirilmiş sorgu için en çok örtüşen canlı soruların kimlikleri
+    def _aday_idleri(self, normal):
+        gramlar = ngramlar(normal, self.n)
+        listeler = sorted(
+            (self._postings[g] for g in gramlar if g in self._postings),
+            key=len,
+        )
+        if not listeler:
+            return []
+
+        esik = max(self.aday_limiti, int(len(self) * self.yaygin_oran))
+        seyrek = [liste for liste in listeler if len(liste) <= esik]
+        sayac = Counter()
+        for liste in seyrek or listeler:
+            sayac.update(liste)
+
+        # Dice benzeri oran: uzun soruların ham örtüşme avantajını dengeler
+        toplam = len(gramlar)
+        canli = sayac.items()
+        if self._silinen:
+            canli = [kv for kv in canli if self.sorular[kv[0]] is not None]
+        secilen = heapq.nlargest(
+            self.aday_limiti,
+            canli,
+            key=lambda kv: kv[1] / (toplam + self._gram_sayilari[kv[0]]),
+        )
+        return [i for i, _ in secilen]
+
+    def candidates(self, soru):
+        return [self.sorular[i] for i in self._aday_idleri(normalle(soru))]
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        normal = normalle(soru)
+        idler = self._aday_idleri(normal)
+        sonuc = en_iyiler(normal, [(self.normaller[i], self.sorular[i]) for i in idler], k, cutoff)
+        if k < 1 or len(idler) == len(self):
+            return sonuc
+
+        # Aday seçiminin dışarıda bıraktıkları: yalnızca uzunluk sınırı ilk k'nın
+        # en kötüsüne (k sonuç yoksa eşiğe) ulaşabilenler puanlanır
+        taban = sonuc[-1][1] if len(sonuc) == k else cutoff
+        secilen = set(idler)
+        uzunluk = len(normal)
+        kalanlar = [
+            (self.normaller[i], self.sorular[i])
+            for aday_uzunlugu, kimlikler in self._uzunluklar.items()
+            if _oran(min(uzunluk, aday_uzunlugu), uzunluk + aday_uzunlugu) >= taban
+            for i in kimlikler if i not in secilen
+        ]
+        if not kalanlar:
+            return sonuc
+        return ilk_k_birlestir([sonuc, en_iyiler(normal, kalanlar, k, taban)], k)
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
+
+
+class _Dugum:
+    __slots__ = ("anahtar", "sorular", "cocuklar")
+
+    def __init__(self, anahtar):
+        self.anahtar = anahtar
+        # Normali aynı olan tüm sorular aynı düğümde durur
+        self.sorular = []
+        self.cocuklar = {}
+
+
+class BKTree:
+    """Normalleştirilmiş sorular üzerinde Levenshtein BK-ağacı
+
+    difflib oranı 2M/(L+m), Levenshtein mesafesi d ile sınırlıdır:
+    d <= L+m-2M olduğundan oran <= 1 - d/(L+m). Oranı f'ye ulaşabilen
+    sorunun uzunluğu da m <= L(2-f)/f ile sınırlı olduğundan arama
+    yarıçapı (1-f)*2L/f'dir (bkz. yaricap). Taban f önce eşik, ilk k
+    dolunca k. skordur; yarıçap bulunan skorlar yükseldikçe daralır ve
+    üçgen eşitsizliği sayesinde yalnızca ona düşebilecek dallar gezilir.
+    Adaylar LinearIndex ile aynı oranla puanlandığından ilk k sonuç tam
+    taramayla birebir aynıdır. Düşük eşikte yarıçap geniştir (0.6'da
+    1.33L); iyi eşleşmesi olmayan sorgu ağacın çoğunu gezer.
+
+    Sorusu kalmayan düğüm ağaçta boş kalır (aynı normal gelirse yeniden
+    dolar); boş düğümler canlı soruları geçince ağaç yeniden kurulur.
+    """
+
+    def __init__(self, sorular=()):
+        self._sifirla()
+        # Son aramada mesafesi hesaplanan düğüm sayısı
+        self.son_ziyaret = 0
+        for soru in sorular:
+            self.add(soru)
+
+    def _sifirla(self):
+        self._kok = None
+        self._dugumler = {}
+        self._silinen = 0
+
+    def __len__(self):
+        return len(self._dugumler)
+
+    def __contains__(self, soru):
+        return soru in self._dugumler
+
+    def __iter__(self):
+        return iter(list(self._dugumler))
+
+    def remove(self, soru):
+        dugum = self._dugumler.pop(soru, None)
+        if dugum is None:
+            return
+        dugum.sorular.remove(soru)
+        if not dugum.sorular:
+            self._silinen += 1
+        if self._silinen > len(self._dugumler):
+            canlilar = list(self._dugumler)
+            self._sifirla()
+            for canli in canlilar:
+                self.add(canli)
+
+    def add(self, soru, normal=None):
+        if soru in self._dugumler:
+            return
+        dugum = self._dugum_bul(normalle(soru) if normal is None else normal)
+        dugum.sorular.append(soru)
+        self._dugumler[soru] = dugum
+
+    # Normalin düğümünü bulur; yoksa ağaca ekler
+    def _dugum_bul(self, anahtar):
+        if self._kok is None:
+            self._kok = _Dugum(anahtar)
+            return self._kok
+
+        mevcut = self._kok
+        while True:
+            mesafe = levenshtein(anahtar, mevcut.anahtar)
+            if mesafe == 0:
+                # Boş kalmış düğüm yeniden dolar
+                if not mevcut.sorular:
+                    self._silinen -= 1
+                return mevcut
+            cocuk = mevcut.cocuklar.get(mesafe)
+            if cocuk is None:
+                cocuk = mevcut.cocuklar[mesafe] = _Dugum(anahtar)
+                return cocuk
+            mevcut = cocuk
+
+    # Yarıçap içindeki dolu düğümlerin (normal, soru) çiftleri
+    def _ara(self, anahtar, max_mesafe):
+        self.son_ziyaret = 0
+        if self._kok is None:
+            return []
+
+        bulunan = []
+        yigin = [self._kok]
+        while yigin:
+            dugum = yigin.pop()
+            mesafe = levenshtein(anahtar, dugum.anahtar)
+            self.son_ziyaret += 1
+            if mesafe <= max_mesafe:
+                bulunan.extend((dugum.anahtar, soru) for soru in dugum.sorular)
+            for kenar, cocuk in dugum.cocuklar.items():
+                if mesafe - max_mesafe <= kenar <= mesafe + max_mesafe:
+                    yigin.append(cocuk)
+        return bulunan
+
+    def search(self, soru, max_mesafe):
+        return [soru for _, soru in self._ara(normalle(soru), max_mesafe)]
+
+    def candidates(self, soru, cutoff=0.6):
+        normal = normalle(soru)
+        return [soru for _, soru in self._ara(normal, yaricap(len(normal), cutoff))]
+
+    # Gezilirken puanlanır; ilk k dolunca yarıçap k. skora göre daraltılır.
+    # Eleme ve eşit skor sırası StagedScorer.top_k ile aynıdır.
+    def top_k(self, soru, k=3, cutoff=0.6):
+        baslangic = time.perf_counter()
+        normal = normalle(soru)
+        self.son_ziyaret = 0
+        if self._kok is None or k < 1:
+            return []
+
+        uzunluk = len(normal)
+        s = SequenceMatcher()
+        s.set_seq2(normal)
+        sonuclar = []
+        taban = cutoff
+        en_uzak = yaricap(uzunluk, taban)
+        gecen = puanlanan = 0
+        bekleyen = [self._kok]
+        while bekleyen:
+            dugum = bekleyen.pop()
+            mesafe = levenshtein(normal, dugum.anahtar)
+            self.son_ziyaret += 1
+            if dugum.sorular and mesafe <= en_uzak:
+                aday_uzunlugu = len(dugum.anahtar)
+                toplam = uzunluk + aday_uzunlugu
+                sinir = min(_oran(min(uzunluk, aday_uzunlugu), toplam),
+                            (toplam - mesafe) / toplam if toplam else 1.0)
+                gecen += len(dugum.sorular)
+                if sinir + 1e-12 >= taban:
+                    puanlanan += len(dugum.sorular)
+                    s.set_seq1(dugum.anahtar)
+                    skor = s.ratio()
+                    for aday in dugum.sorular:
+                        if len(sonuclar) == k:
+                            if (skor, aday) > sonuclar[0]:
+                                heapq.heapreplace(sonuclar, (skor, aday))
+                        elif skor >= cutoff:
+                            heapq.heappush(sonuclar, (skor, aday))
+                    if len(sonuclar) == k and sonuclar[0][0] > taban:
+                        taban = sonuclar[0][0]
+                        en_uzak = yaricap(uzunluk, taban)
+            for kenar, cocuk in dugum.cocuklar.items():
+                if mesafe - en_uzak <= kenar <= mesafe + en_uzak:
+                    bekleyen.append(cocuk)
+
+        PUANLAYICI.ekle(self.son_ziyaret, gecen, puanlanan, len(sonuclar),
+                        time.perf_counter() - baslangic)
+        return [(aday, skor) for skor, aday in sorted(sonuclar, reverse=True)]
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
+
+
+class LinearIndex:
+    """Her sorguda tüm soruları tarayan indeks
+
+    yz.py'nin ilk hâlindeki get_close_matches taramasıdır, yalnızca
+    normalleştirilmiş sorular karşılaştırılır; diğer eşleştiricilerin
+    doğruluğu ve hızı bununla karşılaştırılır.
+    """
+
+    def __init__(self, sorular=()):
+        # Soru -> normal
+        self._sorular = {}
+        for soru in sorular:
+            self.add(soru)
+
+    def __len__(self):
+        return len(self._sorular)
+
+    def __contains__(self, soru):
+        return soru in self._sorular
+
+    def __iter__(self):
+        return iter(list(self._sorular))
+
+    def add(self, soru, normal=None):
+        if soru not in self._sorular:
+            self._sorular[soru] = normalle(soru) if normal is None else normal
+
+    def remove(self, soru):
+        self._sorular.pop(soru, None)
+
+    def candidates(self, soru):
+        return list(self._sorular)
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        adaylar = ((normal, aday) for aday, normal in self._sorular.items())
+        return en_iyiler(normalle(soru), adaylar, k, cutoff)
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
+
+
+# İsteğe bağlı bağımlılığı olanlar yalnızca seçildiklerinde içe aktarılır
+ESLESTIRICILER = {
+    "ngram": ("yz_index", "NgramIndex"),
+    "bktree": ("yz_index", "BKTree"),
+    "tfidf": ("yz_vector", "TfidfIndex"),
+    "linear": ("yz_index", "LinearIndex"),
+    "lsh": ("yz_vector", "LshIndex"),
+}
+
+
+# Yapılandırmadaki ada göre boş bir eşleştirici indeks oluşturur
+def eslestirici_olustur(ad):
+    try:
+        modul, sinif = ESLESTIRICILER[ad]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen eşleştirici: {ad}") from None
+    return getattr(importlib.import_module(modul), sinif)()
+
+
+# Bir indeks nesnesinin yapılandırmadaki adı; kayıtlı değilse None
+def eslestirici_adi(indeks):
+    # Parçalı indeks (bkz. yz_shard) adını parça sayısıyla kendisi verir
+    ad = getattr(indeks, "ad", None)
+    if isinstance(ad, str):
+        return ad
+    for ad, (_, sinif) in ESLESTIRICILER.items():
+        if type(indeks).__name__ == sinif:
+            return ad
+    return None
@@ -0,0 +1,688 @@
+"""
+ChatCPT bilgi tabanı
+Soru-cevap kayıtlarını ve eşleştirme indeksini birlikte tutar
+"""
+
+import queue
+import threading
+import time
+from collections.abc import MutableMapping
+from concurrent.futures import Future
+
+from yz_index import NgramIndex, normalle, soru_anahtari
+from yz_lock import RWLock
+from yz_ttl import NegativeCache, kayit_bitisi, kayit_ekleri, suresi_doldu
+
+
+# Cevabı ayrıca çözülen eşlemelerde (AnlikKayitlar) sorular cevaba dokunmadan okunur
+def kayit_sorulari(kayitlar):
+    if hasattr(kayitlar, "questions"):
+        return kayitlar.questions()
+    return (kayit["soru"] for kayit in kayitlar.values())
+
+
+class CompactRecords(MutableMapping):
+    """Paralel listelerde tutulan anahtar -> kayıt eşlemesi
+
+    Her kayıt için ayrı sözlük yerine anahtardan kayıt kimliğine bir
+    sözlük ve kimliğe göre soru ve cevap listeleri tutulur; kayıt
+    sözlüğü yalnızca erişildiğinde kurulur. Soru anahtarıyla aynıysa
+    iki metin tek nesneyi paylaşır.
+
+    Kimlikler ekleme sırasıyla verilir ve eşleme yaşadıkça değişmez:
+    güncelleme kimliği korur, silinen kimlik yeniden kullanılmaz.
+
+    Kaynak, zaman ve ttl alanları (bkz. yz_ttl.EK_ALANLAR) yalnızca
+    bunları taşıyan kayıtlar için ayrı bir sözlükte durur.
+    """
+
+    def __init__(self, kayitlar=()):
+        self._idler = {}
+        # Kimlik -> soru / cevap; silinen kayıtların yerinde None kalır
+        self._sorular = []
+        self._cevaplar = []
+        # Kimlik -> ek alanlar
+        self._ekler = {}
+        self.update(kayitlar)
+
+    def _cevap(self, kimlik):
+        return self._cevaplar[kimlik]
+
+    def _kayit(self, kimlik):
+        kayit = {"soru": self._sorular[kimlik], "cevap": self._cevap(kimlik)}
+        ekler = self._ekler.get(kimlik)
+        if ekler:
+            kayit.update(ekler)
+        return kayit
+
+    def __getitem__(self, anahtar):
+        return self._kayit(self._idler[anahtar])
+
+    def __setitem__(self, anahtar, kayit):
+        kimlik = self._idler.get(anahtar)
+        soru = kayit["soru"]
+        if soru == anahtar:
+            soru = anahtar
+        if kimlik is None:
+            kimlik = self._idler[anahtar] = len(self._sorular)
+            self._sorular.append(soru)
+            self._cevaplar.append(kayit["cevap"])
+        else:
+            self._sorular[kimlik] = soru
+            self._cevaplar[kimlik] = kayit["cevap"]
+        ekler = kayit_ekleri(kayit)
+        if ekler:
+            self._ekler[kimlik] = ekler
+        else:
+            self._ekler.pop(kimlik, None)
+
+    def __delitem__(self, anahtar):
+        kimlik = self._idler.pop(anahtar)
+        self._sorular[kimlik] = None
+        self._cevaplar[kimlik] = None
+        self._ekler.pop(kimlik, None)
+
+    def __contains__(self, anahtar):
+        return anahtar in self._idler
+
+    def __iter__(self):
+        return iter(self._idler)
+
+    def __len__(self):
+        return len(self._idler)
+
+    def id_of(self, anahtar):
+        return self._idler.get(anahtar)
+
+    def by_id(self, kimlik):
+        soru = self._sorular[kimlik] if 0 <= kimlik < len(self._sorular) else None
+        if soru is None:
+            raise KeyError(kimlik)
+        return self._kayit(kimlik)
+
+    # Cevaba dokunmadan kaydın sorusu; kayıt yoksa None
+    def question(self, anahtar):
+        kimlik = self._idler.get(anahtar)
+        return None if kimlik is None else self._sorular[kimlik]
+
+    def questions(self):
+        sorular = self._sorular
+        return (sorular[kimlik] for kimlik in self._idler.values())
+
+    # ttl'i olan kayıtlar; süpürücü diğerlerini gezmez
+    def expiring(self):
+        return [self._kayit(kimlik) for kimlik, ekler in list(self._ekler.items())
+                if "ttl" in ekler]
+
+
+class KnowledgeBase:
+    """Soru anahtarından kayda sözlük indeksi tutan bilgi tabanı
+
+    Aynı anahtarla gelen her kayıt öncekinin cevabını günceller; bu
+    yüzden dosyada tekrar eden sorular varsa her zaman en son öğretilen
+    cevap döner.
+
+    `store` verilirse her öğretme depoya da kaydedilir. Kayıtlarını
+    diskte sorgulayan depolar (SQLite) `records()` ve `index()` ile
+    eşleme ve indeksi doğrudan sağlar; bu durumda hiçbir şey belleğe
+    yüklenmez. `index` verilirse (bkz. eslestirici_olustur) deponun
+    varsayılan indeksi yerine o kullanılır; önbellekten gelen dolu bir
+    indeks baştan kurulmaz, yalnızca kayıtlarla arasındaki fark işlenir.
+
+    Bellekteki kayıtlar CompactRecords'ta durur; her kaydın `id_of()`
+    ile alınan, bilgi tabanı açık kaldıkça değişmeyen bir tamsayı
+    kimliği vardır (SQLite deposunda tablo kimliği, kalıcıdır).
+
+    `cache` (bkz. yz_cache) verilirse `respond()` sonuçları normalleştirilmiş
+    sorguya göre önbelleğe alınır; öğretme ve silme ilgili girdileri düşürür.
+
+    Yakın kopya ayıklamasında birleştirilen sorular (bkz. yz_dedup,
+    `set_aliases`) kanonik kayda yönlenir: takma adla sorulan cevap
+    kanonik kaydın cevabıdır, takma adla öğretmek onu günceller.
+
+    Öğretilen kayıt kaynağını ve zamanını, istenirse ttl'ini taşır (bkz.
+    yz_ttl). Süresi dolan ya da `negative` politikasına göre geçersiz
+    başarısız cevap hiçbir sorguda dönmez, önbelleğe de girmez; yerine
+    sıradaki geçerli eşleşme gelir. `sweep()` bu kayıtları siler.
+
+    `reload()` deponun başka süreçlerden ya da elle yapılan değişikliklerini
+    (bkz. JournalStore.changes) belleğe işler: yalnızca eklenen, silinen ve
+    değişen kayıtlar indekse ve önbelleğe yansıtılır, indeks yeniden kurulmaz.
+    """
+
+    def __init__(self, kayitlar=(), store=None, records=None, index=None, cache=None,
+                 negative=None):
+        self.kayitlar = CompactRecords() if records is None else records
+        self.indeks = NgramIndex() if index is None else index
+        self.cache = cache
+        self.negative = NegativeCache() if negative is None else negative
+        # Takma ad anahtarı -> kanonik soru anahtarı
+        self.aliases = {}
+        for kayit in kayitlar:
+            self._put(kayit["soru"], kayit["cevap"], kayit_ekleri(kayit))
+        self.store = store
+        self._indeksi_hazirla()
+
+    @classmethod
+    def from_dict(cls, veriler):
+        return cls(veriler.get("sorular", []))
+
+    @classmethod
+    def open(cls, store, index=None):
+        onbellekli = index is not None and len(index) > 0
+        if hasattr(store, "records"):
+            if index is None:
+                index = store.index()
+            else:
+                for soru in store.questions():
+                    index.add(soru)
+            bilgi = cls(records=store.records(), index=index)
+        elif hasattr(store, "load_records"):
+            # Anahtarları hazır gelen sözlük olduğu gibi kullanılır
+            kayitlar = store.load_records()
+            if index is None:
+                index = NgramIndex()
+            for soru in kayit_sorulari(kayitlar):
+                index.add(soru)
+            bilgi = cls(store=store, records=kayitlar, index=index)
+        else:
+            bilgi = cls(store.load(), store=store, index=index)
+
+        if onbellekli:
+            bilgi._indeksi_esitle()
+        return bilgi
+
+    # Toplu yüklemeden sonra tek seferde kurulan indeks yapıları (TfidfIndex)
+    # sorgulardan önce kurulur; böylece sorgular indeksi değiştirmez
+    def _indeksi_hazirla(self):
+        if hasattr(self.indeks, "hazirla"):
+            self.indeks.hazirla()
+
+    # İndekste olup kayıtlarda olmayan (ya da başka yazımla duran) soruları temizler
+    def _indeksi_esitle(self):
+        for soru in list(self.indeks):
+            kayitli = self._kayitli_soru(soru_anahtari(soru))
+            if kayitli != soru:
+                self.indeks.remove(soru)
+                if kayitli is not None:
+                    self.indeks.add(kayitli)
+
+    # Takma ad sorusu -> kanonik soru eşlemesi
+    def set_aliases(self, takma_adlar):
+        self.aliases = {
+            soru_anahtari(takma_ad): soru_anahtari(kanonik)
+            for takma_ad, kanonik in takma_adlar.items()
+        }
+
+    # Sorunun kayıt anahtarı; takma adsa ve kanonik kayıt duruyorsa onunki
+    def _anahtar(self, soru):
+        anahtar = soru_anahtari(soru)
+        if self.aliases and anahtar not in self.kayitlar:
+            kanonik = self.aliases.get(anahtar)
+            if kanonik is not None and kanonik in self.kayitlar:
+                return kanonik
+        return anahtar
+
+    def _kayitli_soru(self, anahtar):
+        if hasattr(self.kayitlar, "question"):
+            return self.kayitlar.question(anahtar)
+        kayit = self.kayitlar.get(anahtar)
+        return None if kayit is None else kayit["soru"]
+
+    def to_dict(self):
+        return {"sorular": list(self.kayitlar.values())}
+
+    def __len__(self):
+        return len(self.kayitlar)
+
+    def __iter__(self):
+        return iter(self.kayitlar.values())
+
+    def __contains__(self, soru):
+        return self._anahtar(soru) in self.kayitlar
+
+    def get(self, soru):
+        return self.kayitlar.get(self._anahtar(soru))
+
+    # Sorunun kayıt kimliği; kayıt yoksa None
+    def id_of(self, soru):
+        if not hasattr(self.kayitlar, "id_of"):
+            raise TypeError(f"{type(self.kayitlar).__name__} kayıt kimliği tutmuyor")
+        return self.kayitlar.id_of(self._anahtar(soru))
+
+    def by_id(self, kimlik):
+        if not hasattr(self.kayitlar, "by_id"):
+            raise TypeError(f"{type(self.kayitlar).__name__} kayıt kimliği tutmuyor")
+        return self.kayitlar.by_id(kimlik)
+
+    def answer(self, soru):
+        kayit = self.get(soru)
+        return kayit["cevap"] if kayit else None
+
+    def match(self, soru, cutoff=0.6):
+        return self.indeks.best(soru, cutoff=cutoff)
+
+    # (soru, cevap, skor) üçlüleri, en yüksek skor önce. Geçersiz kayıtlar
+    # atlandıkça k sonuç dolana ya da indeks tükenene kadar daha çok aday istenir.
+    def top_k(self, soru, k=3, cutoff=0.6):
+        simdi = time.time()
+        istenen = k
+        while True:
+            eslesenler = self.indeks.top_k(soru, istenen, cutoff)
+            sonuclar = self._gecerliler(eslesenler, simdi)
+            if len(sonuclar) >= k or len(eslesenler) < istenen:
+                return sonuclar[:k]
+            istenen *= 2
+
+    def _gecerliler(self, eslesenler, simdi):
+        sonuclar = []
+        for eslesen, skor in eslesenler:
+            kayit = self.get(eslesen)
+            if kayit is None:
+                sonuclar.append((eslesen, None, skor))
+            elif not suresi_doldu(kayit, simdi, self.negative):
+                sonuclar.append((eslesen, kayit["cevap"], skor))
+        return sonuclar
+
+    # Süresi olan kaydın sonucu önbelleğe alınmaz; süresi dolunca da dönerdi
+    def _onbellege_uygun(self, sonuc):
+        if sonuc is None:
+            return True
+        kayit = self.get(sonuc[0])
+        return kayit is None or kayit_bitisi(kayit, self.negative) is None
+
+    # En iyi (soru, cevap, skor) ya da None; önbellek varsa önce ona bakılır
+    def respond(self, soru, cutoff=0.6):
+        if self.cache is None:
+            sonuc = self.top_k(soru, 1, cutoff)
+            return sonuc[0] if sonuc else None
+
+        anahtar = (normalle(soru), cutoff)
+        try:
+            return self.cache[anahtar]
+        except KeyError:
+            pass
+        sonuc = self.top_k(soru, 1, cutoff)
+        sonuc = sonuc[0] if sonuc else None
+        if self._onbellege_uygun(sonuc):
+            self.cache[anahtar] = sonuc
+        return sonuc
+
+    # Toplu sorgu; indeks destekliyorsa (TfidfIndex) tek seferde puanlanır.
+    # Geçersiz kayıt yüzünden eksik kalan sonuç tek başına yeniden sorgulanır.
+    def top_k_many(self, sorular, k=3, cutoff=0.6):
+        if hasattr(self.indeks, "top_k_many"):
+            sonuclar = self.indeks.top_k_many(sorular, k, cutoff)
+        else:
+            sonuclar = [self.indeks.top_k(soru, k, cutoff) for soru in sorular]
+        simdi = time.time()
+        cevaplar = []
+        for soru, sonuc in zip(sorular, sonuclar):
+            gecerli = self._gecerliler(sonuc, simdi)
+            if len(gecerli) < len(sonuc) == k:
+                gecerli = self.top_k(soru, k, cutoff)
+            cevaplar.append(gecerli)
+        return cevaplar
+
+    def teach(self, soru, cevap, kaynak="kullanici", ttl=None):
+        """Kaydı ekler ya da cevabını günceller
+
+        Kayda kaynak ve öğretilme zamanı yazılır. `ttl` saniye verilirse
+        kayıt o kadar geçerlidir; başarısız cevaplar kendiliğinden kısa
+        ömürlüdür (bkz. yz_ttl.NegativeCache). Güncellemede eski kaydın
+        kaynağı ve ömrü yenisiyle değişir.
+        """
+        kayit = self._put(soru, cevap, self._kaynak_bilgisi(cevap, kaynak, ttl))
+        if self.store is not None:
+            self.store.append(kayit)
+        return kayit
+
+    def _kaynak_bilgisi(self, cevap, kaynak, ttl):
+        ekler = {"kaynak": kaynak, "zaman": round(time.time(), 3)}
+        ttl = self.negative.ttl_of(cevap, ttl)
+        if ttl is not None:
+            ekler["ttl"] = ttl
+        return ekler
+
+    # Süresi dolmuş kayıtların soruları. `tam` değilse ve eşleme destekliyorsa
+    # yalnızca ttl'i olan kayıtlara bakılır; zamanı bilinmeyen başarısız
+    # cevaplar ancak tam taramada bulunur.
+    def expired(self, simdi=None, tam=False):
+        simdi = time.time() if simdi is None else simdi
+        if not tam and hasattr(self.kayitlar, "expiring"):
+            kayitlar = self.kayitlar.expiring()
+        else:
+            kayitlar = self.kayitlar.values()
+        return [kayit["soru"] for kayit in kayitlar if suresi_doldu(kayit, simdi, self.negative)]
+
+    def sweep(self, simdi=None, tam=False):
+        """Süresi dolmuş kayıtları siler; silinen kayıt sayısını döndürür"""
+        simdi = time.time() if simdi is None else simdi
+        satirlar = []
+        for soru in self.expired(simdi, tam):
+            kayit = self._suresi_dolani_sil(soru, simdi)
+            if kayit is not None:
+                satirlar.append({"soru": kayit["soru"], "silindi": True})
+        if self.store is not None and satirlar:
+            self._depoya_yaz(satirlar)
+        return len(satirlar)
+
+    # Bulunduktan sonra yeniden öğretilmiş kayıt silinmez
+    def _suresi_dolani_sil(self, soru, simdi):
+        kayit = self.kayitlar.get(self._anahtar(soru))
+        if kayit is None or not suresi_doldu(kayit, simdi, self.negative):
+            return None
+        return self._sil(soru)
+
+    def reload(self):
+        """Depoda bu bilgi tabanı dışında yapılan değişiklikleri uygular; değişen kayıt sayısı"""
+        if not hasattr(self.store, "changes"):
+            return 0
+        degisiklik = self.store.changes()
+        if degisiklik is None:
+            return 0
+        tur, veri = degisiklik
+        yamalar = self._tam_fark(veri) if tur == "tam" else self._gunluk_farki(veri)
+        self._yamala(yamalar)
+        return len(yamalar)
+
+    # Yeni anahtar -> kayıt eşlemesine göre (anahtar, kayıt ya da silmek için None)
+    def _tam_fark(self, yeni):
+        yamalar = [
+            (anahtar, kayit) for anahtar, kayit in yeni.items()
+            if not _ayni_kayit(self.kayitlar.get(anahtar), kayit)
+        ]
+        yamalar += [(anahtar, None) for anahtar in list(self.kayitlar) if anahtar not in yeni]
+        return yamalar
+
+    # Günlük satırları bellekteki kayıtların üzerine uygulanmış sayılır
+    # (bkz. yz_store.kayitlari_uygula); sonucu bellektekinden farklı anahtarlar
+    def _gunluk_farki(self, satirlar):
+        sonuclar = {}
+        for satir in satirlar:
+            anahtar = soru_anahtari(satir["soru"])
+            if satir.get("silindi"):
+                sonuclar[anahtar] = None
+                continue
+            onceki = sonuclar[anahtar] if anahtar in sonuclar else self.kayitlar.get(anahtar)
+            sonuclar[anahtar] = satir if onceki is None else dict(satir, soru=onceki["soru"])
+        return [
+            (anahtar, kayit) for anahtar, kayit in sonuclar.items()
+            if not _ayni_kayit(self.kayitlar.get(anahtar), kayit)
+        ]
+
+    def _yamala(self, yamalar):
+        for anahtar, kayit in yamalar:
+            mevcut = self.kayitlar.get(anahtar)
+            if mevcut is not None and (kayit is None or mevcut["soru"] != kayit["soru"]):
+                self._sil(mevcut["soru"])
+            if kayit is not None:
+                self._put(kayit["soru"], kayit["cevap"], kayit_ekleri(kayit), anahtar)
+
+    def _depoya_yaz(self, satirlar):
+        if hasattr(self.store, "append_many"):
+            self.store.append_many(satirlar)
+            return
+        for satir in satirlar:
+            if satir.get("silindi"):
+                self.store.delete(satir)
+            else:
+                self.store.append(satir)
+
+    def forget(self, soru):
+        kayit = self._sil(soru)
+        if kayit is not None and self.store is not None:
+            self.store.delete(kayit)
+        return kayit
+
+    def _sil(self, soru):
+        anahtar = self._anahtar(soru)
+        kayit = self.kayitlar.get(anahtar)
+        if kayit is None:
+            return None
+        del self.kayitlar[anahtar]
+        self.indeks.remove(kayit["soru"])
+        if self.cache is not None:
+            self.cache.question_changed(kayit["soru"])
+        return kayit
+
+    # `anahtar` verilirse takma ad yönlendirmesi yapılmaz
+    def _put(self, soru, cevap, ekler=None, anahtar=None):
+        if anahtar is None:
+            anahtar = self._anahtar(soru)
+        mevcut = self.kayitlar.get(anahtar)
+        if mevcut is not None:
+            kayit = {"soru": mevcut["soru"], "cevap": cevap, **(ekler or {})}
+            self.kayitlar[anahtar] = kayit
+            if self.cache is not None:
+                self.cache.question_changed(mevcut["soru"])
+            return kayit
+
+        kayit = {"soru": soru, "cevap": cevap, **(ekler or {})}
+        self.kayitlar[anahtar] = kayit
+        self.indeks.add(soru)
+        if self.cache is not None:
+            # Skoru difflib oranı olmayan indekslerde (kosinüs) karşılaştırma geçerli değil
+            if getattr(self.indeks, "difflib_skoru", True):
+                self.cache.question_added(normalle(soru))
+            else:
+                self.cache.clear()
+        return kayit
+
+
+def _ayni_kayit(kayit, diger):
+    if kayit is None or diger is None:
+        return kayit is diger
+    return (kayit["soru"] == diger["soru"] and kayit["cevap"] == diger["cevap"]
+            and kayit_ekleri(kayit) == kayit_ekleri(diger))
+
+
+class ConcurrentKnowledgeBase(KnowledgeBase):
+    """Birden çok iş parçacığının paylaşabileceği KnowledgeBase
+
+    Sorgular okuyucu-yazıcı kilidinin (bkz. yz_lock.RWLock) okuma
+    tarafında birlikte çalışır. Öğretme ve silme tek bir yazıcı iş
+    parçacığının kuyruğuna girer: yazıcı kuyrukta biriken en çok `parti`
+    işlemi tek yazma kilidiyle belleğe uygular, kilidi bırakıp hepsini
+    depoya bir kerede yazar (JournalStore'da tek fsync). `teach()` ve
+    `forget()` kendi işlemleri depoya yazılınca döner; `submit_teach()`
+    ve `submit_forget()` beklemeden Future verir. `sweep()` silmeleri de
+    aynı kuyruktan geçer.
+
+    `reload()` da yazıcıda çalışır: arada bu bilgi tabanının öğretmesi
+    olmadığından okunan dosyalar belleğin son hâliyle karşılaştırılır.
+    Fark kilitsiz hesaplanır (belleği yalnızca yazıcı değiştirir), yamalar
+    `parti`lik gruplar hâlinde yazma kilidiyle uygulanır; büyük bir yeniden
+    yüklemede de sorgular grup aralarında çalışır.
+
+    Aynı veritabanını açan süreçlerin günlük yazmaları deponun dosya
+    kilidiyle sıralanır (bkz. JournalStore). Kapatmadan önce `close()`
+    kuyruktakileri yazar.
+    """
+
+    def __init__(self, kayitlar=(), store=None, records=None, index=None, cache=None,
+                 negative=None, parti=256):
+        self.parti = parti
+        self._rw = RWLock()
+        # Önbellek okuma kilidi altında da değişir (LRU sırası, sayaçlar)
+        self._onbellek_kilidi = threading.Lock()
+        self._kuyruk = queue.SimpleQueue()
+        self._yazici = None
+        self._yazici_kilidi = threading.Lock()
+        super().__init__(kayitlar, store, records, index, cache, negative)
+
+    def __len__(self):
+        with self._rw.read():
+            return len(self.kayitlar)
+
+    # Gezinme o anki kayıtların kopyası üzerinden yapılır
+    def __iter__(self):
+        with self._rw.read():
+            return iter(list(self.kayitlar.values()))
+
+    def __contains__(self, soru):
+        with self._rw.read():
+            return super().__contains__(soru)
+
+    def to_dict(self):
+        with self._rw.read():
+            return super().to_dict()
+
+    def get(self, soru):
+        with self._rw.read():
+            return super().get(soru)
+
+    def id_of(self, soru):
+        with self._rw.read():
+            return super().id_of(soru)
+
+    def by_id(self, kimlik):
+        with self._rw.read():
+            return super().by_id(kimlik)
+
+    def match(self, soru, cutoff=0.6):
+        with self._rw.read():
+            return super().match(soru, cutoff)
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        with self._rw.read():
+            return super().top_k(soru, k, cutoff)
+
+    def top_k_many(self, sorular, k=3, cutoff=0.6):
+        with self._rw.read():
+            return super().top_k_many(sorular, k, cutoff)
+
+    # Puanlama önbellek kilidi dışında yapılır; okuma kilidi tutulduğundan
+    # arada öğretilen bir soru sonucu eskitemez
+    def respond(self, soru, cutoff=0.6):
+        with self._rw.read():
+            if self.cache is None:
+                return super().respond(soru, cutoff)
+
+            anahtar = (normalle(soru), cutoff)
+            with self._onbellek_kilidi:
+                try:
+                    return self.cache[anahtar]
+                except KeyError:
+                    pass
+            sonuc = self.top_k(soru, 1, cutoff)
+            sonuc = sonuc[0] if sonuc else None
+            if self._onbellege_uygun(sonuc):
+                with self._onbellek_kilidi:
+                    self.cache[anahtar] = sonuc
+            return sonuc
+
+    def expired(self, simdi=None, tam=False):
+        with self._rw.read():
+            return super().expired(simdi, tam)
+
+    def teach(self, soru, cevap, kaynak="kullanici", ttl=None):
+        return self.submit_teach(soru, cevap, kaynak, ttl).result()
+
+    def forget(self, soru):
+        return self.submit_forget(soru).result()
+
+    # Süresi dolanlar okuma kilidiyle bulunur, yazıcı kuyruğunda yeniden
+    # denetlenip silinir; tarama sürerken sorgular beklemez
+    def sweep(self, simdi=None, tam=False):
+        simdi = time.time() if simdi is None else simdi
+        gelecekler = [self._gonder("expire", soru, simdi) for soru in self.expired(simdi, tam)]
+        return sum(gelecek.result() is not None for gelecek in gelecekler)
+
+    def reload(self):
+        return self._gonder("reload").result()
+
+    def _yamala(self, yamalar):
+        for bas in range(0, len(yamalar), self.parti):
+            with self._rw.write():
+                super()._yamala(yamalar[bas:bas + self.parti])
+
+    def submit_teach(self, soru, cevap, kaynak="kullanici", ttl=None):
+        return self._gonder("teach", soru, cevap, self._kaynak_bilgisi(cevap, kaynak, ttl))
+
+    def submit_forget(self, soru):
+        return self._gonder("forget", soru)
+
+    def _gonder(self, islem, *argumanlar):
+        gelecek = Future()
+        with self._yazici_kilidi:
+            if self._yazici is None:
+                self._yazici = threading.Thread(target=self._yaz, daemon=True)
+                self._yazici.start()
+            self._kuyruk.put((islem, argumanlar, gelecek))
+        return gelecek
+
+    # Yazıcı iş parçacığı; None gelince kuyrukta ondan öncekileri yazıp durur
+    def _yaz(self):
+        while True:
+            islemler = [self._kuyruk.get()]
+            while islemler[-1] is not None and len(islemler) < self.parti:
+                try:
+                    islemler.append(self._kuyruk.get_nowait())
+                except queue.Empty:
+                    break
+            dur = islemler[-1] is None
+            if dur:
+                islemler.pop()
+            parti = []
+            for islem in islemler:
+                if islem[0] == "reload":
+                    self._partiyi_yaz(parti)
+                    parti = []
+                    self._yeniden_yukle(islem[2])
+                else:
+                    parti.append(islem)
+            self._partiyi_yaz(parti)
+            if dur:
+                return
+
+    def _yeniden_yukle(self, gelecek):
+        if not gelecek.set_running_or_notify_cancel():
+            return
+        try:
+            gelecek.set_result(KnowledgeBase.reload(self))
+        except Exception as hata:
+            gelecek.set_exception(hata)
+
+    def _partiyi_yaz(self, islemler):
+        if not islemler:
+            return
+        tamamlanan, satirlar = [], []
+        with self._rw.write():
+            for islem, argumanlar, gelecek in islemler:
+                if not gelecek.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if islem == "teach":
+                        kayit = self._put(*argumanlar)
+                        satirlar.append(kayit)
+                    else:
+                        if islem == "forget":
+                            kayit = self._sil(*argumanlar)
+                        else:
+                            kayit = self._suresi_dolani_sil(*argumanlar)
+                        if kayit is not None:
+                            satirlar.append({"soru": kayit["soru"], "silindi": True})
+                except Exception as hata:
+                    gelecek.set_exception(hata)
+                    continue
+                tamamlanan.append((gelecek, kayit))
+
+        try:
+            if self.store is not None and satirlar:
+                self._depoya_yaz(satirlar)
+        except Exception as hata:
+            for gelecek, _ in tamamlanan:
+                gelecek.set_exception(hata)
+        else:
+            for gelecek, kayit in tamamlanan:
+                gelecek.set_result(kayit)
+
+    # Kuyruktaki işlemler yazılıp yazıcı durdurulur; sonraki öğretme yeniden başlatır
+    def close(self):
+        with self._yazici_kilidi:
+            yazici, self._yazici = self._yazici, None
+            if yazici is not None:
+                self._kuyruk.put(None)
+        if yazici is not None:
+            yazici.join()
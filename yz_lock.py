@@ -0,0 +1,137 @@
+"""
+ChatCPT kilitleri
+İş parçacıkları için okuyucu-yazıcı kilidi, süreçler için tavsiye
+niteliğinde dosya kilidi
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class RWLock:
+    """Okuyucu-yazıcı kilidi
+
+    Okuyucular birlikte girer, yazıcı tek başına girer. Bekleyen bir
+    yazıcı varken yeni okuyucu alınmaz; böylece sürekli gelen sorgular
+    öğretmeyi aç bırakmaz. Okuma kilidi aynı iş parçacığında iç içe
+    alınabilir (top_k içinden answer gibi); yazma kilidini tutan iş
+    parçacığı okuma kilidini beklemeden alır.
+    """
+
+    def __init__(self):
+        self._kosul = threading.Condition(threading.Lock())
+        self._okuyucu = 0
+        self._bekleyen_yazici = 0
+        self._yazan = None
+        self._yerel = threading.local()
+
+    @contextmanager
+    def read(self):
+        derinlik = getattr(self._yerel, "derinlik", 0)
+        ilk = derinlik == 0 and self._yazan != threading.get_ident()
+        if ilk:
+            with self._kosul:
+                while self._yazan is not None or self._bekleyen_yazici:
+                    self._kosul.wait()
+                self._okuyucu += 1
+        self._yerel.derinlik = derinlik + 1
+        try:
+            yield
+        finally:
+            self._yerel.derinlik = derinlik
+            if ilk:
+                with self._kosul:
+                    self._okuyucu -= 1
+                    if not self._okuyucu:
+                        self._kosul.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._kosul:
+            self._bekleyen_yazici += 1
+            try:
+                while self._yazan is not None or self._okuyucu:
+                    self._kosul.wait()
+            finally:
+                self._bekleyen_yazici -= 1
+            self._yazan = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self._kosul:
+                self._yazan = None
+                self._kosul.notify_all()
+
+
+class FileLock:
+    """Süreçler arası özel dosya kilidi (POSIX'te flock, Windows'ta msvcrt)
+
+    Kilit dosyası ilk kullanımda açılır ve kapatılana kadar açık kalır.
+    Aynı süreçteki iş parçacıkları ayrıca bir RLock ile sıralanır; kilit
+    aynı iş parçacığında iç içe alınabilir, dosya kilidi yalnızca en
+    dıştaki girişte alınıp bırakılır. Tavsiye niteliğindedir: yalnızca
+    bu kilidi kullanan süreçleri sıralar.
+    """
+
+    def __init__(self, yol):
+        self.yol = yol
+        self._kilit = threading.RLock()
+        self._dosya = None
+        self._derinlik = 0
+
+    def __enter__(self):
+        self._kilit.acquire()
+        try:
+            if self._derinlik == 0:
+                if self._dosya is None:
+                    self._dosya = open(self.yol, 'a+b')
+                _kilitle(self._dosya)
+        except BaseException:
+            self._kilit.release()
+            raise
+        self._derinlik += 1
+        return self
+
+    def __exit__(self, *hata):
+        self._derinlik -= 1
+        try:
+            if self._derinlik == 0:
+                _birak(self._dosya)
+        finally:
+            self._kilit.release()
+
+    def close(self):
+        with self._kilit:
+            if self._dosya is not None and self._derinlik == 0:
+                self._dosya.close()
+                self._dosya = None
+
+
+if fcntl is not None:
+    def _kilitle(dosya):
+        fcntl.flock(dosya.fileno(), fcntl.LOCK_EX)
+
+    def _birak(dosya):
+        fcntl.flock(dosya.fileno(), fcntl.LOCK_UN)
+else:
+    # msvcrt bayt aralığı kilitler; ilk bayt kilit yerine kullanılır.
+    # LK_LOCK on denemeden sonra vazgeçtiğinden alınana kadar yeniden denenir.
+    def _kilitle(dosya):
+        while True:
+            os.lseek(dosya.fileno(), 0, os.SEEK_SET)
+            try:
+                msvcrt.locking(dosya.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _birak(dosya):
+        os.lseek(dosya.fileno(), 0, os.SEEK_SET)
+        msvcrt.locking(dosya.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,142 @@
+"""
+ChatCPT sorgu günlüğü
+Her sorguyu normali, seçilen eşleşmesi, skoru ve aşama süreleriyle
+döndürülen bir JSONL dosyasına yazar
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from yz_index import PUANLAYICI, eslestirici_adi, normalle
+
+# Günlükte tutulan puanlayıcı sayaçları (bkz. yz_index.ASAMALAR)
+SAYACLAR = ("aday", "uzunluk", "ortusme", "eslesme")
+
+
+# Cevabın kendisi yerine kısa özeti yazılır; tekrar oynatmada değişimi göstermeye yeter
+def cevap_ozeti(cevap):
+    if cevap is None:
+        return None
+    return hashlib.blake2b(cevap.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+def olcerek_cevapla(bilgi, soru, cutoff=0.6):
+    """bilgi.respond() sonucu ve günlük satırı
+
+    Süreler milisaniyedir: `toplam` normalleştirme ve respond() çağrısı,
+    `puanlama` difflib aşamaları (PUANLAYICI süre farkı), `aday` kalanı:
+    normalleştirme, aday seçimi, önbellek ve cevap okuma. `normal` normalleştirmenin
+    ayrıca ölçülen süresidir ve `toplam` içinde de vardır. Puanlayıcı
+    paylaşıldığından aynı anda çalışan sorgularda puanlama süresi ve
+    sayaçlar yaklaşıktır.
+    """
+    onbellek = bilgi.cache
+    isabet = None if onbellek is None else onbellek.isabet
+    sayaclar, puanlama = PUANLAYICI.ozet()
+
+    baslangic = time.perf_counter()
+    normal = normalle(soru)
+    normallendi = time.perf_counter()
+    sonuc = bilgi.respond(soru, cutoff)
+    bitti = time.perf_counter()
+
+    toplam = bitti - baslangic
+    simdiki, sure = PUANLAYICI.ozet()
+    puanlama = sure - puanlama
+    eslesme, cevap, skor = sonuc or (None, None, None)
+    satir = {
+        "zaman": round(time.time(), 3),
+        "soru": soru,
+        "normal": normal,
+        "cutoff": cutoff,
+        "eslestirici": eslestirici_adi(bilgi.indeks),
+        "eslesme": eslesme,
+        "skor": skor,
+        "cevap_ozeti": cevap_ozeti(cevap),
+        "onbellek": None if onbellek is None else onbellek.isabet > isabet,
+        "sureler_ms": {
+            "toplam": round(toplam * 1000, 3),
+            "normal": round((normallendi - baslangic) * 1000, 3),
+            "aday": round(max(toplam - puanlama, 0.0) * 1000, 3),
+            "puanlama": round(puanlama * 1000, 3),
+        },
+        "asamalar": {
+            ad: simdiki[ad] - sayaclar[ad] for ad in SAYACLAR
+        },
+    }
+    return sonuc, satir
+
+
+class QueryRecorder:
+    """Sorgu günlüğü yazıcısı
+
+    Her sorgu bir JSON satırıdır (bkz. olcerek_cevapla). Dosya
+    `azami_bayt`ı geçince `yol.1` adına kaydırılır; eskiler `yol.2`,
+    ... `yol.{yedek}` olur, en eskisi silinir. Satırlar yazıldıkça
+    dosyaya aktarılır, birden çok iş parçacığı aynı yazıcıyı kullanabilir.
+    """
+
+    def __init__(self, yol, azami_bayt=10 << 20, yedek=5):
+        self.yol = yol
+        self.azami_bayt = azami_bayt
+        self.yedek = yedek
+        self._kilit = threading.Lock()
+        self._dosya = None
+        self._boyut = 0
+
+    def respond(self, bilgi, soru, cutoff=0.6):
+        sonuc, satir = olcerek_cevapla(bilgi, soru, cutoff)
+        self.write(satir)
+        return sonuc
+
+    # Her satır tek write çağrısıyla, tamponsuz yazılır
+    def write(self, satir):
+        veri = (json.dumps(satir, ensure_ascii=False) + "\n").encode("utf-8", "surrogatepass")
+        with self._kilit:
+            if self._dosya is None:
+                self._ac()
+            if self._boyut and self._boyut + len(veri) > self.azami_bayt:
+                self._dondur()
+            self._dosya.write(veri)
+            self._boyut += len(veri)
+
+    def _ac(self):
+        self._dosya = open(self.yol, 'ab', buffering=0)
+        self._boyut = os.fstat(self._dosya.fileno()).st_size
+
+    # Kilit tutulurken çağrılır
+    def _dondur(self):
+        self._dosya.close()
+        for sira in range(self.yedek - 1, 0, -1):
+            eski = f"{self.yol}.{sira}"
+            if os.path.exists(eski):
+                os.replace(eski, f"{self.yol}.{sira + 1}")
+        if self.yedek > 0:
+            os.replace(self.yol, f"{self.yol}.1")
+        else:
+            os.remove(self.yol)
+        self._ac()
+
+    def close(self):
+        with self._kilit:
+            if self._dosya is not None:
+                self._dosya.close()
+                self._dosya = None
+
+
+# Boş yol günlüğü kapatır
+def kaydedici_olustur(yol, azami_bayt=10 << 20, yedek=5):
+    return QueryRecorder(yol, azami_bayt, yedek) if yol else None
+
+
+# Günlük dosyası ve varsa döndürülmüş eskileri, eskiden yeniye
+def gunluk_dosyalari(yol):
+    eskiler = []
+    sira = 1
+    while os.path.exists(f"{yol}.{sira}"):
+        eskiler.append(f"{yol}.{sira}")
+        sira += 1
+    return eskiler[::-1] + ([yol] if os.path.exists(yol) else [])
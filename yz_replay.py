@@ -0,0 +1,100 @@
+"""
+ChatCPT sorgu günlüğü tekrarı
+Kaydedilmiş sorguları herhangi bir eşleştirici ve veritabanıyla yeniden
+çalıştırır; gecikme ve cevap farklarını raporlar
+"""
+
+from yz_bench import yuzdelikler
+from yz_cache import onbellek_olustur
+from yz_index import eslestirici_adi
+from yz_querylog import SAYACLAR, gunluk_dosyalari, olcerek_cevapla
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat, gunluk_oku
+
+# Kayıtlı sonuca göre yeni sonucun durumu
+FARK_TURLERI = (
+    "ayni", "skor_degisti", "cevap_degisti", "eslesme_degisti", "yeni_eslesme", "kayip_eslesme",
+)
+
+ASAMA_SURELERI = ("normal", "aday", "puanlama")
+
+
+def fark_turu(once, sonra):
+    if once["eslesme"] != sonra["eslesme"]:
+        if once["eslesme"] is None:
+            return "yeni_eslesme"
+        if sonra["eslesme"] is None:
+            return "kayip_eslesme"
+        return "eslesme_degisti"
+    if once.get("cevap_ozeti") != sonra["cevap_ozeti"]:
+        return "cevap_degisti"
+    if once["skor"] is not None and abs(once["skor"] - sonra["skor"]) > 1e-9:
+        return "skor_degisti"
+    return "ayni"
+
+
+# Her yol döndürülmüş eskileriyle birlikte, eskiden yeniye okunur
+def gunlukleri_oku(yollar):
+    for yol in yollar:
+        for dosya in gunluk_dosyalari(yol) or [yol]:
+            yield from gunluk_oku(dosya)
+
+
+def tekrar_oynat(satirlar, yol, eslestirici=None, onbellek_kapasitesi=0, cutoff=None,
+                 fark_yazici=None):
+    """Günlük satırlarını `yol` veritabanında yeniden çalıştırıp özet döndürür
+
+    Eşleştirici verilmezse deponun varsayılanı kullanılır. Önbellek
+    varsayılan olarak kapalıdır, böylece her sorgu eşleştiriciyi ölçer;
+    canlıdaki önbelleği yeniden üretmek için kapasite verilebilir.
+    `cutoff` verilmezse her sorgu kaydedildiği eşikle çalışır.
+    `fark_yazici(satir)` sonucu kayıttakinden farklı her sorgu için çağrılır.
+    """
+    depo, bilgi = bilgi_tabani_ac(yol, eslestirici)
+    try:
+        bilgi.cache = onbellek_olustur(onbellek_kapasitesi)
+        # İlk sorguda kurulan indeksler (tfidf) ölçüme karışmasın
+        bilgi.match("", 0.6)
+
+        farklar = dict.fromkeys(FARK_TURLERI, 0)
+        kayitli, sureler = [], []
+        asama_sureleri = dict.fromkeys(ASAMA_SURELERI, 0.0)
+        asamalar = dict.fromkeys(SAYACLAR, 0)
+        for once in satirlar:
+            esik = once.get("cutoff", 0.6) if cutoff is None else cutoff
+            _, sonra = olcerek_cevapla(bilgi, once["soru"], esik)
+            sureler.append(sonra["sureler_ms"]["toplam"] / 1000)
+            if "sureler_ms" in once:
+                kayitli.append(once["sureler_ms"]["toplam"] / 1000)
+            for ad in ASAMA_SURELERI:
+                asama_sureleri[ad] += sonra["sureler_ms"][ad]
+            for ad in SAYACLAR:
+                asamalar[ad] += sonra["asamalar"][ad]
+
+            tur = fark_turu(once, sonra)
+            farklar[tur] += 1
+            if tur != "ayni" and fark_yazici is not None:
+                fark_yazici({
+                    "soru": once["soru"],
+                    "tur": tur,
+                    "once": {alan: once.get(alan) for alan in ("eslesme", "skor", "cevap_ozeti")},
+                    "sonra": {alan: sonra[alan] for alan in ("eslesme", "skor", "cevap_ozeti")},
+                })
+
+        adet = len(sureler)
+        return {
+            "eslestirici": eslestirici_adi(bilgi.indeks) or type(bilgi.indeks).__name__,
+            "kayit": len(bilgi),
+            "sorgu": adet,
+            "kayitli": yuzdelikler(kayitli) if kayitli else None,
+            "tekrar": {
+                **(yuzdelikler(sureler) if sureler else {}),
+                "sorgu_per_s": round(adet / sum(sureler), 1) if sum(sureler) else None,
+            },
+            # Sorgu başına ortalamalar
+            "asama_ms": {ad: round(sure / adet, 4) for ad, sure in asama_sureleri.items()} if adet else {},
+            "asamalar": {ad: round(sayi / adet, 1) for ad, sayi in asamalar.items()} if adet else {},
+            "farklar": farklar,
+            "onbellek": None if bilgi.cache is None else bilgi.cache.stats(),
+        }
+    finally:
+        bilgi_tabani_kapat(yol, depo, bilgi)
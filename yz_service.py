@@ -0,0 +1,361 @@
+"""
+ChatCPT yerel sorgu hizmeti
+Bilgi tabanını bir kez yükler; eşleştirme ve öğretme isteklerini asyncio ile
+Unix soketi ya da localhost HTTP üzerinden karşılar
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from yz_cache import onbellek_olustur
+from yz_querylog import kaydedici_olustur
+from yz_store import bilgi_tabani_ac, bilgi_tabani_kapat
+from yz_ttl import supurucu_baslat
+from yz_watch import izleyici_baslat
+
+VARSAYILAN_PORT = 8765
+
+# Bir bağlantıda cevabı beklenen en çok istek; dolunca yeni satır okunmaz
+PENCERE = 64
+
+AZAMI_SATIR = 1 << 20
+
+HTTP_DURUMLARI = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    501: "Not Implemented",
+}
+
+
+class QueryService:
+    """Bilgi tabanı üzerinde asyncio sorgu hizmeti
+
+    Eşleştirme iş parçacığı havuzunda yapılır, olay döngüsü hiç
+    puanlama yapmaz. Bilgi tabanı ConcurrentKnowledgeBase olmalıdır:
+    sorgular okuma kilidiyle birlikte çalışır, öğretmeler tek yazıcının
+    kuyruğuna girer ve yazılana kadar havuzdan iş parçacığı tutmadan
+    beklenir.
+
+    Her bağlantı iki dilden birini konuşur; ilk satır karar verir:
+
+    - Satır başına bir JSON nesnesi (`{"islem": "match", "soru": ...}`).
+      İstemci cevap beklemeden istek göndermeye devam edebilir; istekler
+      birlikte işlenir, cevaplar istek sırasıyla satır satır yazılır.
+      İstekteki "id" cevaba aynen konur.
+    - HTTP/1.1: `POST /match`, `/top_k`, `/teach`, `/forget` gövdesi bir
+      istek nesnesi ya da nesne dizisidir; `GET /stats`. Gövde
+      Content-Length ya da parçalı aktarımla gelir; başka aktarım
+      kodlamasına 501 dönülür ve bağlantı kapanır.
+
+    İşlemler: match (soru, cutoff), top_k (soru, k, cutoff),
+    teach (soru, cevap, kaynak, ttl), forget (soru), stats. Hatalı istek bağlantıyı
+    kapatmaz, `{"ok": false, "hata": ...}` döner. `kaydedici` verilirse
+    (bkz. yz_querylog.QueryRecorder) match istekleri sorgu günlüğüne yazılır.
+    """
+
+    def __init__(self, bilgi, isci_sayisi=None, pencere=PENCERE, kaydedici=None):
+        self.bilgi = bilgi
+        self.pencere = pencere
+        self.kaydedici = kaydedici
+        self._havuz = ThreadPoolExecutor(isci_sayisi or os.cpu_count() or 1,
+                                         thread_name_prefix="yz-eslestirici")
+        self._islemler = {
+            "match": self._match,
+            "top_k": self._top_k,
+            "teach": self._teach,
+            "forget": self._forget,
+            "stats": self._stats,
+        }
+        self.istek = 0
+        self.hata = 0
+
+    def close(self):
+        self._havuz.shutdown()
+
+    async def _calistir(self, islev, *argumanlar):
+        return await asyncio.get_running_loop().run_in_executor(self._havuz, islev, *argumanlar)
+
+    async def handle(self, istek):
+        """Tek isteğin cevap nesnesi"""
+        self.istek += 1
+        try:
+            if not isinstance(istek, dict):
+                raise ValueError("İstek JSON nesnesi olmalı")
+            islem = istek.get("islem", "match")
+            isleyici = self._islemler.get(islem)
+            if isleyici is None:
+                raise ValueError(f"Bilinmeyen işlem: {islem}")
+            cevap = {"ok": True, **await isleyici(istek)}
+        except KeyError as hata:
+            cevap = {"ok": False, "hata": f"Eksik alan: {hata.args[0]}"}
+        except Exception as hata:
+            cevap = {"ok": False, "hata": str(hata) or type(hata).__name__}
+        if not cevap["ok"]:
+            self.hata += 1
+        if isinstance(istek, dict) and "id" in istek:
+            cevap["id"] = istek["id"]
+        return cevap
+
+    async def _match(self, istek):
+        soru, cutoff = _metin(istek, "soru"), float(istek.get("cutoff", 0.6))
+        if self.kaydedici is not None:
+            sonuc = await self._calistir(self.kaydedici.respond, self.bilgi, soru, cutoff)
+        else:
+            sonuc = await self._calistir(self.bilgi.respond, soru, cutoff)
+        eslesme, cevap, skor = sonuc or (None, None, None)
+        return {"eslesme": eslesme, "cevap": cevap, "skor": skor}
+
+    async def _top_k(self, istek):
+        sonuclar = await self._calistir(self.bilgi.top_k, _metin(istek, "soru"),
+                                        int(istek.get("k", 3)), float(istek.get("cutoff", 0.6)))
+        return {"sonuclar": [
+            {"eslesme": eslesme, "cevap": cevap, "skor": skor}
+            for eslesme, cevap, skor in sonuclar
+        ]}
+
+    async def _teach(self, istek):
+        ttl = istek.get("ttl")
+        gelecek = self.bilgi.submit_teach(
+            _metin(istek, "soru"), _metin(istek, "cevap"),
+            _metin(istek, "kaynak") if "kaynak" in istek else "kullanici",
+            None if ttl is None else float(ttl),
+        )
+        return {"kayit": await asyncio.wrap_future(gelecek)}
+
+    async def _forget(self, istek):
+        gelecek = self.bilgi.submit_forget(_metin(istek, "soru"))
+        return {"kayit": await asyncio.wrap_future(gelecek)}
+
+    async def _stats(self, istek):
+        kayit = await self._calistir(len, self.bilgi)
+        onbellek = self.bilgi.cache
+        return {
+            "kayit": kayit,
+            "istek": self.istek,
+            "hata": self.hata,
+            "onbellek": None if onbellek is None else onbellek.stats(),
+        }
+
+    async def _satir_isle(self, satir):
+        try:
+            istek = json.loads(satir)
+        except ValueError as hata:
+            self.istek += 1
+            self.hata += 1
+            return {"ok": False, "hata": f"Geçersiz JSON: {hata}"}
+        return await self.handle(istek)
+
+    async def _baglanti(self, okuyucu, yazici):
+        try:
+            ilk = await okuyucu.readline()
+            if ilk.lstrip().startswith(b"{"):
+                await self._akis(okuyucu, yazici, ilk)
+            elif ilk.strip():
+                await self._http(okuyucu, yazici, ilk)
+        # readline, AZAMI_SATIR'ı aşan satırda ValueError verir; bozuk
+        # parçalı gövde de öyle
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        # Kapanışta boşta bekleyen bağlantılar iptal edilir; iptal görevden
+        # dışarı taşarsa Python 3.11 asyncio her bağlantı için hata basar
+        except asyncio.CancelledError:
+            pass
+        finally:
+            yazici.close()
+
+    # Satır satır JSON; okuma sürerken önceki istekler işlenir ve sırayla yazılır
+    async def _akis(self, okuyucu, yazici, satir):
+        bekleyenler = asyncio.Queue(self.pencere)
+
+        async def yaz():
+            kopuk = False
+            while True:
+                gorev = await bekleyenler.get()
+                if gorev is None:
+                    return
+                cevap = await gorev
+                # Bağlantı koptuysa kalan görevler yine beklenir, okuyucu takılmasın
+                if kopuk:
+                    continue
+                try:
+                    yazici.write(json.dumps(cevap, ensure_ascii=False).encode("utf-8") + b"\n")
+                    await yazici.drain()
+                except ConnectionError:
+                    kopuk = True
+
+        yazan = asyncio.create_task(yaz())
+        try:
+            while satir and not yazan.done():
+                if satir.strip():
+                    await bekleyenler.put(asyncio.create_task(self._satir_isle(satir)))
+                satir = await okuyucu.readline()
+        finally:
+            await bekleyenler.put(None)
+            await yazan
+
+    async def _http(self, okuyucu, yazici, istek_satiri):
+        while istek_satiri.strip():
+            parcalar = istek_satiri.decode("latin-1").split()
+            basliklar = {}
+            while True:
+                satir = await okuyucu.readline()
+                if not satir.strip():
+                    break
+                ad, _, deger = satir.decode("latin-1").partition(":")
+                basliklar[ad.strip().lower()] = deger.strip()
+
+            if len(parcalar) != 3:
+                await self._http_yaz(yazici, 400, {"ok": False, "hata": "Geçersiz istek satırı"}, True)
+                return
+            yontem, yol, surum = parcalar
+            kodlama = basliklar.get("transfer-encoding", "").strip().lower()
+            if kodlama:
+                # Yalnızca parçalı kodlama anlaşılır; başkası gövdenin
+                # nerede bittiğini bilmeden bağlantıyı kaydırır
+                if kodlama != "chunked":
+                    await self._http_yaz(yazici, 501, {
+                        "ok": False, "hata": f"Desteklenmeyen aktarım kodlaması: {kodlama}"}, True)
+                    return
+                govde = await _parcali_govde(okuyucu)
+                if govde is None:
+                    await self._http_yaz(yazici, 413, {"ok": False, "hata": "Gövde boyu geçersiz"}, True)
+                    return
+            else:
+                try:
+                    uzunluk = int(basliklar.get("content-length", 0))
+                except ValueError:
+                    uzunluk = -1
+                if not 0 <= uzunluk <= AZAMI_SATIR:
+                    await self._http_yaz(yazici, 413, {"ok": False, "hata": "Gövde boyu geçersiz"}, True)
+                    return
+                govde = await okuyucu.readexactly(uzunluk) if uzunluk else b""
+
+            durum, veri = await self._http_istek(yontem, yol.split("?", 1)[0], govde)
+            kapat = (basliklar.get("connection", "").lower() == "close"
+                     or surum == "HTTP/1.0")
+            await self._http_yaz(yazici, durum, veri, kapat)
+            if kapat:
+                return
+            istek_satiri = await okuyucu.readline()
+
+    async def _http_istek(self, yontem, yol, govde):
+        islem = yol.strip("/")
+        if islem not in self._islemler:
+            return 404, {"ok": False, "hata": f"Bilinmeyen yol: {yol}"}
+        if islem == "stats":
+            if yontem != "GET":
+                return 405, {"ok": False, "hata": "GET bekleniyordu"}
+            return 200, await self.handle({"islem": "stats"})
+        if yontem != "POST":
+            return 405, {"ok": False, "hata": "POST bekleniyordu"}
+
+        try:
+            veri = json.loads(govde) if govde else {}
+        except ValueError as hata:
+            return 400, {"ok": False, "hata": f"Geçersiz JSON: {hata}"}
+        # Dizi gövdesindeki istekler birlikte işlenir
+        if isinstance(veri, list):
+            return 200, await asyncio.gather(*(
+                self.handle(dict(istek, islem=islem) if isinstance(istek, dict) else istek)
+                for istek in veri
+            ))
+        if isinstance(veri, dict):
+            veri = dict(veri, islem=islem)
+        cevap = await self.handle(veri)
+        return (200 if cevap["ok"] else 400), cevap
+
+    async def _http_yaz(self, yazici, durum, veri, kapat):
+        govde = json.dumps(veri, ensure_ascii=False).encode("utf-8")
+        baslik = (
+            f"HTTP/1.1 {durum} {HTTP_DURUMLARI[durum]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(govde)}\r\n"
+            f"Connection: {'close' if kapat else 'keep-alive'}\r\n\r\n"
+        )
+        yazici.write(baslik.encode("latin-1") + govde)
+        await yazici.drain()
+
+    async def serve(self, soket=None, host="127.0.0.1", port=None, hazir=None):
+        """Unix soketini ve/veya TCP portunu durdurulana kadar dinler
+
+        `hazir` verilirse dinlemeye başlanınca sunucu listesiyle çağrılır.
+        """
+        sunucular = []
+        try:
+            if soket:
+                sunucular.append(await asyncio.start_unix_server(
+                    self._baglanti, soket, limit=AZAMI_SATIR))
+            if port is not None:
+                sunucular.append(await asyncio.start_server(
+                    self._baglanti, host, port, limit=AZAMI_SATIR))
+            if not sunucular:
+                raise ValueError("Soket yolu ya da port gerekli")
+            if hazir is not None:
+                hazir(sunucular)
+            await asyncio.gather(*(sunucu.serve_forever() for sunucu in sunucular))
+        finally:
+            for sunucu in sunucular:
+                sunucu.close()
+            if soket and os.path.exists(soket):
+                os.remove(soket)
+
+
+# Parçalı (chunked) HTTP gövdesi; AZAMI_SATIR'ı aşarsa None. Bozuk parça
+# ValueError verir ve bağlantı, sınırı aşan satırdaki gibi kapanır.
+async def _parcali_govde(okuyucu):
+    parcalar = []
+    toplam = 0
+    while True:
+        satir = await okuyucu.readline()
+        boy = int(satir.split(b";", 1)[0].strip(), 16)
+        if boy < 0:
+            raise ValueError("Geçersiz parça boyu")
+        if toplam + boy > AZAMI_SATIR:
+            return None
+        if boy == 0:
+            break
+        parcalar.append(await okuyucu.readexactly(boy))
+        toplam += boy
+        if (await okuyucu.readline()).strip():
+            raise ValueError("Parça sonunda satır sonu yok")
+    # Sondaki başlıklar okunup atılır
+    while (await okuyucu.readline()).strip():
+        pass
+    return b"".join(parcalar)
+
+
+def _metin(istek, alan):
+    deger = istek[alan]
+    if not isinstance(deger, str):
+        raise ValueError(f"'{alan}' metin olmalı")
+    return deger
+
+
+def hizmet_baslat(yol, eslestirici=None, soket=None, host="127.0.0.1", port=None,
+                  isci_sayisi=None, onbellek_kapasitesi=256, onbellek_politikasi="lru",
+                  sorgu_gunlugu=None, supurme_araligi=60, izleme_araligi=1, parca=None,
+                  parca_havuzu="thread"):
+    depo, bilgi = bilgi_tabani_ac(yol, eslestirici, eszamanli=True, parca=parca,
+                                  havuz=parca_havuzu)
+    bilgi.cache = onbellek_olustur(onbellek_kapasitesi, onbellek_politikasi)
+    kaydedici = kaydedici_olustur(sorgu_gunlugu)
+    supurucu = supurucu_baslat(bilgi, supurme_araligi)
+    izleyici = izleyici_baslat(bilgi, izleme_araligi)
+    hizmet = QueryService(bilgi, isci_sayisi, kaydedici=kaydedici)
+    try:
+        asyncio.run(hizmet.serve(soket, host, port))
+    finally:
+        if supurucu is not None:
+            supurucu.stop()
+        if izleyici is not None:
+            izleyici.stop()
+        hizmet.close()
+        bilgi_tabani_kapat(yol, depo, bilgi)
+        if kaydedici is not None:
+            kaydedici.close()
@@ -0,0 +1,372 @@
+"""
+ChatCPT parçalı bilgi tabanı
+Kayıtları soru anahtarının özetine göre N parça dosyaya böler; parçaları paralel
+yükler, sorguyu parçalara dağıtıp sonuçları skora göre birleştirir
+"""
+
+import json
+import os
+import threading
+import zlib
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+
+from yz_index import PUANLAYICI, eslestirici_olustur, ilk_k_birlestir, soru_anahtari
+from yz_store import PARCALI_UZANTI, JournalStore, json_yaz
+
+# YZ_PARCA: yeni parçalı veritabanının parça sayısı
+VARSAYILAN_PARCA = int(os.environ.get('YZ_PARCA') or 4)
+
+HAVUZLAR = ("thread", "process")
+
+# Sonucu tam taramayla aynı olan eşleştiriciler; yalnızca bunlar parçalanır.
+# tfidf ve lsh'te IDF, aday sınırı ve yaygın gram eşiği parçadaki sorulara
+# göre hesaplanır, parçalı sonuç tek indeksinkinden farklı olurdu.
+PARCALANAN_ESLESTIRICILER = ("linear", "ngram", "bktree")
+
+
+# Süreçler ve çalıştırmalar arasında aynı kalan parça numarası (hash() tohumlanır)
+def parca_no(soru, parca_sayisi):
+    return zlib.crc32(soru_anahtari(soru).encode('utf-8')) % parca_sayisi
+
+
+# Kayıtları (ya da silme satırlarını) parçalarına göre gruplar
+def parcala(kayitlar, parca_sayisi):
+    gruplar = [[] for _ in range(parca_sayisi)]
+    for kayit in kayitlar:
+        gruplar[parca_no(kayit["soru"], parca_sayisi)].append(kayit)
+    return gruplar
+
+
+class ShardedRecords(MutableMapping):
+    """Parça eşlemelerini tek anahtar -> kayıt eşlemesi gibi gösterir
+
+    Kayıtlar kopyalanmaz; her anahtar kendi parçasının eşlemesine gider.
+    Kayıt kimliği parçadaki kimlik ile parça numarasından kurulur
+    (`yerel * parca_sayisi + parca`), parça eşlemesi yaşadıkça değişmez.
+    """
+
+    def __init__(self, parcalar):
+        self.parcalar = parcalar
+
+    def _parca(self, anahtar):
+        return self.parcalar[parca_no(anahtar, len(self.parcalar))]
+
+    def __getitem__(self, anahtar):
+        return self._parca(anahtar)[anahtar]
+
+    def __setitem__(self, anahtar, kayit):
+        self._parca(anahtar)[anahtar] = kayit
+
+    def __delitem__(self, anahtar):
+        del self._parca(anahtar)[anahtar]
+
+    def __contains__(self, anahtar):
+        return anahtar in self._parca(anahtar)
+
+    def __iter__(self):
+        return chain.from_iterable(list(parca) for parca in self.parcalar)
+
+    def __len__(self):
+        return sum(len(parca) for parca in self.parcalar)
+
+    def id_of(self, anahtar):
+        yerel = self._parca(anahtar).id_of(anahtar)
+        if yerel is None:
+            return None
+        return yerel * len(self.parcalar) + parca_no(anahtar, len(self.parcalar))
+
+    def by_id(self, kimlik):
+        if kimlik < 0:
+            raise KeyError(kimlik)
+        yerel, parca = divmod(kimlik, len(self.parcalar))
+        return self.parcalar[parca].by_id(yerel)
+
+    def question(self, anahtar):
+        return self._parca(anahtar).question(anahtar)
+
+    def questions(self):
+        return chain.from_iterable(parca.questions() for parca in self.parcalar)
+
+    def expiring(self):
+        return [kayit for parca in self.parcalar for kayit in parca.expiring()]
+
+
+class ShardedStore:
+    """Soru anahtarına göre N JournalStore'a bölünmüş depo
+
+    `*.shards.json` parça sayısını ve parça dosyalarını tutar; parçalar
+    aynı dizinde `taban.N.json` adlı, kendi günlüğü ve ikili kopyası olan
+    JournalStore'lardır. Parça sayısı veritabanı oluşturulurken verilir
+    (`parca`, yoksa YZ_PARCA) ve sonra değişmez; başka sayıya geçmek için
+    kayıtlar yeni bir parçalı veritabanına taşınır (bkz. depo_tasi).
+
+    `load_records()` parçaları bir iş parçacığı havuzunda aynı anda
+    yükler, kayıtlar ShardedRecords ile kopyalanmadan birleşir. Her yazma
+    yalnızca kaydın parçasına gider.
+    """
+
+    UZANTI = PARCALI_UZANTI
+
+    def __init__(self, yol, parca=None, ilerleme=None):
+        self.yol = yol
+        taban = yol[:-len(self.UZANTI)] if yol.endswith(self.UZANTI) else yol
+        try:
+            with open(yol, encoding='utf-8') as dosya:
+                bilgi = json.load(dosya)
+        except FileNotFoundError:
+            parca_sayisi = parca or VARSAYILAN_PARCA
+            if parca_sayisi < 1:
+                raise ValueError(f"Parça sayısı en az 1 olmalı: {parca_sayisi}") from None
+            bilgi = {
+                "parca": parca_sayisi,
+                "dosyalar": [f"{os.path.basename(taban)}.{i}.json" for i in range(parca_sayisi)],
+            }
+            json_yaz(yol, bilgi)
+        dizin = os.path.dirname(yol)
+        self.parcalar = [JournalStore(os.path.join(dizin, ad)) for ad in bilgi["dosyalar"]]
+        self.parca_sayisi = len(self.parcalar)
+        # Parçalar aynı anda yüklendiğinden ilerleme yalnızca tek parçada bildirilir
+        if self.parca_sayisi == 1:
+            self.parcalar[0].ilerleme = ilerleme
+
+    def _hepsinde(self, islev, *gruplar):
+        if self.parca_sayisi == 1:
+            return [islev(self.parcalar[0], *(grup[0] for grup in gruplar))]
+        with ThreadPoolExecutor(self.parca_sayisi) as havuz:
+            return list(havuz.map(islev, self.parcalar, *gruplar))
+
+    def load(self):
+        return list(self.load_records().values())
+
+    def load_records(self):
+        return ShardedRecords(self._hepsinde(JournalStore.load_records))
+
+    def append(self, kayit):
+        self.append_many([kayit])
+
+    def delete(self, kayit):
+        self.append_many([{"soru": kayit["soru"], "silindi": True}])
+
+    def append_many(self, veriler):
+        for parca, grup in zip(self.parcalar, parcala(veriler, self.parca_sayisi)):
+            if grup:
+                parca.append_many(grup)
+
+    def compact(self):
+        self._hepsinde(JournalStore.compact)
+
+    def import_records(self, kayitlar):
+        gruplar = parcala(kayitlar, self.parca_sayisi)
+        return ShardedRecords(self._hepsinde(JournalStore.import_records, gruplar))
+
+    def save(self, veriler):
+        gruplar = [{"sorular": grup}
+                   for grup in parcala(veriler.get("sorular", []), self.parca_sayisi)]
+        self._hepsinde(JournalStore.save, gruplar)
+
+    def watch_paths(self):
+        return [yol for parca in self.parcalar for yol in parca.watch_paths()]
+
+    def changes(self):
+        """Parçaların değişiklikleri (bkz. JournalStore.changes)
+
+        Bir parça baştan yüklenmişse tüm kayıtlar ("tam") verilir; diğer
+        parçalar için de bellekteki hâlleri yerine dosyadakiler okunur.
+        """
+        degisiklikler = [parca.changes() for parca in self.parcalar]
+        if any(degisiklik and degisiklik[0] == "tam" for degisiklik in degisiklikler):
+            return "tam", ShardedRecords([
+                degisiklik[1] if degisiklik and degisiklik[0] == "tam" else parca.load_records()
+                for parca, degisiklik in zip(self.parcalar, degisiklikler)
+            ])
+        satirlar = [satir for degisiklik in degisiklikler if degisiklik for satir in degisiklik[1]]
+        return ("gunluk", satirlar) if satirlar else None
+
+    def close(self):
+        for parca in self.parcalar:
+            parca.close()
+
+
+_parca_indeksi = None
+
+
+# Süreç havuzunda her parçanın kendi tek işçili havuzu vardır; işçi parçanın
+# indeksini bir kez alır, sonraki eklemeler ve silmeler sırasıyla gelir
+def _isci_baslat(indeks):
+    global _parca_indeksi
+    _parca_indeksi = indeks
+
+
+def _isci_ekle(soru, normal):
+    _parca_indeksi.add(soru, normal)
+
+
+def _isci_sil(soru):
+    _parca_indeksi.remove(soru)
+
+
+# İşçinin puanlayıcısı ana süreçtekinin kopyasıdır; sorgu sonucu, bu
+# sorgunun sayaçları ve süresiyle döner (bkz. ShardedIndex._dagit)
+def _isci_olc(islev, *argumanlar):
+    PUANLAYICI.reset()
+    sonuc = islev(_parca_indeksi, *argumanlar)
+    return (sonuc, *PUANLAYICI.ozet())
+
+
+def _isci_top_k(soru, k, cutoff):
+    return _isci_olc(_parca_top_k, soru, k, cutoff)
+
+
+def _isci_top_k_many(sorular, k, cutoff):
+    return _isci_olc(_parca_top_k_many, sorular, k, cutoff)
+
+
+class ShardedIndex:
+    """Soruları parça numarasına göre N alt eşleştiriciye bölen indeks
+
+    Alt eşleştiriciler `eslestirici` adıyla kurulur (bkz.
+    eslestirici_olustur); yalnızca PARCALANAN_ESLESTIRICILER kabul edilir.
+    Sorgu tüm parçalara gönderilir; her parçanın ilk k sonucu skora göre
+    birleştirilir (bkz. ilk_k_birlestir). Bu eşleştiricilerin her parçası
+    kendi sorularında tam taramayla aynı ilk k'yı verdiğinden birleşik
+    sonuç da tek indeksinkiyle birebir aynıdır.
+
+    `havuz` "thread" ise parçalar bir iş parçacığı havuzunda, "process"
+    ise her parça kendi işçi sürecinde puanlanır. difflib saf Python
+    olduğundan tek çekirdeği aşmak için süreç havuzu gerekir; o zaman
+    her parçanın bir kopyası işçisinde durur, eklemeler ve silmeler ona
+    da gönderilir. İşçilerin aşama sayaçları her sorgunun sonucuyla
+    gelir ve PUANLAYICI'ya eklenir, sorgu günlüğü iki havuzda da aynı
+    sayıları görür. Havuzlar ilk sorguda kurulur, `close()` kapatır.
+    """
+
+    def __init__(self, eslestirici="ngram", parca_sayisi=VARSAYILAN_PARCA, havuz="thread",
+                 sorular=()):
+        if havuz not in HAVUZLAR:
+            raise ValueError(f"Bilinmeyen havuz: {havuz}")
+        if eslestirici not in PARCALANAN_ESLESTIRICILER:
+            raise ValueError(f"{eslestirici} eşleştiricisi parçalanamaz")
+        self.eslestirici = eslestirici
+        self.parcalar = [eslestirici_olustur(eslestirici) for _ in range(parca_sayisi)]
+        self.havuz = havuz
+        self._havuzlar = None
+        self._kilit = threading.Lock()
+        for soru in sorular:
+            self.add(soru)
+
+    # Önbellek dosyasının adı; parça sayısı başka olan indeks kullanılmaz
+    @property
+    def ad(self):
+        return f"{self.eslestirici}-{len(self.parcalar)}p"
+
+    # İş parçacığı ve süreç havuzları önbelleğe yazılmaz
+    def __getstate__(self):
+        durum = self.__dict__.copy()
+        durum["_havuzlar"] = None
+        del durum["_kilit"]
+        return durum
+
+    def __setstate__(self, durum):
+        self.__dict__.update(durum)
+        self._kilit = threading.Lock()
+
+    def __len__(self):
+        return sum(len(parca) for parca in self.parcalar)
+
+    def __contains__(self, soru):
+        return soru in self._parca(soru)
+
+    def __iter__(self):
+        return chain.from_iterable(iter(parca) for parca in self.parcalar)
+
+    def _no(self, soru):
+        return parca_no(soru, len(self.parcalar))
+
+    def _parca(self, soru):
+        return self.parcalar[self._no(soru)]
+
+    def add(self, soru, normal=None):
+        no = self._no(soru)
+        if soru in self.parcalar[no]:
+            return
+        self.parcalar[no].add(soru, normal)
+        if self._havuzlar is not None and self.havuz == "process":
+            self._havuzlar[no].submit(_isci_ekle, soru, normal)
+
+    def remove(self, soru):
+        no = self._no(soru)
+        if soru not in self.parcalar[no]:
+            return
+        self.parcalar[no].remove(soru)
+        if self._havuzlar is not None and self.havuz == "process":
+            self._havuzlar[no].submit(_isci_sil, soru)
+
+    def _havuzlari_kur(self):
+        with self._kilit:
+            if self._havuzlar is None:
+                if self.havuz == "process":
+                    self._havuzlar = [
+                        ProcessPoolExecutor(1, initializer=_isci_baslat, initargs=(parca,))
+                        for parca in self.parcalar
+                    ]
+                else:
+                    self._havuzlar = [ThreadPoolExecutor(len(self.parcalar),
+                                                         thread_name_prefix="yz-parca")]
+        return self._havuzlar
+
+    # Her parçada islev(parca, *argumanlar) ya da işçide isci_islevi(*argumanlar)
+    def _dagit(self, islev, isci_islevi, *argumanlar):
+        if len(self.parcalar) == 1 and self.havuz == "thread":
+            return [islev(self.parcalar[0], *argumanlar)]
+        havuzlar = self._havuzlari_kur()
+        if self.havuz == "process":
+            gelecekler = [havuz.submit(isci_islevi, *argumanlar) for havuz in havuzlar]
+            sonuclar = []
+            for gelecek in gelecekler:
+                sonuc, sayaclar, sure = gelecek.result()
+                PUANLAYICI.birlestir(sayaclar, sure)
+                sonuclar.append(sonuc)
+            return sonuclar
+        gelecekler = [havuzlar[0].submit(islev, parca, *argumanlar) for parca in self.parcalar]
+        return [gelecek.result() for gelecek in gelecekler]
+
+    def candidates(self, soru):
+        return [aday for parca in self.parcalar for aday in parca.candidates(soru)]
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        return ilk_k_birlestir(self._dagit(_parca_top_k, _isci_top_k, soru, k, cutoff), k)
+
+    # Süreç havuzunda her parçaya tüm sorular tek seferde gider
+    def top_k_many(self, sorular, k=3, cutoff=0.6):
+        sorular = list(sorular)
+        parca_sonuclari = self._dagit(_parca_top_k_many, _isci_top_k_many, sorular, k, cutoff)
+        return [ilk_k_birlestir(sonuclar, k) for sonuclar in zip(*parca_sonuclari)]
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
+
+    def close(self):
+        with self._kilit:
+            havuzlar, self._havuzlar = self._havuzlar, None
+        for havuz in havuzlar or ():
+            havuz.shutdown()
+
+
+# `parca_sayisi` parçalı boş indeks; 1 parçada ya da parçalanamayan eşleştiricide tek indeks
+def parcali_indeks(eslestirici, parca_sayisi, havuz="thread"):
+    if parca_sayisi > 1 and eslestirici in PARCALANAN_ESLESTIRICILER:
+        return ShardedIndex(eslestirici, parca_sayisi, havuz)
+    return eslestirici_olustur(eslestirici)
+
+
+def _parca_top_k(parca, soru, k, cutoff):
+    return parca.top_k(soru, k, cutoff)
+
+
+def _parca_top_k_many(parca, sorular, k, cutoff):
+    if hasattr(parca, "top_k_many"):
+        return parca.top_k_many(sorular, k, cutoff)
+    return [parca.top_k(soru, k, cutoff) for soru in sorular]
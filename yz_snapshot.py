@@ -0,0 +1,219 @@
+"""
+ChatCPT ikili anlık görüntü
+database.json kayıtlarını ve hazır eşleştirici indekslerini tek dosyada tutar
+"""
+
+import os
+import pickle
+import struct
+import sys
+from array import array
+
+from yz_kb import CompactRecords
+from yz_ttl import kayit_ekleri
+
+SIHIR = b"YZANLIK\x00"
+# 2: ek alanlar bölümü (kaynak, zaman, ttl)
+SURUM = 2
+
+# sihir, sürüm, kayıt sayısı, kaynak mtime_ns, kaynak boyu,
+# soru bölümü boyu, cevap bölümü boyu, ek bölümü boyu, indeks bölümü boyu
+BASLIK = struct.Struct("<8sIIqqqqqq")
+
+# Soru bölümünde anahtar ve sorular bu karakterle ayrılır
+AYIRICI = "\x00"
+
+# JSON'da kaçışla yazılabilen eşleşmeyen vekil karakterler de olduğu gibi taşınır
+_KODLAMA = ("utf-8", "surrogatepass")
+
+
+# JSON kaynağının değişme zamanı ve boyu; dosya yoksa boyu -1
+def kaynak_kimligi(kaynak_yolu):
+    try:
+        durum = os.stat(kaynak_yolu)
+    except FileNotFoundError:
+        return (0, -1)
+    return (durum.st_mtime_ns, durum.st_size)
+
+
+def _baslik_oku(dosya):
+    ham = dosya.read(BASLIK.size)
+    if len(ham) < BASLIK.size:
+        return None
+    baslik = BASLIK.unpack(ham)
+    if baslik[0] != SIHIR or baslik[1] != SURUM:
+        return None
+    return baslik
+
+
+# Geçici dosyaya yazıp yerine taşır; `yazici` açık dosyayı alır
+def _yaz(yol, yazici):
+    gecici = f"{yol}.tmp"
+    with open(gecici, 'wb') as dosya:
+        yazici(dosya)
+        dosya.flush()
+        os.fsync(dosya.fileno())
+    os.replace(gecici, yol)
+
+
+class AnlikKayitlar(CompactRecords):
+    """Anlık görüntüden gelen CompactRecords
+
+    Anahtarlar ve sorular yüklemede çözülür; cevaplar ham UTF-8 olarak
+    bellekte durur ve kayda ilk erişildiğinde çözülür. Kimlikler
+    anlık görüntüdeki sıradır.
+    """
+
+    def __init__(self, anahtarlar, sorular, cevaplar, ofsetler, ekler=None):
+        super().__init__()
+        self._ekler = ekler or {}
+        self._idler = dict(zip(anahtarlar, range(len(sorular))))
+        self._sorular = [anahtar if anahtar == soru else soru
+                         for anahtar, soru in zip(anahtarlar, sorular)]
+        # Henüz çözülmemiş cevaplar None
+        self._cevaplar = [None] * len(sorular)
+        self._ham_cevaplar = cevaplar
+        self._ofsetler = ofsetler
+
+    def _cevap(self, kimlik):
+        cevap = self._cevaplar[kimlik]
+        if cevap is None:
+            bas, son = self._ofsetler[kimlik], self._ofsetler[kimlik + 1]
+            cevap = str(self._ham_cevaplar[bas:son], *_KODLAMA)
+        return cevap
+
+
+def anlik_yaz(yol, kayitlar, kimlik, indeksler=None):
+    """Anahtar -> kayıt eşlemesini ve `indeksler` (ad -> pickle baytları) yazar
+
+    Soru bölümü anahtar ve soruların ayırıcıyla birleştirilmiş hâlidir ve
+    yüklemede tek split ile açılır. Cevap bölümü art arda eklenmiş UTF-8
+    cevaplardır; ofset dizisi her cevabın bayt sınırlarını tutar. Ek
+    bölümü, ek alanı olan kayıtların sıra -> alanlar sözlüğüdür.
+    Ayırıcıyı içeren bir anahtar ya da soru varsa yazılmaz ve False döner.
+    """
+    sorular = []
+    ekler = {}
+    for sira, (anahtar, kayit) in enumerate(kayitlar.items()):
+        if AYIRICI in anahtar or AYIRICI in kayit["soru"]:
+            return False
+        sorular.append(anahtar)
+        sorular.append(kayit["soru"])
+        kayit_eki = kayit_ekleri(kayit)
+        if kayit_eki:
+            ekler[sira] = kayit_eki
+    soru_bolumu = AYIRICI.join(sorular).encode(*_KODLAMA)
+    del sorular
+    ek = pickle.dumps(ekler, protocol=pickle.HIGHEST_PROTOCOL)
+    indeks = pickle.dumps(indeksler or {}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Cevaplar bellekte biriktirilmeden yazılır; başlık ve ofsetler sona kalır
+    def yazici(dosya):
+        ofset_boyu = 8 * (len(kayitlar) + 1)
+        dosya.seek(BASLIK.size + ofset_boyu)
+        dosya.write(soru_bolumu)
+        ofsetler = array('q', [0])
+        for kayit in kayitlar.values():
+            ofsetler.append(ofsetler[-1] + dosya.write(kayit["cevap"].encode(*_KODLAMA)))
+        dosya.write(ek)
+        dosya.write(indeks)
+        if sys.byteorder != "little":
+            ofsetler.byteswap()
+        dosya.seek(0)
+        dosya.write(BASLIK.pack(SIHIR, SURUM, len(kayitlar), kimlik[0], kimlik[1],
+                                len(soru_bolumu), ofsetler[-1], len(ek), len(indeks)))
+        dosya.write(ofsetler.tobytes())
+
+    _yaz(yol, yazici)
+    return True
+
+
+def anlik_oku(yol):
+    """(kaynak kimliği, AnlikKayitlar) ya da dosya yok/bozuk/başka sürümse None"""
+    try:
+        with open(yol, 'rb') as dosya:
+            baslik = _baslik_oku(dosya)
+            if baslik is None:
+                return None
+            _, _, adet, mtime, boyu, soru_boyu, cevap_boyu, ek_boyu, indeks_boyu = baslik
+            ofset_boyu = 8 * (adet + 1)
+            kayit_boyu = ofset_boyu + soru_boyu + cevap_boyu
+            if os.fstat(dosya.fileno()).st_size != BASLIK.size + kayit_boyu + ek_boyu + indeks_boyu:
+                return None
+            # İndeks bölümü hariç kayıtların tamamı tek okumada gelir
+            veri = memoryview(dosya.read(kayit_boyu))
+            ekler = pickle.loads(dosya.read(ek_boyu))
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    ofsetler = array('q')
+    ofsetler.frombytes(veri[:ofset_boyu])
+    if sys.byteorder != "little":
+        ofsetler.byteswap()
+    metinler = []
+    if adet:
+        metinler = str(veri[ofset_boyu:ofset_boyu + soru_boyu], *_KODLAMA).split(AYIRICI)
+    cevaplar = veri[ofset_boyu + soru_boyu:]
+    return (mtime, boyu), AnlikKayitlar(metinler[0::2], metinler[1::2], cevaplar, ofsetler, ekler)
+
+
+# İndeks bölümünden önceki her şeyin (başlık hariç) boyu
+def _kayit_bolumu_boyu(baslik):
+    adet, soru_boyu, cevap_boyu, ek_boyu = baslik[2], baslik[5], baslik[6], baslik[7]
+    return 8 * (adet + 1) + soru_boyu + cevap_boyu + ek_boyu
+
+
+def _indeks_bolumu(dosya, baslik):
+    indeks_boyu = baslik[8]
+    dosya.seek(BASLIK.size + _kayit_bolumu_boyu(baslik))
+    try:
+        indeksler = pickle.loads(dosya.read(indeks_boyu))
+    except (EOFError, pickle.UnpicklingError):
+        return None
+    return indeksler if isinstance(indeksler, dict) else None
+
+
+# Kayıt bölümü okunmadan yalnızca indeks bölümü okunur
+def anlik_indeksleri(yol):
+    try:
+        with open(yol, 'rb') as dosya:
+            baslik = _baslik_oku(dosya)
+            indeksler = None if baslik is None else _indeks_bolumu(dosya, baslik)
+    except OSError:
+        return {}
+    return indeksler or {}
+
+
+def anlik_indeks_yaz(yol, ad, indeks_baytlari, parca=1 << 20):
+    """Kayıt bölümüne dokunmadan `ad` indeksini değiştirir; anlık görüntü yoksa False"""
+    try:
+        with open(yol, 'rb') as kaynak:
+            baslik = _baslik_oku(kaynak)
+            indeksler = None if baslik is None else _indeks_bolumu(kaynak, baslik)
+    except OSError:
+        return False
+    if indeksler is None:
+        return False
+    indeksler[ad] = indeks_baytlari
+    indeks = pickle.dumps(indeksler, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Kayıt bölümü belleğe alınmadan parça parça kopyalanır; kaynak, yerine
+    # taşınmadan önce kapanmış olmalı (Windows)
+    def yazici(dosya):
+        dosya.write(BASLIK.pack(*baslik[:8], len(indeks)))
+        kalan = _kayit_bolumu_boyu(baslik)
+        with open(yol, 'rb') as kaynak:
+            kaynak.seek(BASLIK.size)
+            while kalan:
+                ham = kaynak.read(min(parca, kalan))
+                if not ham:
+                    raise OSError(f"{yol} beklenenden kısa")
+                dosya.write(ham)
+                kalan -= len(ham)
+        dosya.write(indeks)
+
+    try:
+        _yaz(yol, yazici)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,325 @@
+"""
+ChatCPT bilgi tabanı için SQLite deposu
+Cevaplar normal tabloda, aday arama normalleştirilmiş sorular üzerinde FTS5 ile yapılır
+"""
+
+import sqlite3
+from collections.abc import MutableMapping
+
+from yz_index import en_iyiler, ilk_k_birlestir, normalle, soru_anahtari
+from yz_ttl import EK_ALANLAR
+
+SEMA = """
+CREATE TABLE IF NOT EXISTS sorular (
+    id INTEGER PRIMARY KEY,
+    anahtar TEXT NOT NULL UNIQUE,
+    soru TEXT NOT NULL,
+    cevap TEXT NOT NULL,
+    normal TEXT NOT NULL DEFAULT '',
+    kaynak TEXT,
+    zaman REAL,
+    ttl REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS sorular_soru ON sorular(soru);
+CREATE INDEX IF NOT EXISTS sorular_uzunluk ON sorular(length(normal));
+CREATE TRIGGER IF NOT EXISTS sorular_ekle AFTER INSERT ON sorular BEGIN
+    INSERT INTO sorular_fts(rowid, normal) VALUES (new.id, new.normal);
+END;
+CREATE TRIGGER IF NOT EXISTS sorular_sil AFTER DELETE ON sorular BEGIN
+    INSERT INTO sorular_fts(sorular_fts, rowid, normal) VALUES ('delete', old.id, old.normal);
+END;
+CREATE TRIGGER IF NOT EXISTS sorular_guncelle AFTER UPDATE OF normal ON sorular BEGIN
+    INSERT INTO sorular_fts(sorular_fts, rowid, normal) VALUES ('delete', old.id, old.normal);
+    INSERT INTO sorular_fts(rowid, normal) VALUES (new.id, new.normal);
+END;
+"""
+
+# Normalleştirme eklenmeden önce FTS tablosu ham soruyu indeksliyordu
+ESKI_SEMA = """
+ALTER TABLE sorular ADD COLUMN normal TEXT NOT NULL DEFAULT '';
+UPDATE sorular SET normal = normalle(soru);
+DROP TRIGGER IF EXISTS sorular_ekle;
+DROP TRIGGER IF EXISTS sorular_sil;
+DROP TRIGGER IF EXISTS sorular_guncelle;
+DROP TABLE IF EXISTS sorular_fts;
+"""
+
+# Kaynak, zaman ve ttl sütunlarından önce oluşturulmuş tablo
+EK_SEMA = """
+ALTER TABLE sorular ADD COLUMN kaynak TEXT;
+ALTER TABLE sorular ADD COLUMN zaman REAL;
+ALTER TABLE sorular ADD COLUMN ttl REAL;
+"""
+
+UPSERT = """
+INSERT INTO sorular (anahtar, soru, cevap, normal, kaynak, zaman, ttl) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(anahtar) DO UPDATE SET
+    cevap = excluded.cevap, kaynak = excluded.kaynak, zaman = excluded.zaman, ttl = excluded.ttl
+"""
+
+KAYIT_SUTUNLARI = "soru, cevap, kaynak, zaman, ttl"
+
+
+def _kayit(satir):
+    kayit = {"soru": satir[0], "cevap": satir[1]}
+    for alan, deger in zip(EK_ALANLAR, satir[2:]):
+        if deger is not None:
+            kayit[alan] = deger
+    return kayit
+
+
+def _upsert_satiri(kayit):
+    soru = kayit["soru"]
+    return (soru_anahtari(soru), soru, kayit["cevap"], normalle(soru),
+            *(kayit.get(alan) for alan in EK_ALANLAR))
+
+
+# FTS5 sorgu sözdizimine takılmasın diye her terim tırnaklanır
+def _fts_terimi(terim):
+    return '"' + terim.replace('"', '""') + '"'
+
+
+class SqliteRecords(MutableMapping):
+    """Soru anahtarından kayda, doğrudan tabloya giden eşleme"""
+
+    def __init__(self, baglanti):
+        self._baglanti = baglanti
+
+    def __getitem__(self, anahtar):
+        satir = self._baglanti.execute(
+            f"SELECT {KAYIT_SUTUNLARI} FROM sorular WHERE anahtar = ?", (anahtar,)
+        ).fetchone()
+        if satir is None:
+            raise KeyError(anahtar)
+        return _kayit(satir)
+
+    def __setitem__(self, anahtar, kayit):
+        with self._baglanti:
+            self._baglanti.execute(UPSERT, (anahtar, *_upsert_satiri(kayit)[1:]))
+
+    def __delitem__(self, anahtar):
+        with self._baglanti:
+            silinen = self._baglanti.execute(
+                "DELETE FROM sorular WHERE anahtar = ?", (anahtar,)
+            ).rowcount
+        if not silinen:
+            raise KeyError(anahtar)
+
+    def __iter__(self):
+        for (anahtar,) in self._baglanti.execute("SELECT anahtar FROM sorular ORDER BY id"):
+            yield anahtar
+
+    def __len__(self):
+        return self._baglanti.execute("SELECT COUNT(*) FROM sorular").fetchone()[0]
+
+    # Tablo kimliği; güncellemede korunur
+    def id_of(self, anahtar):
+        satir = self._baglanti.execute(
+            "SELECT id FROM sorular WHERE anahtar = ?", (anahtar,)
+        ).fetchone()
+        return None if satir is None else satir[0]
+
+    def by_id(self, kimlik):
+        satir = self._baglanti.execute(
+            f"SELECT {KAYIT_SUTUNLARI} FROM sorular WHERE id = ?", (kimlik,)
+        ).fetchone()
+        if satir is None:
+            raise KeyError(kimlik)
+        return _kayit(satir)
+
+    # Tek sorguyla gezilir; her anahtar için ayrı SELECT yapılmaz
+    def values(self):
+        for satir in self._baglanti.execute(f"SELECT {KAYIT_SUTUNLARI} FROM sorular ORDER BY id"):
+            yield _kayit(satir)
+
+    # ttl'i olan kayıtlar
+    def expiring(self):
+        return [_kayit(satir) for satir in self._baglanti.execute(
+            f"SELECT {KAYIT_SUTUNLARI} FROM sorular WHERE ttl IS NOT NULL"
+        )]
+
+
+class FtsIndex:
+    """FTS5 üzerinden aday seçen, NgramIndex ile aynı arayüzlü indeks
+
+    Her sorunun normali eklenirken `normal` sütununa yazılır; sorgu
+    anında yalnızca sorgu normalleştirilir. FTS en iyi `aday_limiti`
+    adayı BM25 sırasıyla verir; BM25 difflib oranını sınırlamadığından
+    dışarıda kalan sorulardan uzunluğu adaylardan bulunan k. skora
+    (k sonuç yoksa eşiğe) ulaşabilenler de puanlanır. Böylece ilk k
+    sonuç LinearIndex ile birebir aynıdır. Trigram üretmeyen kısa
+    sorgularda doğrudan bu uzunluk aralığı puanlanır.
+    """
+
+    def __init__(self, baglanti, trigram, aday_limiti=64):
+        self._baglanti = baglanti
+        self.trigram = trigram
+        self.aday_limiti = aday_limiti
+
+    def __len__(self):
+        return self._baglanti.execute("SELECT COUNT(*) FROM sorular").fetchone()[0]
+
+    def __contains__(self, soru):
+        return self._baglanti.execute(
+            "SELECT 1 FROM sorular WHERE soru = ?", (soru,)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        for (soru,) in self._baglanti.execute("SELECT soru FROM sorular ORDER BY id"):
+            yield soru
+
+    # FTS tablosu tetikleyicilerle güncellenir
+    def add(self, soru, normal=None):
+        pass
+
+    def remove(self, soru):
+        pass
+
+    # Oranı 2*min(L,m)/(L+m) >= taban olabilecek, yani
+    # taban*L/(2-taban) <= m <= L*(2-taban)/taban uzunluğundaki sorular: (id, normal, soru)
+    def _uzunluk_araligi(self, normal, taban):
+        if taban <= 0:
+            return self._baglanti.execute("SELECT id, normal, soru FROM sorular").fetchall()
+        uzunluk = len(normal)
+        return self._baglanti.execute(
+            "SELECT id, normal, soru FROM sorular"
+            " WHERE length(normal) BETWEEN ? AND ? ORDER BY id",
+            (taban * uzunluk / (2 - taban) - 1e-9, uzunluk * (2 - taban) / taban + 1e-9),
+        ).fetchall()
+
+    def _terimler(self, normal):
+        if self.trigram:
+            return {normal[i:i + 3] for i in range(len(normal) - 2)}
+        return set(normal.split())
+
+    # Normalleştirilmiş sorgu için (id, normal, soru) adayları; terim yoksa uzunluk aralığı
+    def _adaylar(self, normal, cutoff=0.6):
+        terimler = self._terimler(normal)
+        if not terimler:
+            return self._uzunluk_araligi(normal, cutoff)
+        sorgu = " OR ".join(_fts_terimi(t) for t in terimler)
+        return self._baglanti.execute(
+            "SELECT id, normal, soru FROM sorular WHERE id IN ("
+            "SELECT rowid FROM sorular_fts WHERE sorular_fts MATCH ? ORDER BY rank LIMIT ?)",
+            (sorgu, self.aday_limiti),
+        ).fetchall()
+
+    def candidates(self, soru):
+        return [aday for _, _, aday in self._adaylar(normalle(soru))]
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        normal = normalle(soru)
+        adaylar = self._adaylar(normal, cutoff)
+        sonuc = en_iyiler(normal, [(n, s) for _, n, s in adaylar], k, cutoff)
+        if k < 1 or not self._terimler(normal):
+            return sonuc
+
+        # FTS'nin dışarıda bıraktıkları: yalnızca uzunluğu ilk k'nın en kötüsüne
+        # (k sonuç yoksa eşiğe) ulaşabilenler puanlanır
+        taban = sonuc[-1][1] if len(sonuc) == k else cutoff
+        secilen = {kimlik for kimlik, _, _ in adaylar}
+        kalanlar = [(n, s) for kimlik, n, s in self._uzunluk_araligi(normal, taban)
+                    if kimlik not in secilen]
+        if not kalanlar:
+            return sonuc
+        return ilk_k_birlestir([sonuc, en_iyiler(normal, kalanlar, k, taban)], k)
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
+
+
+class SqliteStore:
+    """SQLite deposu
+
+    Kayıtlar belleğe yüklenmez; KnowledgeBase `records()` ve `index()`
+    üzerinden doğrudan veritabanını sorgular. WAL kipi sayesinde aynı
+    dosya birden fazla süreç tarafından paylaşılabilir. Bağlantı iş
+    parçacıkları arasında paylaşılabilir (ConcurrentKnowledgeBase);
+    yazmaları okumalardan ayırmak kullananın kilidine kalır.
+    """
+
+    # FTS indeksi veritabanının içinde kalıcıdır, ayrıca önbelleğe alınmaz
+    kalici_indeks = True
+
+    def __init__(self, yol):
+        self.yol = yol
+        self._baglanti = sqlite3.connect(yol, timeout=30, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        self._baglanti.create_function("normalle", 1, normalle, deterministic=True)
+        eski = self._eski_semayi_tasi()
+        self._ek_sutunlari_ekle()
+        self.trigram = self._fts_olustur()
+        self._baglanti.executescript(SEMA)
+        if eski:
+            with self._baglanti:
+                self._baglanti.execute("INSERT INTO sorular_fts(sorular_fts) VALUES ('rebuild')")
+
+    # `normal` sütunu olmayan veritabanında sütun doldurulur, FTS tablosu yeniden kurulacak
+    def _eski_semayi_tasi(self):
+        sutunlar = {satir[1] for satir in self._baglanti.execute("PRAGMA table_info(sorular)")}
+        if not sutunlar or "normal" in sutunlar:
+            return False
+        self._baglanti.executescript(f"BEGIN;{ESKI_SEMA}COMMIT;")
+        return True
+
+    def _ek_sutunlari_ekle(self):
+        sutunlar = {satir[1] for satir in self._baglanti.execute("PRAGMA table_info(sorular)")}
+        if sutunlar and "ttl" not in sutunlar:
+            self._baglanti.executescript(f"BEGIN;{EK_SEMA}COMMIT;")
+
+    # trigram ayırıcısı SQLite 3.34 ile geldi; eskilerde kelime bazlı arama yapılır
+    def _fts_olustur(self):
+        satir = self._baglanti.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'sorular_fts'"
+        ).fetchone()
+        if satir is not None:
+            return "trigram" in satir[0]
+
+        try:
+            self._baglanti.execute(
+                "CREATE VIRTUAL TABLE sorular_fts USING fts5("
+                "normal, content='sorular', content_rowid='id', tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            self._baglanti.execute(
+                "CREATE VIRTUAL TABLE sorular_fts USING fts5("
+                "normal, content='sorular', content_rowid='id')"
+            )
+            return False
+
+    def records(self):
+        return SqliteRecords(self._baglanti)
+
+    def questions(self):
+        for (soru,) in self._baglanti.execute("SELECT soru FROM sorular ORDER BY id"):
+            yield soru
+
+    def index(self):
+        return FtsIndex(self._baglanti, self.trigram)
+
+    def load(self):
+        return list(self.records().values())
+
+    def append(self, kayit):
+        self.records()[soru_anahtari(kayit["soru"])] = kayit
+
+    def delete(self, kayit):
+        self.records().pop(soru_anahtari(kayit["soru"]), None)
+
+    def save(self, veriler):
+        with self._baglanti:
+            self._baglanti.execute("DELETE FROM sorular")
+            self._ekle(veriler.get("sorular", []))
+
+    def import_records(self, kayitlar):
+        with self._baglanti:
+            self._ekle(kayitlar)
+
+    def _ekle(self, kayitlar):
+        self._baglanti.executemany(UPSERT, (_upsert_satiri(kayit) for kayit in kayitlar))
+
+    def close(self):
+        self._baglanti.close()
+
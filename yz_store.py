@@ -0,0 +1,822 @@
+"""
+ChatCPT bilgi tabanı depolama katmanı
+database.json anlık görüntüsü ile ekleme günlüğünü (journal) yönetir
+"""
+
+import codecs
+import json
+import mmap
+import os
+import pickle
+import re
+import sys
+import threading
+from collections.abc import MutableMapping
+
+from yz_index import NgramIndex, eslestirici_adi, eslestirici_olustur, soru_anahtari
+from yz_kb import CompactRecords, ConcurrentKnowledgeBase, KnowledgeBase
+from yz_lock import FileLock
+from yz_snapshot import anlik_indeks_yaz, anlik_indeksleri, anlik_oku, anlik_yaz, kaynak_kimligi
+from yz_ttl import kayit_ekleri
+
+
+_BOSLUK = re.compile(r"[ \t\n\r]*")
+_SAYI_DEVAMI = re.compile(r"[0-9.eE+-]*")
+
+
+class _JsonAkisi:
+    """Dosyayı parça parça okuyup JSON değerlerini sırayla çözer
+
+    Tamponda yalnızca henüz çözülmemiş kısım tutulur; bir değer parça
+    sınırına denk gelirse bir sonraki parça eklenip yeniden denenir.
+    """
+
+    def __init__(self, dosya, parca, ilerleme):
+        self._dosya = dosya
+        self._parca = parca
+        self._ilerleme = ilerleme
+        self._cozucu = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._tampon = ""
+        self._konum = 0
+        self._bitti = False
+        self.okunan = 0
+        self.toplam = os.fstat(dosya.fileno()).st_size
+        self.kayit = 0
+
+    def _doldur(self):
+        ham = self._dosya.read(self._parca)
+        self.okunan += len(ham)
+        self._bitti = not ham
+        self._tampon = self._tampon[self._konum:] + self._cozucu.decode(ham, final=self._bitti)
+        self._konum = 0
+        # Son bildirim dosya tamamen çözüldükten sonra yapılır
+        if self._ilerleme and self.okunan < self.toplam:
+            self._ilerleme(self.okunan, self.toplam, self.kayit)
+
+    def _bosluk_atla(self):
+        while True:
+            self._konum = _BOSLUK.match(self._tampon, self._konum).end()
+            if self._konum < len(self._tampon) or self._bitti:
+                return
+            self._doldur()
+
+    def bak(self):
+        self._bosluk_atla()
+        if self._konum >= len(self._tampon):
+            raise ValueError("JSON beklenmedik yerde bitti")
+        return self._tampon[self._konum]
+
+    def karakter(self):
+        karakter = self.bak()
+        self._konum += 1
+        return karakter
+
+    def deger(self):
+        self._bosluk_atla()
+        while True:
+            try:
+                deger, son = self._json.raw_decode(self._tampon, self._konum)
+                # Tamponun sonunda biten sayı ya da sabit yarım kalmış olabilir;
+                # "1." ya da "1e" gibi kesilen sayı da "1" diye çözülür
+                if isinstance(deger, (int, float)) and not isinstance(deger, bool):
+                    son_ek = _SAYI_DEVAMI.match(self._tampon, son).end()
+                else:
+                    son_ek = son
+                if son_ek < len(self._tampon) or self._bitti:
+                    self._konum = son
+                    return deger
+            except json.JSONDecodeError:
+                if self._bitti:
+                    raise
+            self._doldur()
+
+
+def _bekle(akis, beklenen, yol):
+    karakter = akis.karakter()
+    if karakter not in beklenen:
+        raise ValueError(f"{yol}: '{karakter}' yerine {' ya da '.join(beklenen)} bekleniyordu")
+    return karakter
+
+
+def json_kayitlari_oku(yol, ilerleme=None, parca=1 << 20):
+    """database.json'daki "sorular" dizisini kayıt kayıt üretir
+
+    Dosya `parca` baytlık parçalarla okunur; dosyanın tamamı ya da
+    ayrıştırılmış dizinin tamamı hiçbir zaman bellekte tutulmaz.
+    `ilerleme(okunan_bayt, toplam_bayt, kayit_sayisi)` her parçada çağrılır.
+    """
+    with open(yol, 'rb') as dosya:
+        akis = _JsonAkisi(dosya, parca, ilerleme)
+        _bekle(akis, "{", yol)
+        if akis.bak() == "}":
+            return
+        while True:
+            anahtar = akis.deger()
+            _bekle(akis, ":", yol)
+            if anahtar == "sorular" and akis.bak() == "[":
+                akis.karakter()
+                if akis.bak() == "]":
+                    akis.karakter()
+                else:
+                    while True:
+                        kayit = akis.deger()
+                        # Her değer ayrı çözüldüğünden alan adları kayıtlar arasında
+                        # paylaşılmaz; interned ad kullanılarak kayıt başına kopya önlenir
+                        if isinstance(kayit, dict):
+                            kayit = {sys.intern(alan): deger for alan, deger in kayit.items()}
+                        yield kayit
+                        akis.kayit += 1
+                        if _bekle(akis, ",]", yol) == "]":
+                            break
+            else:
+                akis.deger()
+            if _bekle(akis, ",}", yol) == "}":
+                break
+        if ilerleme:
+            ilerleme(akis.okunan, akis.toplam, akis.kayit)
+
+
+# Yazma yarıda kalırsa eski dosya bozulmasın diye geçici dosya kullanılır
+def json_yaz(yol, veriler):
+    gecici = f"{yol}.tmp"
+    with open(gecici, 'w', encoding='utf-8') as dosya:
+        json.dump(veriler, dosya, indent=2, ensure_ascii=False)
+        dosya.flush()
+        os.fsync(dosya.fileno())
+    os.replace(gecici, yol)
+
+
+# Günlük satırlarını okur; yarım kalmış son satır atlanır
+def gunluk_oku(yol, onar=False):
+    if not os.path.exists(yol):
+        return []
+
+    kayitlar = []
+    gecerli = 0
+    with open(yol, 'rb') as dosya:
+        for satir in dosya:
+            if not satir.endswith(b"\n"):
+                break
+            try:
+                kayitlar.append(json.loads(satir))
+            except ValueError:
+                break
+            gecerli += len(satir)
+
+    # Sonraki eklemeler bozuk satırın arkasına yazılmasın
+    if onar and gecerli < os.path.getsize(yol):
+        os.truncate(yol, gecerli)
+    return kayitlar
+
+
+# Kayıtları sırayla anahtar -> kayıt sözlüğüne uygular: aynı anahtar cevabı
+# ve ek alanları (kaynak, zaman, ttl) günceller, ilk yazım kalır; "silindi" kaydı siler
+def kayitlari_uygula(birlesik, kayitlar):
+    for kayit in kayitlar:
+        anahtar = soru_anahtari(kayit["soru"])
+        if kayit.get("silindi"):
+            birlesik.pop(anahtar, None)
+        elif anahtar in birlesik:
+            birlesik[anahtar] = dict(kayit, soru=birlesik[anahtar]["soru"])
+        else:
+            birlesik[anahtar] = kayit
+    return birlesik
+
+
+# `ofset`ten sonraki tam satırlar ve okunan son satırın bittiği ofset
+def gunluk_kuyrugu(yol, ofset=0):
+    kayitlar = []
+    with open(yol, 'rb') as dosya:
+        dosya.seek(ofset)
+        for satir in dosya:
+            if not satir.endswith(b"\n"):
+                break
+            try:
+                kayitlar.append(json.loads(satir))
+            except ValueError:
+                break
+            ofset += len(satir)
+    return kayitlar, ofset
+
+
+def kayitlari_birlestir(kayitlar):
+    return list(kayitlari_uygula({}, kayitlar).values())
+
+
+class JournalStore:
+    """Anlık görüntü + ekleme günlüğü
+
+    Her öğretme yalnızca tek bir JSONL satırı yazar. Günlük
+    `sikistirma_esigi` satıra ulaşınca arka planda anlık görüntüyle
+    birleştirilir: günlük önce `.journal.old.jsonl` adına taşınır, yeni
+    yazmalar boş günlüğe devam eder. Yükleme sırası anlık görüntü, eski
+    günlük, güncel günlüktür; birleştirme yarıda kalırsa bir sonraki
+    açılışta tamamlanır.
+
+    database.json her yazıldığında yanına `.snapshot.bin` ikili kopyası
+    da yazılır (bkz. yz_snapshot). Kopya, kaydettiği JSON boyu ve
+    değişme zamanı tutuyorsa JSON ayrıştırılmaz; eşleştirici indeksleri
+    de bu dosyada saklanır. JSON elle değiştirilirse kopya yok sayılıp
+    yeniden yazılır.
+
+    Aynı veritabanını açan süreçler `.lock` dosyası üzerinden sıralanır:
+    günlüğe ekleme, yükleme, birleştirme ve tam yazma kilit altında
+    yapılır. Başka bir süreç günlüğü birleştirmek için taşıdıysa sonraki
+    ekleme yeni günlüğü açar; hiçbir süreç eklemesi taşınmış günlükte
+    kaybolmaz. `save()` yine tüm veriyi yazar, kendi verdiği kayıtlar
+    kalır.
+
+    `changes()` son yüklemeden beri dosyalara yazılanları verir (bkz.
+    KnowledgeBase.reload): yalnızca günlüğe satır eklendiyse o satırlar
+    okunur; JSON bu depo dışında değiştiyse ya da günlük başka bir süreçte
+    birleştirildiyse kayıtlar baştan yüklenir. Deponun kendi birleştirmesi
+    yeniden yükleme gerektirmez.
+    """
+
+    def __init__(self, yol, sikistirma_esigi=500, ilerleme=None):
+        self.yol = yol
+        # JSON ayrıştırılırken çağrılır (bkz. json_kayitlari_oku)
+        self.ilerleme = ilerleme
+        taban = os.path.splitext(yol)[0]
+        self.gunluk_yolu = f"{taban}.journal.jsonl"
+        self.eski_gunluk_yolu = f"{taban}.journal.old.jsonl"
+        self.anlik_yolu = f"{taban}.snapshot.bin"
+        self.sikistirma_esigi = sikistirma_esigi
+        self._kilit = threading.Lock()
+        self._dosya_kilidi = FileLock(f"{taban}.lock")
+        self._dosya = None
+        self._satir_sayisi = 0
+        self._sikistirici = None
+        # changes() için: bilinen JSON kimliği, okunan günlüğün (inode, ofset)'i,
+        # kendi birleştirmemize taşınan günlükten henüz verilmemiş satırlar
+        self._izlenen_json = None
+        self._izlenen_gunluk = (None, 0)
+        self._bekleyen_satirlar = []
+        self._birlestirme_izleniyor = False
+
+    def load(self):
+        return list(self.load_records().values())
+
+    # Anahtar -> kayıt sözlüğü; KnowledgeBase anahtarları yeniden hesaplamaz
+    def load_records(self):
+        with self._dosya_kilidi:
+            # Önceki oturumdan kalan birleştirme varsa önce onu bitir
+            if os.path.exists(self.eski_gunluk_yolu):
+                self._birlestir()
+
+            kayitlar = self._anlik_kayitlari()
+            gunluk = gunluk_oku(self.gunluk_yolu, onar=True)
+            self._izlemeyi_sifirla()
+        self._satir_sayisi = len(gunluk)
+        return kayitlari_uygula(kayitlar, gunluk)
+
+    # Dosya kilidi tutulurken, dosyalar tamamen okunduktan sonra çağrılır
+    def _izlemeyi_sifirla(self):
+        self._izlenen_json = kaynak_kimligi(self.yol)
+        try:
+            durum = os.stat(self.gunluk_yolu)
+            self._izlenen_gunluk = (durum.st_ino, durum.st_size)
+        except FileNotFoundError:
+            self._izlenen_gunluk = (None, 0)
+        self._bekleyen_satirlar = []
+
+    def watch_paths(self):
+        return [self.yol, self.gunluk_yolu, self.eski_gunluk_yolu]
+
+    def changes(self):
+        """Son yükleme ya da çağrıdan beri yazılanlar
+
+        ("gunluk", günlük satırları), ("tam", anahtar -> kayıt) ya da
+        değişiklik yoksa None. Deponun kendi eklediği satırlar da gelir;
+        bellekteki kayıtla aynı olduklarından uygulanınca bir şey değişmez.
+        """
+        with self._kilit, self._dosya_kilidi:
+            ino, ofset = self._izlenen_gunluk
+            try:
+                durum = os.stat(self.gunluk_yolu)
+            except FileNotFoundError:
+                durum = None
+            if durum is None:
+                gunluk_degisti = ino is not None
+            else:
+                gunluk_degisti = ino is not None and (
+                    durum.st_ino != ino or durum.st_size < ofset)
+            if gunluk_degisti or kaynak_kimligi(self.yol) != self._izlenen_json:
+                return "tam", self.load_records()
+
+            satirlar, self._bekleyen_satirlar = self._bekleyen_satirlar, []
+            if durum is not None:
+                yeni, son = gunluk_kuyrugu(self.gunluk_yolu, ofset)
+                satirlar += yeni
+                self._izlenen_gunluk = (durum.st_ino, son)
+        return ("gunluk", satirlar) if satirlar else None
+
+    # İkili kopya JSON'un bu hâlinden yazıldıysa JSON hiç ayrıştırılmaz
+    def _anlik_kayitlari(self):
+        kimlik = kaynak_kimligi(self.yol)
+        anlik = anlik_oku(self.anlik_yolu)
+        if anlik is not None and anlik[0] == kimlik:
+            return anlik[1]
+
+        kayitlar = CompactRecords()
+        if kimlik[1] >= 0:
+            kayitlari_uygula(kayitlar, json_kayitlari_oku(self.yol, self.ilerleme))
+        self._anlik_yaz(kayitlar)
+        return kayitlar
+
+    # JSON yazıldıktan sonra çağrılır. İndeksler yeni kopyaya aynen taşınır;
+    # kayıtlarla farkları açılışta eşitlenir. Kopya yazılamazsa (salt okunur
+    # dizin, ayırıcı karakter içeren soru) JSON yolu kullanılmaya devam eder.
+    def _anlik_yaz(self, kayitlar):
+        try:
+            anlik_yaz(self.anlik_yolu, kayitlar, kaynak_kimligi(self.yol),
+                      anlik_indeksleri(self.anlik_yolu))
+        except OSError:
+            pass
+
+    # İkili kopyada yoksa ayrı önbellek dosyasına bakılır
+    def load_index(self, ad):
+        ham = anlik_indeksleri(self.anlik_yolu).get(ad)
+        if ham is None:
+            return indeks_yukle(self.yol, ad)
+        return _indeks_coz(ham, ad)
+
+    def save_index(self, ad, indeks):
+        self._sikistirmayi_bekle()
+        ham = _indeks_paketle(ad, indeks)
+        with self._kilit, self._dosya_kilidi:
+            if anlik_indeks_yaz(self.anlik_yolu, ad, ham):
+                return
+            self._anlik_kayitlari()
+            if not anlik_indeks_yaz(self.anlik_yolu, ad, ham):
+                indeks_kaydet(self.yol, ad, indeks)
+
+    def append(self, kayit):
+        self.append_many([kayit])
+
+    def delete(self, kayit):
+        self.append_many([{"soru": kayit["soru"], "silindi": True}])
+
+    # Kayıtları ve silme satırlarını ({"soru", "silindi": True}) tek fsync ile yazar
+    def append_many(self, veriler):
+        satirlar = "".join(json.dumps(veri, ensure_ascii=False) + "\n" for veri in veriler)
+        if not satirlar:
+            return
+        with self._kilit, self._dosya_kilidi:
+            self._gunlugu_ac()
+            self._dosya.write(satirlar)
+            self._dosya.flush()
+            os.fsync(self._dosya.fileno())
+            self._satir_sayisi += len(veriler)
+            if self._satir_sayisi >= self.sikistirma_esigi:
+                self._sikistirmayi_baslat()
+
+    # Dosya kilidi tutulurken çağrılır. Açık günlüğü başka bir süreç
+    # birleştirmek için taşıdıysa yerine gelen boş günlük açılır.
+    def _gunlugu_ac(self):
+        if self._dosya is not None:
+            try:
+                ayni = os.path.samestat(os.fstat(self._dosya.fileno()), os.stat(self.gunluk_yolu))
+            except FileNotFoundError:
+                ayni = False
+            if ayni:
+                return
+            self._dosyayi_kapat()
+            self._satir_sayisi = 0
+        self._dosya = open(self.gunluk_yolu, 'a', encoding='utf-8')
+
+    def compact(self):
+        with self._kilit, self._dosya_kilidi:
+            self._sikistirmayi_baslat()
+            sikistirici = self._sikistirici
+        sikistirici.join()
+
+    # Kayıtları mevcutlarla birleştirip tek seferde yazar ve birleşik eşlemeyi
+    # döndürür. Durum dosya kilidi altında yeniden okunduğundan diğer
+    # süreçlerin günlüğe eklediği kayıtlar kaybolmaz.
+    def import_records(self, kayitlar):
+        self._sikistirmayi_bekle()
+        with self._kilit, self._dosya_kilidi:
+            self._dosyayi_kapat()
+            birlesik = kayitlari_uygula(self.load_records(), kayitlar)
+            json_yaz(self.yol, {"sorular": list(birlesik.values())})
+            self._anlik_yaz(birlesik)
+            for yol in (self.gunluk_yolu, self.eski_gunluk_yolu):
+                if os.path.exists(yol):
+                    os.remove(yol)
+            self._satir_sayisi = 0
+            # Bellekteki kayıtlarda olmayanlar yazıldı; sonraki changes() baştan yükler
+            self._izlenen_json = None
+        return birlesik
+
+    # Tüm veriyi tek seferde yazar ve günlüğü sıfırlar
+    def save(self, veriler):
+        self._sikistirmayi_bekle()
+        with self._kilit, self._dosya_kilidi:
+            self._dosyayi_kapat()
+            json_yaz(self.yol, veriler)
+            self._anlik_yaz(kayitlari_uygula({}, veriler.get("sorular", [])))
+            for yol in (self.gunluk_yolu, self.eski_gunluk_yolu):
+                if os.path.exists(yol):
+                    os.remove(yol)
+            self._satir_sayisi = 0
+            self._izlenen_json = None
+
+    def close(self):
+        self._sikistirmayi_bekle()
+        with self._kilit:
+            self._dosyayi_kapat()
+        self._dosya_kilidi.close()
+
+    def _dosyayi_kapat(self):
+        if self._dosya is not None:
+            self._dosya.close()
+            self._dosya = None
+
+    def _sikistirmayi_bekle(self):
+        sikistirici = self._sikistirici
+        if sikistirici is not None:
+            sikistirici.join()
+
+    # Kilit ve dosya kilidi tutulurken çağrılır
+    def _sikistirmayi_baslat(self):
+        if self._sikistirici is not None and self._sikistirici.is_alive():
+            return
+
+        # Önceki birleştirme başarısız olduysa eski günlük yerinde kalır
+        if not os.path.exists(self.eski_gunluk_yolu):
+            self._dosyayi_kapat()
+            if os.path.exists(self.gunluk_yolu):
+                self._gunluk_kuyrugunu_ayir()
+                os.replace(self.gunluk_yolu, self.eski_gunluk_yolu)
+            self._satir_sayisi = 0
+
+        self._sikistirici = threading.Thread(target=self._birlestir, daemon=True)
+        self._sikistirici.start()
+
+    # Taşınacak günlük izlenen günlükse okunmamış satırları changes()'e
+    # ayrılır; birleştirmenin yazacağı JSON'daki her şey böylece bilinir
+    def _gunluk_kuyrugunu_ayir(self):
+        ino, ofset = self._izlenen_gunluk
+        self._birlestirme_izleniyor = ino in (None, os.stat(self.gunluk_yolu).st_ino)
+        if self._birlestirme_izleniyor:
+            self._bekleyen_satirlar += gunluk_kuyrugu(self.gunluk_yolu, ofset if ino else 0)[0]
+            self._izlenen_gunluk = (None, 0)
+
+    # Birleştirme süresince diğer süreçlerin eklemeleri bekler; eski günlüğü
+    # başka bir süreç birleştirdiyse yapacak iş kalmaz
+    def _birlestir(self):
+        with self._dosya_kilidi:
+            izleniyor, self._birlestirme_izleniyor = self._birlestirme_izleniyor, False
+            if not os.path.exists(self.eski_gunluk_yolu):
+                return
+
+            onceki = kaynak_kimligi(self.yol)
+            kayitlar = kayitlari_uygula(self._anlik_kayitlari(), gunluk_oku(self.eski_gunluk_yolu))
+            json_yaz(self.yol, {"sorular": list(kayitlar.values())})
+            self._anlik_yaz(kayitlar)
+            os.remove(self.eski_gunluk_yolu)
+            # JSON arada dışarıdan değişmediyse yeni hâli zaten bilinenlerdir
+            if izleniyor and onceki == self._izlenen_json:
+                self._izlenen_json = kaynak_kimligi(self.yol)
+
+
+class SplitRecords(MutableMapping):
+    """SplitStore kayıtlarına sözlük arayüzü; cevap her erişimde okunur"""
+
+    def __init__(self, depo):
+        self._depo = depo
+
+    def __getitem__(self, anahtar):
+        return self._depo._kayit(self._depo._konumlar[anahtar])
+
+    def __setitem__(self, anahtar, kayit):
+        self._depo._yaz(anahtar, kayit)
+
+    def __delitem__(self, anahtar):
+        self._depo._sil(anahtar)
+
+    def __iter__(self):
+        return iter(list(self._depo._konumlar))
+
+    def __len__(self):
+        return len(self._depo._konumlar)
+
+    def __contains__(self, anahtar):
+        return anahtar in self._depo._konumlar
+
+    # ttl'i olan kayıtlar; süpürücü diğer cevapları okumaz
+    def expiring(self):
+        return [self._depo._kayit(konum) for konum in list(self._depo._konumlar.values())
+                if konum[3] and "ttl" in konum[3]]
+
+
+class SplitStore:
+    """Sorular bellekte, cevaplar ayrı dosyada
+
+    `*.idx.jsonl` her kayıt için soruyu ve cevabın `*.cevap.bin`
+    içindeki bayt konumunu tutar. Cevaplar mmap üzerinden yalnızca
+    istendiğinde okunur, böylece bellekte kalan yer toplam cevap
+    metnine değil soru sayısına bağlıdır. İki dosyaya da yalnızca
+    ekleme yapılır; aynı anahtarın son satırı geçerlidir. Cevabın bayt
+    konumu dosya kilidi altında alındığından aynı depoya yazan süreçler
+    birbirinin cevabını ezmez. Kaydın ek alanları (kaynak, zaman, ttl)
+    dizin satırında durur.
+    """
+
+    UZANTI = '.idx.jsonl'
+
+    def __init__(self, yol):
+        self.yol = yol
+        taban = yol[:-len(self.UZANTI)] if yol.endswith(self.UZANTI) else yol
+        self.cevap_yolu = f"{taban}.cevap.bin"
+        self._kilit = threading.Lock()
+        self._dosya_kilidi = FileLock(f"{taban}.lock")
+        self._konumlar = {}
+        self._idx_dosyasi = None
+        self._cevap_dosyasi = None
+        self._okuma_dosyasi = None
+        self._mmap = None
+        self._yukle()
+
+    def _yukle(self):
+        for satir in gunluk_oku(self.yol, onar=True):
+            anahtar = soru_anahtari(satir["soru"])
+            if satir.get("silindi"):
+                self._konumlar.pop(anahtar, None)
+                continue
+            mevcut = self._konumlar.get(anahtar)
+            soru = mevcut[0] if mevcut else satir["soru"]
+            self._konumlar[anahtar] = (soru, satir["ofset"], satir["uzunluk"], kayit_ekleri(satir))
+
+    # (soru, ofset, uzunluk, ekler) -> kayıt
+    def _kayit(self, konum):
+        soru, ofset, uzunluk, ekler = konum
+        kayit = {"soru": soru, "cevap": self._cevap_oku(ofset, uzunluk)}
+        if ekler:
+            kayit.update(ekler)
+        return kayit
+
+    def records(self):
+        return SplitRecords(self)
+
+    def questions(self):
+        return [konum[0] for konum in self._konumlar.values()]
+
+    def index(self):
+        return NgramIndex(self.questions())
+
+    def load(self):
+        return list(self.records().values())
+
+    def append(self, kayit):
+        self._yaz(soru_anahtari(kayit["soru"]), kayit)
+
+    def delete(self, kayit):
+        anahtar = soru_anahtari(kayit["soru"])
+        if anahtar in self._konumlar:
+            self._sil(anahtar)
+
+    def import_records(self, kayitlar):
+        for kayit in kayitlar:
+            anahtar = soru_anahtari(kayit["soru"])
+            mevcut = self._konumlar.get(anahtar)
+            if mevcut:
+                kayit = dict(kayit, soru=mevcut[0])
+            self._yaz(anahtar, kayit, senkron=False)
+        with self._kilit:
+            self._senkronla()
+
+    def save(self, veriler):
+        with self._kilit, self._dosya_kilidi:
+            self._kapat()
+            for yol in (self.yol, self.cevap_yolu):
+                if os.path.exists(yol):
+                    os.remove(yol)
+            self._konumlar = {}
+        self.import_records(veriler.get("sorular", []))
+
+    def close(self):
+        with self._kilit:
+            self._kapat()
+        self._dosya_kilidi.close()
+
+    def _yaz(self, anahtar, kayit, senkron=True):
+        veri = kayit["cevap"].encode('utf-8')
+        with self._kilit, self._dosya_kilidi:
+            if self._cevap_dosyasi is None:
+                self._cevap_dosyasi = open(self.cevap_yolu, 'ab')
+                self._idx_dosyasi = open(self.yol, 'a', encoding='utf-8')
+
+            # Önce cevap yazılır; dizin satırı yarım kalırsa cevap yalnızca yetim kalır
+            ofset = self._cevap_dosyasi.seek(0, os.SEEK_END)
+            self._cevap_dosyasi.write(veri)
+            ekler = kayit_ekleri(kayit)
+            satir = {"soru": kayit["soru"], "ofset": ofset, "uzunluk": len(veri), **(ekler or {})}
+            self._idx_dosyasi.write(json.dumps(satir, ensure_ascii=False) + "\n")
+            if senkron:
+                self._senkronla()
+            self._konumlar[anahtar] = (kayit["soru"], ofset, len(veri), ekler)
+
+    def _sil(self, anahtar):
+        with self._kilit, self._dosya_kilidi:
+            soru = self._konumlar.pop(anahtar)[0]
+            if self._idx_dosyasi is None:
+                self._cevap_dosyasi = open(self.cevap_yolu, 'ab')
+                self._idx_dosyasi = open(self.yol, 'a', encoding='utf-8')
+            satir = {"soru": soru, "silindi": True}
+            self._idx_dosyasi.write(json.dumps(satir, ensure_ascii=False) + "\n")
+            self._senkronla()
+
+    # Kilit tutulurken çağrılır
+    def _senkronla(self):
+        for dosya in (self._cevap_dosyasi, self._idx_dosyasi):
+            if dosya is not None:
+                dosya.flush()
+                os.fsync(dosya.fileno())
+
+    def _cevap_oku(self, ofset, uzunluk):
+        if uzunluk == 0:
+            return ""
+        eslem = self._mmap
+        if eslem is None or ofset + uzunluk > len(eslem):
+            # Dosya büyüdüyse eşlem yenilenir; eskisini okuyan iş parçacıkları
+            # olabileceğinden kapatılmaz, son başvuru bırakılınca kapanır
+            with self._kilit:
+                eslem = self._mmap
+                if eslem is None or ofset + uzunluk > len(eslem):
+                    self._senkronla()
+                    if self._okuma_dosyasi is None:
+                        self._okuma_dosyasi = open(self.cevap_yolu, 'rb')
+                    eslem = self._mmap = mmap.mmap(
+                        self._okuma_dosyasi.fileno(), 0, access=mmap.ACCESS_READ)
+        return eslem[ofset:ofset + uzunluk].decode('utf-8')
+
+    # Kilit tutulurken çağrılır
+    def _kapat(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        for dosya in (self._okuma_dosyasi, self._cevap_dosyasi, self._idx_dosyasi):
+            if dosya is not None:
+                dosya.close()
+        self._okuma_dosyasi = self._cevap_dosyasi = self._idx_dosyasi = None
+
+
+SQLITE_UZANTILARI = ('.db', '.sqlite', '.sqlite3')
+
+# Parçalı deponun parça listesi (bkz. yz_shard.ShardedStore)
+PARCALI_UZANTI = '.shards.json'
+
+
+# Dosya uzantısına göre depo seçer; `ilerleme` JSON deposunun yüklemesini izler,
+# `parca` yeni oluşturulan parçalı deponun parça sayısıdır
+def depo_ac(yol, ilerleme=None, parca=None):
+    if yol.lower().endswith(SQLITE_UZANTILARI):
+        from yz_sqlite import SqliteStore
+        return SqliteStore(yol)
+    if yol.endswith(SplitStore.UZANTI):
+        return SplitStore(yol)
+    if yol.endswith(PARCALI_UZANTI):
+        from yz_shard import ShardedStore
+        return ShardedStore(yol, parca, ilerleme)
+    return JournalStore(yol, ilerleme=ilerleme)
+
+
+# Bir depodaki kayıtları başka biçimdeki bir depoya aktarır
+def depo_tasi(kaynak_yolu, hedef_yolu, parca=None):
+    kaynak = depo_ac(kaynak_yolu)
+    hedef = depo_ac(hedef_yolu, parca=parca)
+    try:
+        if not hasattr(hedef, "import_records"):
+            raise ValueError(f"{hedef_yolu} biçimine aktarım desteklenmiyor")
+        # JournalStore birleşik eşlemeyi döndürür; diğerleri kayıtlarını diskte sorgular
+        birlesik = hedef.import_records(kaynak.load())
+        return len(hedef.records() if birlesik is None else birlesik)
+    finally:
+        kaynak.close()
+        hedef.close()
+
+
+INDEKS_SURUMU = 3
+
+
+# Eşleştirici indeksinin veritabanı yanındaki önbellek dosyası
+def indeks_yolu(yol, ad):
+    return f"{os.path.splitext(yol)[0]}.{ad}.indeks.pickle"
+
+
+def _indeks_paketle(ad, indeks):
+    return pickle.dumps({"surum": INDEKS_SURUMU, "ad": ad, "indeks": indeks},
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# Yalnızca bu modülün yazdığı yerel önbellek okunur; bozuksa yok sayılır
+def _indeks_coz(ham, ad):
+    try:
+        veri = pickle.loads(ham)
+    except (EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+    if not isinstance(veri, dict) or veri.get("surum") != INDEKS_SURUMU or veri.get("ad") != ad:
+        return None
+    return veri["indeks"]
+
+
+def indeks_kaydet(yol, ad, indeks):
+    hedef = indeks_yolu(yol, ad)
+    gecici = f"{hedef}.tmp"
+    with open(gecici, 'wb') as dosya:
+        dosya.write(_indeks_paketle(ad, indeks))
+    os.replace(gecici, hedef)
+
+
+def indeks_yukle(yol, ad):
+    try:
+        with open(indeks_yolu(yol, ad), 'rb') as dosya:
+            ham = dosya.read()
+    except OSError:
+        return None
+    return _indeks_coz(ham, ad)
+
+
+# Yakın kopya ayıklamada (bkz. yz_dedup) birleştirilen soruların tablosu
+def takma_ad_yolu(yol):
+    return f"{os.path.splitext(yol)[0]}.alias.json"
+
+
+# Takma ad sorusu -> kanonik soru; tablo yoksa boş
+def takma_adlari_oku(yol):
+    try:
+        with open(takma_ad_yolu(yol), encoding='utf-8') as dosya:
+            return json.load(dosya).get("takma_adlar", {})
+    except FileNotFoundError:
+        return {}
+
+
+# Ayıklamada cevabı kanoniğinkinden farklı olup atılan yazımlar: takma ad -> cevap
+def atilan_cevaplari_oku(yol):
+    try:
+        with open(takma_ad_yolu(yol), encoding='utf-8') as dosya:
+            return json.load(dosya).get("atilan_cevaplar", {})
+    except FileNotFoundError:
+        return {}
+
+
+def takma_adlari_yaz(yol, takma_adlar, atilan_cevaplar=None):
+    veri = {"takma_adlar": takma_adlar}
+    if atilan_cevaplar:
+        veri["atilan_cevaplar"] = atilan_cevaplar
+    json_yaz(takma_ad_yolu(yol), veri)
+
+
+# Depoyu ve bilgi tabanını açar; bellekteki indeks önbellekten alınır,
+# böylece yeniden başlatmada yalnızca son kayıttan beri değişenler işlenir.
+# `eszamanli` ise birden çok iş parçacığının paylaşabileceği ConcurrentKnowledgeBase döner.
+# `parca` 1'den büyükse eşleştirici o kadar parçaya bölünür ve sorgu parçalara `havuz`
+# üzerinden dağıtılır (bkz. yz_shard.ShardedIndex); parçalı depoda varsayılanı deponun parça sayısıdır.
+# Parçalanamayan eşleştiriciler (tfidf, lsh) parçalı depoda da tek indeks kullanır.
+def bilgi_tabani_ac(yol, eslestirici=None, ilerleme=None, eszamanli=False, parca=None,
+                    havuz="thread"):
+    sinif = ConcurrentKnowledgeBase if eszamanli else KnowledgeBase
+    depo = depo_ac(yol, ilerleme)
+    if parca is None:
+        parca = getattr(depo, "parca_sayisi", None)
+    if eslestirici is None and getattr(depo, "kalici_indeks", False):
+        bilgi = sinif.open(depo)
+    else:
+        ad = eslestirici or "ngram"
+        if parca and parca > 1:
+            from yz_shard import parcali_indeks
+            bos_indeks = parcali_indeks(ad, parca, havuz)
+        else:
+            bos_indeks = eslestirici_olustur(ad)
+        ad = eslestirici_adi(bos_indeks)
+        # Kendi indeks saklama yeri olan depo (JournalStore) önce gelir
+        if hasattr(depo, "load_index"):
+            indeks = depo.load_index(ad)
+        else:
+            indeks = indeks_yukle(yol, ad)
+        if indeks is None:
+            indeks = bos_indeks
+        elif hasattr(indeks, "havuz"):
+            indeks.havuz = havuz
+        bilgi = sinif.open(depo, index=indeks)
+    bilgi.set_aliases(takma_adlari_oku(yol))
+    return depo, bilgi
+
+
+def bilgi_tabani_kapat(yol, depo, bilgi):
+    # Kuyruktaki öğretmeler indeks kaydedilmeden yazılır
+    if hasattr(bilgi, "close"):
+        bilgi.close()
+    ad = eslestirici_adi(bilgi.indeks)
+    if ad is not None:
+        if hasattr(depo, "save_index"):
+            depo.save_index(ad, bilgi.indeks)
+        else:
+            indeks_kaydet(yol, ad, bilgi.indeks)
+    # Parçalı indeksin havuzları
+    if hasattr(bilgi.indeks, "close"):
+        bilgi.indeks.close()
+    depo.close()
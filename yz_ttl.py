@@ -0,0 +1,113 @@
+"""
+ChatCPT kayıt ömrü
+Kayıtların kaynak, oluşturulma zamanı ve ömür (TTL) alanları; başarısız
+cevaplar için kısa ömür ve süresi dolanları silen süpürücü
+"""
+
+import threading
+import time
+
+# soru ve cevap dışında kayıtta saklanan alanlar: kaynak (kim öğretti),
+# zaman (oluşturulma, epoch saniye), ttl (saniye; yoksa kayıt süresizdir)
+EK_ALANLAR = ("kaynak", "zaman", "ttl")
+
+# Bilgi tabanına cevap diye yazılmış hata metinleri
+BASARISIZ_CEVAPLAR = (
+    "Gemini API cevabı alınamadı.",
+    "Üzgünüm, cevap oluşturamadım.",
+)
+
+NEGATIF_TTL = 300
+
+
+# Kaydın ek alanları; yoksa None
+def kayit_ekleri(kayit):
+    ekler = {alan: kayit[alan] for alan in EK_ALANLAR if kayit.get(alan) is not None}
+    return ekler or None
+
+
+class NegativeCache:
+    """Başarısız cevaplar için kısa ömür
+
+    Hata metni taşıyan cevap (bkz. BASARISIZ_CEVAPLAR) kendi ttl'i yoksa
+    oluşturulmasından `ttl` saniye sonra geçersizdir; böylece bir sonraki
+    deneme doğru cevabı öğretebilir. Zamanı bilinmeyen eski kayıtlarda
+    süre çoktan dolmuş sayılır.
+    """
+
+    def __init__(self, cevaplar=BASARISIZ_CEVAPLAR, ttl=NEGATIF_TTL):
+        self.cevaplar = frozenset(cevap.strip() for cevap in cevaplar)
+        self.ttl = ttl
+        # Daha uzun cevapta strip() ile kopya çıkarılmaz
+        self._azami = max(map(len, self.cevaplar), default=0)
+
+    def is_failure(self, cevap):
+        return len(cevap) <= self._azami + 16 and cevap.strip() in self.cevaplar
+
+    # Yeni kaydın ömrü: verilen ttl, yoksa başarısız cevapsa kısa ömür
+    def ttl_of(self, cevap, ttl=None):
+        if ttl is None and self.is_failure(cevap):
+            return self.ttl
+        return ttl
+
+
+def kayit_bitisi(kayit, negatif=None):
+    """Kaydın geçersizleştiği an (epoch saniye); süresizse None"""
+    ttl = kayit.get("ttl")
+    if ttl is None and negatif is not None and negatif.is_failure(kayit["cevap"]):
+        ttl = negatif.ttl
+    if ttl is None:
+        return None
+    return (kayit.get("zaman") or 0) + ttl
+
+
+def suresi_doldu(kayit, simdi, negatif=None):
+    bitis = kayit_bitisi(kayit, negatif)
+    return bitis is not None and bitis <= simdi
+
+
+class Sweeper:
+    """Süresi dolan kayıtları `aralik` saniyede bir silen arka plan iş parçacığı
+
+    Bilgi tabanı ConcurrentKnowledgeBase olmalıdır; silmeler onun yazıcı
+    kuyruğundan geçer, sorgular beklemez. İlk tur tüm kayıtlara bakar
+    (zamanı bilinmeyen başarısız cevaplar için); sonraki turlar yalnızca
+    ttl'i olan kayıtlara. Bir turdaki hata sonrakileri durdurmaz, `hata`
+    özelliğinde kalır.
+    """
+
+    def __init__(self, bilgi, aralik=60.0):
+        self.bilgi = bilgi
+        self.aralik = aralik
+        self.silinen = 0
+        self.hata = None
+        self._dur = threading.Event()
+        self._is_parcacigi = None
+
+    def start(self):
+        if self._is_parcacigi is None:
+            self._is_parcacigi = threading.Thread(target=self._calis, daemon=True,
+                                                  name="yz-supurucu")
+            self._is_parcacigi.start()
+        return self
+
+    def _calis(self):
+        tam = True
+        while not self._dur.is_set():
+            try:
+                self.silinen += self.bilgi.sweep(time.time(), tam)
+                tam = False
+            except Exception as hata:
+                self.hata = hata
+            self._dur.wait(self.aralik)
+
+    def stop(self):
+        self._dur.set()
+        if self._is_parcacigi is not None:
+            self._is_parcacigi.join()
+            self._is_parcacigi = None
+
+
+# Aralık 0 ya da boşsa süpürücü başlatılmaz
+def supurucu_baslat(bilgi, aralik):
+    return Sweeper(bilgi, aralik).start() if aralik else None
@@ -0,0 +1,508 @@
+"""
+ChatCPT vektör tabanlı eşleştiriciler
+TfidfIndex NumPy ve SciPy, LshIndex yalnızca NumPy gerektirir (pip install numpy scipy)
+"""
+
+import hashlib
+import heapq
+import math
+import threading
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+from yz_index import en_iyiler, normalle
+
+
+def _bagimliliklari_denetle(scipy_gerekli=True):
+    if np is None or (scipy_gerekli and sparse is None):
+        paketler = "numpy ve scipy" if scipy_gerekli else "numpy"
+        raise ImportError(f"Bu eşleştirici için {paketler} gerekli: pip install {paketler.replace(' ve ', ' ')}")
+
+
+def _gram_sayimi(metin, n):
+    dolgu = " " * (n - 1)
+    dolgulu = f"{dolgu}{metin}{dolgu}"
+    return Counter(dolgulu[i:i + n] for i in range(len(dolgulu) - n + 1))
+
+
+# Satırları birim uzunluğa getirir; boş satırlar sıfır kalır
+def _satir_normalle(matris):
+    normlar = np.sqrt(np.asarray(matris.multiply(matris).sum(axis=1)).ravel())
+    normlar[normlar == 0] = 1.0
+    return sparse.diags(1.0 / normlar) @ matris
+
+
+class TfidfIndex:
+    """Karakter n-gram TF-IDF matrisi üzerinde toplu kosinüs puanlama
+
+    Sorular bir kez seyrek TF-IDF matrisine dönüştürülür; bir grup
+    sorgu tek bir seyrek matris çarpımıyla tüm sorulara karşı puanlanır.
+    Varsayılan olarak kosinüse göre en iyi `aday_limiti` soru
+    normalleştirilmiş metin üzerinden difflib oranıyla yeniden
+    puanlanır, böylece skorlar ve `cutoff` diğer eşleştiricilerle aynı
+    anlamı taşır.
+    `yeniden_puanla=False` ile kosinüs skoru doğrudan döner ve `cutoff`
+    kosinüs eşiği olarak uygulanır.
+
+    Matris toplu eklemelerin ardından `hazirla()` ile tek seferde kurulur
+    (KnowledgeBase açılışta çağırır); kurulmamışsa ilk sorgu kurar.
+    Sonradan eklenen her soru tek satırlık bir blok olur ve eşit boydaki
+    bloklar ikili sayaç gibi birleştirilir; blokların toplamı ana bloğu
+    geçince (ya da silinenler canlıları geçince) matris IDF yeniden
+    hesaplanarak baştan kurulur. Aradaki eklemeler son kurulumdaki IDF'yi
+    kullanır, yeni n-gram'lar en nadir terim sayılır. Matris ve IDF
+    yalnızca add/remove ve hazirla'da değişir; sorgular yalnızca okur,
+    bu yüzden okuma kilidini paylaşan sorgular (ConcurrentKnowledgeBase)
+    birbirini bozmaz.
+    """
+
+    def __init__(self, sorular=(), n=3, aday_limiti=16, yeniden_puanla=True, parca=256):
+        _bagimliliklari_denetle()
+        self.n = n
+        self.aday_limiti = aday_limiti
+        self.yeniden_puanla = yeniden_puanla
+        # Bir çarpımda puanlanan sorgu sayısı; sonuç matrisinin boyutunu sınırlar
+        self.parca = parca
+        self.sorular = []
+        self.normaller = []
+        self._idler = {}
+        self._sozluk = {}
+        self._df = array('q')
+        # CSR biçiminde ham terim sayıları: sütunlar, sayılar, satır başları
+        self._sutunlar = array('q')
+        self._sayilar = array('f')
+        self._isaretci = array('q', [0])
+        # (ilk satır, son satır, (sözlük × satır) matris) blokları
+        self._bloklar = []
+        self._idf = None
+        self._yeni_idf = 1.0
+        self._silinen = 0
+        self._kurulum_kilidi = threading.Lock()
+        for soru in sorular:
+            self.add(soru)
+
+    # Kilit önbelleğe yazılmaz
+    def __getstate__(self):
+        durum = self.__dict__.copy()
+        del durum["_kurulum_kilidi"]
+        return durum
+
+    def __setstate__(self, durum):
+        self.__dict__.update(durum)
+        self._kurulum_kilidi = threading.Lock()
+
+    def __len__(self):
+        return len(self._idler)
+
+    def __contains__(self, soru):
+        return soru in self._idler
+
+    def __iter__(self):
+        return iter(list(self._idler))
+
+    # Skorlar difflib oranı mı (bkz. KnowledgeBase önbelleği)
+    @property
+    def difflib_skoru(self):
+        return self.yeniden_puanla
+
+    def add(self, soru, normal=None):
+        if soru in self._idler:
+            return
+        self._idler[soru] = len(self.sorular)
+        if normal is None:
+            normal = normalle(soru)
+        self.sorular.append(soru)
+        self.normaller.append(normal)
+
+        for gram, adet in _gram_sayimi(normal, self.n).items():
+            sutun = self._sozluk.get(gram)
+            if sutun is None:
+                sutun = self._sozluk[gram] = len(self._df)
+                self._df.append(0)
+            self._df[sutun] += 1
+            self._sutunlar.append(sutun)
+            self._sayilar.append(adet)
+        self._isaretci.append(len(self._sutunlar))
+
+        # Matris henüz kurulmadıysa hazirla() tek seferde kurar
+        if self._idf is not None:
+            # Son kurulumdan beri sözlüğe giren n-gram'lara en nadir terimin ağırlığı verilir
+            eksik = len(self._df) - len(self._idf)
+            if eksik > 0:
+                ek = np.full(max(eksik, len(self._idf)), self._yeni_idf)
+                self._idf = np.concatenate([self._idf, ek])
+            satir = len(self.sorular) - 1
+            self._bloklar.append((satir, satir + 1, self._blok_kur(satir, satir + 1)))
+            self._bloklari_birlestir()
+
+    def remove(self, soru):
+        soru_id = self._idler.pop(soru, None)
+        if soru_id is None:
+            return
+        self.sorular[soru_id] = None
+        self.normaller[soru_id] = None
+        self._silinen += 1
+        for sutun in self._sutunlar[self._isaretci[soru_id]:self._isaretci[soru_id + 1]]:
+            self._df[sutun] -= 1
+        if self._silinen > len(self._idler):
+            self._sikistir()
+            if self._idf is not None:
+                self._tam_kur()
+
+    def _bloklari_birlestir(self):
+        while len(self._bloklar) >= 2:
+            (bas1, son1, _), (bas2, son2, _) = self._bloklar[-2:]
+            if son1 - bas1 > son2 - bas2:
+                return
+            if len(self._bloklar) == 2:
+                self._tam_kur()
+                return
+            self._bloklar[-2:] = [(bas1, son2, self._blok_kur(bas1, son2))]
+
+    # Silinen satırları ham dizilerden atar, kimlikleri yeniden sıralar
+    def _sikistir(self):
+        sutunlar, sayilar, isaretci = array('q'), array('f'), array('q', [0])
+        canlilar, normaller = [], []
+        for soru_id, soru in enumerate(self.sorular):
+            if soru is None:
+                continue
+            bas, son = self._isaretci[soru_id], self._isaretci[soru_id + 1]
+            sutunlar.extend(self._sutunlar[bas:son])
+            sayilar.extend(self._sayilar[bas:son])
+            isaretci.append(len(sutunlar))
+            canlilar.append(soru)
+            normaller.append(self.normaller[soru_id])
+        self._sutunlar, self._sayilar, self._isaretci = sutunlar, sayilar, isaretci
+        self.sorular = canlilar
+        self.normaller = normaller
+        self._idler = {soru: i for i, soru in enumerate(canlilar)}
+        self._silinen = 0
+
+    # Matris kurulmamışsa kurar. Aynı anda sorgulayanlar için kilitlidir;
+    # IDF en son atanır, onu gören sorgu blokları da hazır bulur.
+    def hazirla(self):
+        if self._idf is not None:
+            return
+        with self._kurulum_kilidi:
+            if self._idf is None:
+                self._tam_kur()
+
+    def _tam_kur(self):
+        belge = len(self.sorular)
+        df = np.array(self._df, dtype=np.float64)
+        idf = np.log((1 + belge) / (1 + df)) + 1
+        self._yeni_idf = np.log((1 + belge) / 2) + 1
+        self._bloklar = [(0, belge, self._blok_kur(0, belge, idf))] if belge else []
+        self._idf = idf
+
+    def _blok_kur(self, bas, son, idf=None):
+        idf = self._idf if idf is None else idf
+        ilk, sonuncu = self._isaretci[bas], self._isaretci[son]
+        sutunlar = np.array(self._sutunlar[ilk:sonuncu], dtype=np.int64)
+        tf = 1 + np.log(np.array(self._sayilar[ilk:sonuncu], dtype=np.float64))
+        isaretci = np.array(self._isaretci[bas:son + 1], dtype=np.int64) - ilk
+        matris = sparse.csr_matrix(
+            (tf * idf[sutunlar], sutunlar, isaretci),
+            shape=(son - bas, len(self._df)),
+        )
+        # Q @ D.T çarpımı için devrik tutulur
+        return _satir_normalle(matris).T.tocsc()
+
+    def _vektorle(self, normaller):
+        sutunlar, veriler, isaretci = [], [], [0]
+        for normal in normaller:
+            for gram, adet in _gram_sayimi(normal, self.n).items():
+                sutun = self._sozluk.get(gram)
+                if sutun is not None:
+                    sutunlar.append(sutun)
+                    veriler.append(1 + math.log(adet))
+            isaretci.append(len(sutunlar))
+
+        sutunlar = np.asarray(sutunlar, dtype=np.int64)
+        veriler = np.asarray(veriler, dtype=np.float64) * self._idf[sutunlar]
+        matris = sparse.csr_matrix(
+            (veriler, sutunlar, isaretci), shape=(len(normaller), len(self._df))
+        )
+        return _satir_normalle(matris)
+
+    # Her normalleştirilmiş sorgu için kosinüse göre en iyi `limit` canlı soru
+    # (id, skor), skor azalan
+    def _kosinus_adaylari(self, normaller, limit):
+        self.hazirla()
+
+        # Silinmiş satırlar elendikten sonra da yeterli aday kalsın
+        secim = limit + min(self._silinen, limit)
+        for bas in range(0, len(normaller), self.parca):
+            grup = normaller[bas:bas + self.parca]
+            sorgu = self._vektorle(grup)
+            skorlar = sparse.hstack(
+                [sorgu[:, :matris.shape[0]] @ matris for _, _, matris in self._bloklar],
+                format='csr',
+            )
+            for i in range(len(grup)):
+                bas_i, son_i = skorlar.indptr[i], skorlar.indptr[i + 1]
+                veri = skorlar.data[bas_i:son_i]
+                idler = skorlar.indices[bas_i:son_i]
+                if len(veri) > secim:
+                    secilen = np.argpartition(-veri, secim)[:secim]
+                    veri, idler = veri[secilen], idler[secilen]
+                sira = np.argsort(-veri, kind='stable')
+                adaylar = [(int(idler[j]), float(veri[j])) for j in sira]
+                if self._silinen:
+                    adaylar = [a for a in adaylar if self.sorular[a[0]] is not None]
+                yield adaylar[:limit]
+
+    def top_k_many(self, sorular, k=3, cutoff=0.6):
+        if not self._idler:
+            return [[] for _ in sorular]
+
+        normaller = [normalle(soru) for soru in sorular]
+        sonuclar = []
+        if self.yeniden_puanla:
+            adaylar = self._kosinus_adaylari(normaller, self.aday_limiti)
+            for normal, grup in zip(normaller, adaylar):
+                grup = [(self.normaller[i], self.sorular[i]) for i, _ in grup]
+                sonuclar.append(en_iyiler(normal, grup, k, cutoff))
+        else:
+            for grup in self._kosinus_adaylari(normaller, k):
+                sonuclar.append([(self.sorular[i], skor) for i, skor in grup if skor >= cutoff])
+        return sonuclar
+
+    def best_many(self, sorular, cutoff=0.6):
+        return [sonuc[0][0] if sonuc else None for sonuc in self.top_k_many(sorular, 1, cutoff)]
+
+    def candidates(self, soru):
+        if not self._idler:
+            return []
+        grup = next(self._kosinus_adaylari([normalle(soru)], self.aday_limiti))
+        return [self.sorular[i] for i, _ in grup]
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        return self.top_k_many([soru], k, cutoff)[0]
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
+
+
+# Soru kalıplarında sık geçen, anlamı taşımayan kelimeler (normalleştirilmiş)
+DURAK_KELIMELER = frozenset((
+    "bana", "beni", "bir", "bu", "da", "de", "hakkinda", "icin", "ile", "mi", "mu",
+    "misin", "musun", "ne", "nedir", "nelerdir", "nasil", "soyle", "ve", "ver", "versene",
+))
+
+
+# Kelime, kelimenin ilk harfleri (Türkçe eklerden arınmış kök yaklaşığı) ve
+# kelime içi karakter 3-gram'ları. Bir kelimenin 3-gram'ları toplamda
+# `gram_agirligi` kelime ağırlığındadır; yazım hatası tek kelimeyi bozsa da
+# 3-gram'ların çoğu kalır.
+def ozellikler(normal, kok_boyu=4, durak_agirligi=0.2, gram_agirligi=3.0):
+    sayim = Counter()
+    for kelime in normal.split():
+        agirlik = durak_agirligi if kelime in DURAK_KELIMELER else 1.0
+        sayim["k:" + kelime] += agirlik
+        if len(kelime) >= kok_boyu:
+            sayim["o:" + kelime[:kok_boyu]] += agirlik
+        sinirli = f"<{kelime}>"
+        gramlar = [sinirli[i:i + 3] for i in range(len(sinirli) - 2)]
+        agirlik *= gram_agirligi / math.sqrt(len(gramlar))
+        for gram in gramlar:
+            sayim["g:" + gram] += agirlik
+    return sayim
+
+
+# Özelliğin kararlı özeti: ilk 4 bayt boyut, kalanı izdüşüm işaretleri.
+# hash() süreçten sürece değiştiği için indeks önbelleğe alınamazdı.
+@lru_cache(maxsize=1 << 16)
+def _ozet(ozellik, bayt):
+    return hashlib.blake2b(ozellik.encode("utf-8", "surrogatepass"), digest_size=bayt).digest()
+
+
+class LshIndex:
+    """Kelime ve alt kelime özelliklerinden rastgele izdüşümlü LSH indeksi
+
+    Her soru, özellikleri (bkz. ozellikler) 32 bitlik boyutlara
+    özetlenerek seyrek ve birim uzunlukta bir vektöre dönüşür (hashing
+    vectorizer); sözlük ya da indirilen model yoktur. İzdüşüm işaretleri
+    de aynı özetten gelir (SimHash), bu yüzden izdüşüm matrisi
+    tutulmaz. `tablo` tablonun her birinde `bit` işaretten oluşan kova
+    anahtarı vardır; sorgu her tabloda kendi kovasına ve en kararsız
+    `yoklama` işareti çevrilmiş komşu kovalara bakar.
+
+    Kovalarda bulunan adaylar gerçek kosinüse göre sıralanır; skor ve
+    `cutoff` kosinüstür. Ayrımı kelime ve kökler yaptığından "Bana GameLoop
+    için ayar ver", harfleri daha çok örtüşen "Bana PUBG için ayar ver"
+    yerine "GameLoop ayarları nelerdir" ile eşleşir. Yazım hatalarını
+    3-gram'lar kısmen karşılar; hata ağırlıklı girdide difflib
+    eşleştiricileri daha isabetlidir.
+
+    Silinen soru kovalarda kalır ve aramada elenir; silinenler
+    canlıları geçince indeks baştan kurulur.
+    """
+
+    def __init__(self, sorular=(), tablo=24, bit=8, yoklama=3, aday_limiti=64):
+        _bagimliliklari_denetle(scipy_gerekli=False)
+        self.tablo = tablo
+        self.bit = bit
+        self.yoklama = yoklama
+        self.aday_limiti = aday_limiti
+        self._ozet_boyu = 4 + (tablo * bit + 7) // 8
+        self._sifirla()
+        for soru in sorular:
+            self.add(soru)
+
+    def _sifirla(self):
+        self.sorular = []
+        self.normaller = []
+        self._idler = {}
+        # CSR biçiminde birim vektörler: boyutlar, değerler, satır başları
+        self._boyutlar = array('I')
+        self._degerler = array('f')
+        self._isaretci = array('q', [0])
+        self._kovalar = [{} for _ in range(self.tablo)]
+        self._silinen = 0
+
+    def __len__(self):
+        return len(self._idler)
+
+    def __contains__(self, soru):
+        return soru in self._idler
+
+    def __iter__(self):
+        return iter(list(self._idler))
+
+    # Kosinüs skoru yeni soruların difflib ile önceden elenmesine izin vermez
+    difflib_skoru = False
+
+    # (sıralı boyutlar, birim değerler, izdüşümler)
+    def _vektorle(self, normal):
+        sayim = ozellikler(normal)
+        if not sayim:
+            return None
+        ozetler = b"".join(_ozet(ozellik, self._ozet_boyu) for ozellik in sayim)
+        ozetler = np.frombuffer(ozetler, dtype=np.uint8).reshape(len(sayim), self._ozet_boyu)
+        boyutlar = ozetler[:, :4].copy().view('<u4').ravel()
+        degerler = np.fromiter(sayim.values(), dtype=np.float64, count=len(sayim))
+        degerler /= np.linalg.norm(degerler)
+
+        isaretler = np.unpackbits(ozetler[:, 4:], axis=1)[:, :self.tablo * self.bit]
+        izdusum = degerler @ (isaretler.astype(np.float64) * 2 - 1)
+
+        # Aynı boyuta düşen özellikler birleştirilir
+        sira = np.argsort(boyutlar, kind='stable')
+        boyutlar, degerler = boyutlar[sira], degerler[sira]
+        tekil, ilk = np.unique(boyutlar, return_index=True)
+        if len(tekil) < len(boyutlar):
+            degerler = np.add.reduceat(degerler, ilk)
+            boyutlar = tekil
+        return boyutlar, degerler, izdusum
+
+    def _anahtarlar(self, izdusum):
+        bitler = (izdusum > 0).reshape(self.tablo, self.bit).astype(np.int64)
+        return bitler @ (1 << np.arange(self.bit, dtype=np.int64))
+
+    def add(self, soru, normal=None):
+        if soru in self._idler:
+            return
+        soru_id = len(self.sorular)
+        if normal is None:
+            normal = normalle(soru)
+        self.sorular.append(soru)
+        self.normaller.append(normal)
+        self._idler[soru] = soru_id
+
+        vektor = self._vektorle(normal)
+        if vektor is not None:
+            boyutlar, degerler, izdusum = vektor
+            self._boyutlar.extend(boyutlar.tolist())
+            self._degerler.extend(degerler.tolist())
+            for kovalar, anahtar in zip(self._kovalar, self._anahtarlar(izdusum).tolist()):
+                kovalar.setdefault(anahtar, []).append(soru_id)
+        self._isaretci.append(len(self._boyutlar))
+
+    def remove(self, soru):
+        soru_id = self._idler.pop(soru, None)
+        if soru_id is None:
+            return
+        self.sorular[soru_id] = None
+        self.normaller[soru_id] = None
+        self._silinen += 1
+        if self._silinen > len(self._idler):
+            canlilar = list(self._idler)
+            self._sifirla()
+            for canli in canlilar:
+                self.add(canli)
+
+    # Her tabloda asıl kova ve en küçük |izdüşüm| işaretleri çevrilmiş komşuları
+    def _kova_adaylari(self, izdusum):
+        anahtarlar = self._anahtarlar(izdusum).tolist()
+        guven = np.abs(izdusum).reshape(self.tablo, self.bit)
+        kararsizlar = np.argsort(guven, axis=1)[:, :self.yoklama].tolist()
+        adaylar = set()
+        for kovalar, anahtar, bitler in zip(self._kovalar, anahtarlar, kararsizlar):
+            for komsu in [anahtar] + [anahtar ^ (1 << b) for b in bitler]:
+                adaylar.update(kovalar.get(komsu, ()))
+        return adaylar
+
+    # Normalleştirilmiş sorgu için kosinüse göre en iyi canlı sorular: (id, kosinüs)
+    def _kosinus_adaylari(self, normal):
+        vektor = self._vektorle(normal)
+        if vektor is None or not self._idler:
+            return []
+        boyutlar, degerler, izdusum = vektor
+        idler = [i for i in self._kova_adaylari(izdusum) if self.sorular[i] is not None]
+        if not idler:
+            return []
+
+        # Adayların vektörleri tek dizide toplanır, sorguyla ortak boyutlar aranır.
+        # Görünümler işlev dönmeden bırakılır; açıkken diziler büyütülemez.
+        isaretci = np.frombuffer(self._isaretci, dtype=np.int64)
+        secim = np.asarray(idler, dtype=np.int64)
+        baslar = isaretci[secim]
+        uzunluklar = isaretci[secim + 1] - baslar
+        konumlar = np.arange(int(uzunluklar.sum())) + np.repeat(
+            baslar - (np.cumsum(uzunluklar) - uzunluklar), uzunluklar
+        )
+        aday_boyutlari = np.frombuffer(self._boyutlar, dtype=np.uint32)[konumlar]
+        aday_degerleri = np.frombuffer(self._degerler, dtype=np.float32)[konumlar].astype(np.float64)
+        del isaretci
+        satirlar = np.repeat(np.arange(len(idler)), uzunluklar)
+        yer = np.minimum(np.searchsorted(boyutlar, aday_boyutlari), len(boyutlar) - 1)
+        ortak = boyutlar[yer] == aday_boyutlari
+        kosinus = np.bincount(
+            satirlar[ortak], weights=aday_degerleri[ortak] * degerler[yer[ortak]],
+            minlength=len(idler),
+        )
+
+        limit = min(self.aday_limiti, len(idler))
+        secilen = np.argpartition(-kosinus, limit - 1)[:limit]
+        secilen = secilen[np.argsort(-kosinus[secilen], kind='stable')]
+        # Kayan nokta hatası 1'i geçmesin
+        return [(idler[j], min(1.0, float(kosinus[j]))) for j in secilen if kosinus[j] > 0]
+
+    def candidates(self, soru):
+        return [self.sorular[i] for i, _ in self._kosinus_adaylari(normalle(soru))]
+
+    def top_k(self, soru, k=3, cutoff=0.6):
+        adaylar = self._kosinus_adaylari(normalle(soru))
+        # Eşit skorlarda en_iyiler gibi büyük soru önce gelir
+        return [
+            (aday, skor) for skor, aday in heapq.nlargest(
+                k, ((skor, self.sorular[i]) for i, skor in adaylar if skor >= cutoff)
+            )
+        ]
+
+    def best(self, soru, cutoff=0.6):
+        eslesen = self.top_k(soru, 1, cutoff)
+        return eslesen[0][0] if eslesen else None
@@ -0,0 +1,194 @@
+"""
+ChatCPT dosya izleyici
+Veritabanı dosyaları dışarıdan değişince bilgi tabanını yeniden yükler;
+Linux'ta inotify, başka yerde stat yoklaması
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+# inotify olayları: dosya yazılıp kapatıldı, taşındı (os.replace), oluşturuldu, silindi
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MODIFY = 0x002
+_IN_OLAYLARI = (_IN_CLOSE_WRITE | _IN_MODIFY | _IN_MOVED_FROM | _IN_MOVED_TO
+                | _IN_CREATE | _IN_DELETE)
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_OLAY_BASLIGI = struct.Struct("iIII")
+
+
+def _inotify_kutuphanesi():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class _InotifyKaynagi:
+    """Dosyaların bulunduğu dizinleri inotify ile izler
+
+    Dosyaların kendisi değil dizinleri izlenir: JSON os.replace ile,
+    günlük birleştirmede taşınarak değişir; dosya izlemesi eski inode'da
+    kalırdı.
+    """
+
+    def __init__(self, libc, yollar):
+        self._adlar = {}
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 başarısız")
+        try:
+            for dizin in sorted({os.path.dirname(os.path.abspath(yol)) for yol in yollar}):
+                izleme = libc.inotify_add_watch(self._fd, os.fsencode(dizin), _IN_OLAYLARI)
+                if izleme < 0:
+                    raise OSError(ctypes.get_errno(), f"{dizin} izlenemiyor")
+                self._adlar[izleme] = {os.path.basename(yol).encode()
+                                       for yol in yollar
+                                       if os.path.dirname(os.path.abspath(yol)) == dizin}
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    # `sure` saniye içinde izlenen dosyalardan biri değiştiyse True
+    def bekle(self, sure):
+        if not select.select([self._fd], [], [], sure)[0]:
+            return False
+        degisti = False
+        while True:
+            try:
+                ham = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return degisti
+            konum = 0
+            while konum < len(ham):
+                izleme, _, _, uzunluk = _OLAY_BASLIGI.unpack_from(ham, konum)
+                konum += _OLAY_BASLIGI.size
+                ad = ham[konum:konum + uzunluk].rstrip(b"\0")
+                konum += uzunluk
+                degisti = degisti or ad in self._adlar.get(izleme, ())
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _YoklamaKaynagi:
+    """Dosyaların (inode, boyut, değişme zamanı)'nı yoklayarak değişikliği bulur"""
+
+    def __init__(self, yollar):
+        self._yollar = list(yollar)
+        self._durum = self._oku()
+
+    def _oku(self):
+        durum = []
+        for yol in self._yollar:
+            try:
+                bilgi = os.stat(yol)
+                durum.append((bilgi.st_ino, bilgi.st_size, bilgi.st_mtime_ns))
+            except FileNotFoundError:
+                durum.append(None)
+        return durum
+
+    def bekle(self, sure, dur):
+        if dur.wait(sure):
+            return False
+        durum = self._oku()
+        degisti, self._durum = durum != self._durum, durum
+        return degisti
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """Deponun dosyaları değişince `bilgi.reload()` çağıran arka plan iş parçacığı
+
+    Depo `watch_paths()` ve `changes()` vermelidir (bkz. JournalStore).
+    Linux'ta inotify kullanılır; kullanılamazsa ya da `yoklama` verilirse
+    dosyalar `aralik` saniyede bir stat ile yoklanır. Art arda gelen
+    olaylar `aralik` kadar beklenip tek yeniden yüklemede birleştirilir.
+    Olay kaçsa bile yeniden yükleme yalnızca değişenleri uygular; bilgi
+    tabanının kendi yazmaları da olay üretir, onlar için fark boş çıkar.
+
+    Sorguların beklememesi için bilgi tabanı ConcurrentKnowledgeBase
+    olmalıdır. Bir yüklemedeki hata sonrakileri durdurmaz, `hata`
+    özelliğinde kalır; `yuklenen` uygulanan kayıt değişikliklerini sayar.
+    """
+
+    def __init__(self, bilgi, aralik=1.0, yoklama=False):
+        self.bilgi = bilgi
+        self.aralik = aralik
+        self.yuklenen = 0
+        self.hata = None
+        self.yontem = None
+        self._dur = threading.Event()
+        self._is_parcacigi = None
+        self._kaynak = None
+        self._yoklama = yoklama
+
+    def start(self):
+        if self._is_parcacigi is None:
+            yollar = self.bilgi.store.watch_paths()
+            libc = None if self._yoklama else _inotify_kutuphanesi()
+            self._kaynak = None
+            if libc is not None:
+                try:
+                    self._kaynak = _InotifyKaynagi(libc, yollar)
+                    self.yontem = "inotify"
+                except OSError:
+                    self._kaynak = None
+            if self._kaynak is None:
+                self._kaynak = _YoklamaKaynagi(yollar)
+                self.yontem = "yoklama"
+            self._is_parcacigi = threading.Thread(target=self._calis, daemon=True,
+                                                  name="yz-izleyici")
+            self._is_parcacigi.start()
+        return self
+
+    def _degisiklik_bekle(self):
+        if isinstance(self._kaynak, _YoklamaKaynagi):
+            return self._kaynak.bekle(self.aralik, self._dur)
+        # inotify'da bekleme kısa tutulur ki stop() gecikmesin
+        if not self._kaynak.bekle(min(self.aralik, 0.5)):
+            return False
+        # Bu arada gelen olaylar aynı yüklemeye katılır; sürekli yazılsa da yükleme gecikmez
+        self._dur.wait(self.aralik)
+        self._kaynak.bekle(0)
+        return True
+
+    def _calis(self):
+        try:
+            while not self._dur.is_set():
+                if not self._degisiklik_bekle() or self._dur.is_set():
+                    continue
+                try:
+                    self.yuklenen += self.bilgi.reload()
+                except Exception as hata:
+                    self.hata = hata
+        finally:
+            self._kaynak.close()
+
+    def stop(self):
+        self._dur.set()
+        if self._is_parcacigi is not None:
+            self._is_parcacigi.join()
+            self._is_parcacigi = None
+
+
+# Aralık 0 ya da boşsa ya da depo değişiklik vermiyorsa izleyici başlatılmaz
+def izleyici_baslat(bilgi, aralik):
+    if not aralik or not hasattr(bilgi.store, "changes"):
+        return None
+    return Watcher(bilgi, aralik).start()